@@ -2,33 +2,28 @@ import os
 import socket
 import sys
 import io
-import keyring
 import secrets
 import logging
 from logging.handlers import RotatingFileHandler
-import structlog
+import click
 
 from flask import Flask
-from flask_migrate import Migrate
 from flask_cors import CORS
 
 from db.models import db
+from db.sqlite import apply_sqlite_profile, attach_sqlite_pragmas
 from utils.websockets.sockets import socketio
 from utils.emitters.emitters import emitters
-from utils.services.ai_api_manager import OpenAIService
-from utils.services.conversation_manager import SocketNotifier, ConversationManager
 
 from routes.chat_routes import create_chat_blueprint
 from features.file_processing.file_processing_routes import file_bp  # *do not* eagerly start MP
 from routes.extra_routes import extra_bp
 from routes.info_routes import info_bp
 from routes.api_vault_routes import api_vault_bp
+from routes.health_routes import health_bp
 
-# ───> RAG integration imports
-from utils.services.agentic.query_processor import QueryProcessor
-from utils.services.agentic.search_router    import SearchRouter
-from utils.search     import KeywordSearch, VectorSearch, HybridSearch
-from utils.keyword_loader import load_keyword_items, build_keyword_topics
+# ───> RAG services are built lazily (openai / pinecone imports are slow)
+from services.container import ServiceContainer, DEFAULT_WARMUP_MODE
 
 from utils.services.api_vault.secrets import ApiKeyManager
 from utils.services.api_vault.secrets_loader import SecretsLoader
@@ -40,6 +35,7 @@ from utils.services.api_vault.secrets_loader import SecretsLoader
 
 def configure_logging(app: Flask):
     """Set up console & rotating-file logging with structlog JSON renderer."""
+    import structlog  # imported here: it is slow to import and only needed at start-up
 
     LOG_DIR = os.path.join(app.instance_path, "logs")
     os.makedirs(LOG_DIR, exist_ok=True)
@@ -103,14 +99,15 @@ def get_free_port(start_port: int = 5000, max_port: int = 5100) -> int:
 # Blueprint + CLI registration ------------------------------------------------
 # -----------------------------------------------------------------------------
 
-def register_blueprints(app: Flask, conv_manager: ConversationManager):
-    chat_bp = create_chat_blueprint(conv_manager)
+def register_blueprints(app: Flask, services: ServiceContainer):
+    chat_bp = create_chat_blueprint(services)
     app.register_blueprint(chat_bp)
 
     app.register_blueprint(file_bp)
     app.register_blueprint(extra_bp, url_prefix="/extra")
     app.register_blueprint(info_bp,  url_prefix="/info")
     app.register_blueprint(api_vault_bp, url_prefix="/api-vault")
+    app.register_blueprint(health_bp, url_prefix="/health")
 
 
 def register_cli_commands(app: Flask):
@@ -131,6 +128,60 @@ def register_cli_commands(app: Flask):
         results = upsert_files_to_vector_db()
         print(f"Successfully processed {len(results)} documents")
 
+    @app.cli.command("build-keyword-tfidf")
+    @click.option("--batch-size", default=500, show_default=True, help="Documents per partial_fit call.")
+    def build_keyword_tfidf(batch_size):
+        """Fit the corpus TF-IDF keyword model over all ingested files and persist it."""
+        from db.models import File
+        from features.file_processing.file_pipeline import extract_text_from_file
+        from utils.services.generators.corpus_tfidf import CorpusTfidf
+        from utils.services.generators.keyword_generator import preprocess_text
+        model = CorpusTfidf()
+        batch = []
+        for f in File.query.yield_per(batch_size):
+            if not os.path.exists(f.file_path):
+                continue
+            batch.append(preprocess_text(extract_text_from_file(f.file_path)))
+            if len(batch) >= batch_size:
+                model.partial_fit(batch)
+                batch = []
+        model.partial_fit(batch)
+        print(f"Corpus TF-IDF model saved to {model.save()} ({model.n_docs} documents)")
+
+    @app.cli.command("compile-ontology")
+    @click.argument("source")
+    @click.argument("out_path")
+    @click.option("--lang", default="ro", show_default=True, help="Keep only labels in this language.")
+    @click.option("--format", "rdf_format", default="xml", show_default=True, help="rdflib parser format.")
+    def compile_ontology(source, out_path, lang, rdf_format):
+        """Compile an RDF/SKOS ontology into the SQLite label index used for term mapping."""
+        from utils.services.generators.ontology_index import compile_ontology_index
+        count = compile_ontology_index(source, out_path, lang=lang, format=rdf_format)
+        print(f"Wrote {count} labels to {out_path}; set ONTOLOGY_INDEX_PATH to use it")
+
+    @app.cli.command("reconcile-vectors")
+    @click.option("--dry-run", is_flag=True, help="Only count orphaned vectors.")
+    def reconcile_vectors_command(dry_run):
+        """Delete vectors whose file is gone or whose chunk index is past the file's vector count."""
+        from services.vector_index import reconcile_vectors
+        result = reconcile_vectors(dry_run=dry_run)
+        print(f"Scanned {result['scanned']} vectors: {result['orphans']} orphaned, {result['deleted']} deleted")
+
+    @app.cli.command("keywords-batch")
+    @click.option("--poll-interval", default=60.0, show_default=True, help="Seconds between batch status checks.")
+    def keywords_batch(poll_interval):
+        """Extract keywords for all files lacking them through the OpenAI Batch API."""
+        from sqlalchemy import func
+        from db.models import File
+        from features.file_processing.file_pipeline import run_keyword_batch
+        # NULL for SQL NULL, JSON null and objects without a "keywords" key
+        files = File.query.filter(func.json_type(File.meta_data, "$.keywords").is_(None))
+        print(f"Submitting {files.count()} documents for batch keyword extraction…")
+        files = files.yield_per(500)
+        work_dir = os.path.join(app.instance_path, "batches")
+        summary = run_keyword_batch(files, work_dir, poll_interval=poll_interval)
+        print(f"Stored keywords for {summary['stored'] + summary['short']} documents ({summary['failed']} failed)")
+
 
 # -----------------------------------------------------------------------------
 # Application factory ---------------------------------------------------------
@@ -142,6 +193,7 @@ def create_app(config_object: str | None = None) -> Flask:  # noqa: D401
     app = Flask(__name__, instance_relative_config=True)
 
     # ── SECRET_KEY — persisted in keyring ────────────────────────────────
+    import keyring  # imported here: loading its backends is slow
     SERVICE_NAME = "LEXBOT_PRO"
     KR_USERNAME  = "flask-secret-key"
     secret = keyring.get_password(SERVICE_NAME, KR_USERNAME)
@@ -165,7 +217,10 @@ def create_app(config_object: str | None = None) -> Flask:  # noqa: D401
     os.makedirs(app.instance_path, exist_ok=True)  # ensure instance dir
 
     # ── Extensions --------------------------------------------------------
+    apply_sqlite_profile(app)
     db.init_app(app)
+    attach_sqlite_pragmas(app, db)
+    from flask_migrate import Migrate  # imports alembic; only needed once an app is built
     Migrate(app, db)
     CORS(app)
     # Keep original SocketIO async mode (eventlet/gevent) — no explicit override
@@ -174,28 +229,22 @@ def create_app(config_object: str | None = None) -> Flask:  # noqa: D401
 
     # ── Logging ----------------------------------------------------------
     configure_logging(app)
+    import structlog
     app.logger = structlog.get_logger(__name__).bind(component="app")
 
     # ── Services ---------------------------------------------------------
-    notifier        = SocketNotifier(socketio, app)
-    ai_service      = OpenAIService()
     api_key_manager = ApiKeyManager()
     app.api_key_manager = api_key_manager
 
-    # ── Build RAG pipeline once -----------------------------------------
-    with app.app_context():
-        kw_logger = logging.getLogger("keyword_loader")
-        app.logger.debug("keyword_loader handlers: %s", kw_logger.handlers)
-        items  = load_keyword_items()
-        topics = build_keyword_topics()
-
-    keyword_search  = KeywordSearch(items)
-    vector_search   = HybridSearch()
-    qp              = QueryProcessor(ai_service, topics)
-    search_router   = SearchRouter(qp, keyword_search, vector_search)
-    conv_manager    = ConversationManager(db.session, ai_service, search_router, notifier)
-
-    register_blueprints(app, conv_manager)
+    # ── RAG pipeline: built on first use or in the background -----------
+    services = ServiceContainer(app, socketio)
+    app.services = services
+    if DEFAULT_WARMUP_MODE == "eager":
+        services.warm_up()
+    elif DEFAULT_WARMUP_MODE == "background":
+        services.start_warm_up()
+
+    register_blueprints(app, services)
     register_cli_commands(app)
     # NOTE: *do not* call init_multiprocessing() here — each worker will do so lazily
 
@@ -211,9 +260,11 @@ if __name__ == "__main__":
     from multiprocessing import freeze_support
     from multiprocessing import Manager, Pool
     from multiprocessing import freeze_support, Manager, Pool
-    from services.mp_init import set_pool_and_manager
+    from services.mp_init import set_pool_and_manager, worker_init, worker_app_config
+    from services.event_channel import EventChannel
+    from utils.services.ws_event_relay import start_event_bridge
     from services.session_store import SessionStore
-    from features.file_processing.file_processing_routes import set_session_store
+    from features.file_processing.file_processing_routes import set_session_store, resume_pending_jobs
 
     freeze_support()
 
@@ -221,12 +272,22 @@ if __name__ == "__main__":
 
     # --- Multiprocessing-safe initialization ---
     manager = Manager()
-    pool = Pool()
+    channel = EventChannel()  # before the pool: workers inherit it
+    pool = Pool(initializer=worker_init, initargs=(worker_app_config(), channel))
     sessions = SessionStore()
 
-    set_pool_and_manager(manager, pool)
+    set_pool_and_manager(manager, pool, channel)
+    start_event_bridge(channel, socketio)
     set_session_store(sessions)
     app.sessions = sessions
+    with app.app_context():
+        resumed = resume_pending_jobs()
+    if resumed:
+        app.logger.info("resumed processing jobs", jobs=resumed)
+
+    from services.vector_index import RECONCILE_INTERVAL_SECONDS, run_reconciler
+    if RECONCILE_INTERVAL_SECONDS > 0:
+        socketio.start_background_task(run_reconciler, app, RECONCILE_INTERVAL_SECONDS, socketio.sleep)
 
     port = get_free_port()
     app.logger.info("app starting", host="127.0.0.1", port=port, debug=app.debug)
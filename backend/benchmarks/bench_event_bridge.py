@@ -0,0 +1,96 @@
+"""
+Measure worker -> web process event latency.
+
+Usage (from backend/):
+    python benchmarks/bench_event_bridge.py [--events N] [--sessions N]
+
+Compares the EventChannel pipe read by a single consumer with the previous
+design (one Manager().Queue per session, each polled by its own relay
+thread with get(timeout=1)). Producers are separate processes that stamp each
+event with time.perf_counter() (CLOCK_MONOTONIC, comparable across processes
+on Linux); the consumer records the delay until it reads the event.
+"""
+import os
+import sys
+import time
+import queue
+import argparse
+import threading
+import statistics
+import multiprocessing
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from services.event_channel import EventChannel
+
+
+def produce(out, session_id, events, gap):
+    for i in range(events):
+        out.put({"session_id": session_id, "file": str(i), "sent": time.perf_counter()})
+        time.sleep(gap)
+
+
+def report(label, delays):
+    delays = sorted(d * 1000 for d in delays)
+    p99 = delays[int(len(delays) * 0.99) - 1]
+    print(f"{label:>28}: {len(delays)} events, median {statistics.median(delays):.3f} ms, "
+          f"p99 {p99:.3f} ms, max {delays[-1]:.3f} ms")
+
+
+def bench_channel(sessions, events, gap):
+    channel = EventChannel()
+    procs = [multiprocessing.Process(target=produce, args=(channel, f"s{i}", events, gap)) for i in range(sessions)]
+    for p in procs:
+        p.start()
+    delays = []
+    while len(delays) < sessions * events:
+        if channel.wait(1):
+            now = time.perf_counter()
+            delays.extend(now - e["sent"] for e in channel.drain())
+    for p in procs:
+        p.join()
+    report("EventChannel, 1 consumer", delays)
+
+
+def bench_manager_queues(sessions, events, gap):
+    manager = multiprocessing.Manager()
+    queues = [manager.Queue() for _ in range(sessions)]
+    delays, lock = [], threading.Lock()
+
+    def relay(q):
+        seen = 0
+        while seen < events:
+            try:
+                e = q.get(timeout=1)
+            except queue.Empty:
+                continue
+            with lock:
+                delays.append(time.perf_counter() - e["sent"])
+            seen += 1
+
+    relays = [threading.Thread(target=relay, args=(q,)) for q in queues]
+    procs = [multiprocessing.Process(target=produce, args=(q, f"s{i}", events, gap)) for i, q in enumerate(queues)]
+    for t in relays:
+        t.start()
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    for t in relays:
+        t.join()
+    manager.shutdown()
+    report(f"Manager queues, {sessions} threads", delays)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=500, help="Events per session.")
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--gap", type=float, default=0.001, help="Seconds between events of one producer.")
+    args = parser.parse_args()
+    bench_channel(args.sessions, args.events, args.gap)
+    bench_manager_queues(args.sessions, args.events, args.gap)
+
+
+if __name__ == "__main__":
+    main()
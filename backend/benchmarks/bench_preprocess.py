@@ -0,0 +1,65 @@
+"""
+Compare the legacy regex/str.replace cleaner with keyword_generator._clean_text.
+
+Usage (from backend/):
+    python benchmarks/bench_preprocess.py [file.pdf|file.txt ...]
+
+Without arguments a synthetic ~5 MB legal-style document is used.
+"""
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.services.generators.keyword_generator import _clean_text
+
+
+def legacy_clean_text(text: str) -> str:
+    text = re.sub(r"^\s*\[?\d+\]?\s.*$", "", text, flags=re.MULTILINE)
+    text = re.sub(r"Pagina\s+\d+\s+din\s+\d+", "", text)
+    text = re.sub(r"[\r\n]+", " ", text)
+    text = re.sub(r"[\s\f\t\v]+", " ", text).strip()
+    for wrong, right in {'0': 'O', '1': 'I'}.items():
+        text = text.replace(wrong, right)
+    return text
+
+
+def load_text(path: str) -> str:
+    if path.lower().endswith(".pdf"):
+        from PyPDF2 import PdfReader
+        return "".join(page.extract_text() or "" for page in PdfReader(path).pages)
+    with open(path, encoding="utf-8") as fh:
+        return fh.read()
+
+
+def synthetic_text(target_bytes: int = 5 * 1024 * 1024) -> str:
+    page = (
+        "TRIBUNALUL ARAD\nH0TARARE nr. 1234/2019 din 12.01.2020\n"
+        "Potrivit art. 10 alin. (1) din Legea nr. 10/2001, instanţa reţine că\tcererea este întemeiată.\n"
+        "1 Nota de subsol cu trimitere la jurisprudenţă.\n"
+        "Pagina 3 din 120\n\n"
+    )
+    return page * (target_bytes // len(page) + 1)
+
+
+def bench(func, text: str, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(paths):
+    docs = [(p, load_text(p)) for p in paths] or [("synthetic", synthetic_text())]
+    for name, text in docs:
+        old = bench(legacy_clean_text, text)
+        new = bench(_clean_text, text)
+        print(f"{name}: {len(text) / 1e6:.1f} MB  legacy={old * 1000:.1f} ms  new={new * 1000:.1f} ms  speedup={old / new:.2f}x")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
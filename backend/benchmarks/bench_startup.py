@@ -0,0 +1,80 @@
+"""
+Measure cold-start cost of the backend with `python -X importtime`.
+
+Usage (from backend/):
+    python benchmarks/bench_startup.py [module ...] [--top N] [--runs N]
+
+Defaults to `app`. For each module a fresh interpreter imports it with
+-X importtime; the script reports the best wall time over the runs, the
+cumulative import time of the module and the slowest transitive imports.
+Pass `--create-app` to also time `create_app()` (needs a configured env).
+"""
+import os
+import re
+import sys
+import time
+import argparse
+import subprocess
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+LINE_RE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+# Modules that should not be imported while the app boots.
+HEAVY_MODULES = ("openai", "pinecone", "pinecone.grpc", "eventlet", "spacy", "keybert", "sklearn")
+
+
+def run_importtime(code: str):
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=BACKEND_DIR, capture_output=True, text=True,
+        env={**os.environ, "SERVICES_WARMUP": "lazy"},
+    )
+    wall = time.perf_counter() - started
+    entries = []
+    for line in proc.stderr.splitlines():
+        m = LINE_RE.match(line)
+        if m:
+            entries.append((m.group(4), int(m.group(1)), int(m.group(2)), len(m.group(3))))
+    errors = [l for l in proc.stderr.splitlines() if not l.startswith("import time:")]
+    return wall, entries, proc.returncode, errors
+
+
+def report(label: str, code: str, module: str, top: int, runs: int) -> None:
+    best = None
+    for _ in range(runs):
+        result = run_importtime(code)
+        if best is None or result[0] < best[0]:
+            best = result
+    wall, entries, rc, errors = best
+    print(f"== {label} ==")
+    if rc != 0:
+        print("  FAILED:", errors[-1] if errors else f"exit code {rc}")
+        return
+    cumulative = {name: cum for name, _, cum, _ in entries}
+    print(f"  wall time (best of {runs}): {wall:.3f}s")
+    if module in cumulative:
+        print(f"  import {module}: {cumulative[module] / 1e6:.3f}s cumulative")
+    loaded = [m for m in HEAVY_MODULES if m in cumulative]
+    print(f"  heavy modules imported: {', '.join(loaded) if loaded else 'none'}")
+    print(f"  slowest {top} imports (cumulative):")
+    for name, _, cum, _ in sorted(entries, key=lambda e: -e[2])[:top]:
+        print(f"    {cum / 1e6:8.3f}s  {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("modules", nargs="*", default=["app"])
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--create-app", action="store_true")
+    args = parser.parse_args()
+
+    for module in args.modules:
+        report(f"import {module}", f"import {module}", module, args.top, args.runs)
+    if args.create_app:
+        report("create_app()", "import app; app.create_app()", "app", args.top, args.runs)
+
+
+if __name__ == "__main__":
+    main()
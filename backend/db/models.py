@@ -23,6 +23,11 @@ class Conversation(db.Model):
         "File", backref="conversation", lazy=True
     )
 
+    __table_args__ = (
+        # Keyset pagination of the conversation list (newest first)
+        db.Index("ix_conversation_created_at_id", "created_at", "id"),
+    )
+
     def __repr__(self):
         return f"<Conversation {self.id} - {self.title or 'No Title'}>"
 
@@ -39,6 +44,11 @@ class ConversationMessage(db.Model):
     meta_data = db.Column(db.JSON, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        # Keyset pagination of a conversation's messages
+        db.Index("ix_conversation_message_conversation_created_id", "conversation_id", "created_at", "id"),
+    )
+
     def __repr__(self):
         return f"<ConversationMessage {self.id} from {self.sender}>"
 
@@ -57,7 +67,105 @@ class File(db.Model):
     )
     # Field to confirm whether the file has been uploaded.
     is_uploaded = db.Column(db.Boolean, default=False, nullable=False)
+    # Chunks written to the vector index as "{id}_chunk_{0..n-1}"; None for files
+    # uploaded before this was tracked.
+    vector_count = db.Column(db.Integer, nullable=True)
     created_at = db.Column(db.DateTime) 
+    # Structured keyword rows extracted from meta_data['keywords'].
+    keywords = db.relationship(
+        "FileKeyword", backref="file", cascade="all, delete-orphan", lazy=True
+    )
+
+    __table_args__ = (
+        # One row per path: looked up by the scanner and by session cleanup
+        db.Index("ix_file_file_path", "file_path", unique=True),
+        # Uploaded / not-yet-uploaded selections (keyword index, upsert phase)
+        db.Index("ix_file_is_uploaded", "is_uploaded"),
+    )
 
     def __repr__(self):
         return f"<File {self.id} at {self.created_at}>"
+
+
+class FileKeyword(db.Model):
+    __tablename__ = "file_keyword"
+    id = db.Column(db.Integer, primary_key=True)
+    file_id = db.Column(
+        db.Integer, db.ForeignKey("file.id", ondelete="CASCADE"), nullable=False
+    )
+    # Field of the keyword record, e.g. 'locatie', 'domeniu', 'cuvinte_cheie'.
+    topic = db.Column(db.String(64), nullable=False)
+    value = db.Column(db.Text, nullable=False)
+    # Lowercased, whitespace-collapsed value used for matching.
+    normalized_value = db.Column(db.String(255), nullable=False)
+
+    __table_args__ = (
+        db.Index("ix_file_keyword_file_id", "file_id"),
+        db.Index("ix_file_keyword_topic", "topic"),
+        db.Index("ix_file_keyword_normalized_value", "normalized_value", "file_id"),
+    )
+
+    def __repr__(self):
+        return f"<FileKeyword {self.topic}={self.normalized_value!r} file={self.file_id}>"
+
+
+class ProcessingJob(db.Model):
+    """
+    Durable record of a folder-processing request; its id is the upload session id.
+    """
+    __tablename__ = "processing_job"
+    id = db.Column(db.String(32), primary_key=True)
+    folder_paths = db.Column(db.JSON, nullable=False)
+    extensions = db.Column(db.JSON, nullable=False)
+    # queued -> running -> completed | failed | cancelled
+    status = db.Column(db.String(16), nullable=False, default="queued")
+    priority = db.Column(db.Integer, nullable=False, default=0)
+    # Set once the scan phase has created the job's file tasks.
+    scanned = db.Column(db.Boolean, nullable=False, default=False)
+    lease_owner = db.Column(db.String(64), nullable=True)
+    lease_expires_at = db.Column(db.DateTime, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    tasks = db.relationship(
+        "ProcessingTask", backref="job", cascade="all, delete-orphan", lazy=True
+    )
+
+    __table_args__ = (
+        db.Index("ix_processing_job_status_priority", "status", "priority"),
+    )
+
+    def __repr__(self):
+        return f"<ProcessingJob {self.id} {self.status}>"
+
+
+class ProcessingTask(db.Model):
+    """
+    One unit of work (a pipeline phase for one file) within a ProcessingJob.
+    """
+    __tablename__ = "processing_task"
+    id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(
+        db.String(32), db.ForeignKey("processing_job.id", ondelete="CASCADE"), nullable=False
+    )
+    file_id = db.Column(db.Integer, db.ForeignKey("file.id", ondelete="CASCADE"), nullable=False)
+    # 'metadata' or 'upsert'
+    phase = db.Column(db.String(16), nullable=False)
+    # pending -> leased -> done | failed (leased tasks whose lease expired are retried);
+    # open tasks of a cancelled job become cancelled
+    status = db.Column(db.String(16), nullable=False, default="pending")
+    priority = db.Column(db.Integer, nullable=False, default=0)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=3)
+    lease_owner = db.Column(db.String(64), nullable=True)
+    lease_expires_at = db.Column(db.DateTime, nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint("job_id", "file_id", "phase", name="uq_processing_task_job_file_phase"),
+        db.Index("ix_processing_task_claim", "job_id", "phase", "status", "priority"),
+    )
+
+    def __repr__(self):
+        return f"<ProcessingTask {self.id} {self.phase} file={self.file_id} {self.status}>"
@@ -0,0 +1,62 @@
+import base64
+import binascii
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import and_, or_, tuple_
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(created_at: Optional[datetime], row_id: int) -> str:
+    """
+    Opaque cursor for the position just past (created_at, row_id). A NULL
+    created_at is encoded as an empty stamp.
+    """
+    stamp = created_at.isoformat() if created_at else ""
+    return base64.urlsafe_b64encode(f"{stamp}|{row_id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    try:
+        stamp, row_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return (datetime.fromisoformat(stamp) if stamp else None), int(row_id)
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        raise InvalidCursor(f"Invalid cursor: {cursor!r}")
+
+
+def keyset_page(query, created_col, id_col, limit: int, cursor: Optional[str] = None,
+                descending: bool = True) -> Tuple[List[Any], Optional[str]]:
+    """
+    One page of `query` ordered by (created_col, id_col), starting after
+    `cursor`. The seek condition and the order match a composite index on
+    (..., created_col, id_col), so the cost of a page does not depend on how
+    deep it is.
+
+    Rows with a NULL created_at sort as the oldest (SQLite's NULL order: first
+    ascending, last descending) and are paged by id among themselves.
+
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    if cursor:
+        created, row_id = decode_cursor(cursor)
+        if created is None:
+            # Past the NULLs when ascending; only further NULLs when descending
+            seek = and_(created_col.is_(None), id_col < row_id if descending else id_col > row_id)
+            query = query.filter(seek if descending else or_(seek, created_col.isnot(None)))
+        elif descending:
+            query = query.filter(or_(tuple_(created_col, id_col) < (created, row_id), created_col.is_(None)))
+        else:
+            query = query.filter(tuple_(created_col, id_col) > (created, row_id))
+    if descending:
+        query = query.order_by(created_col.desc(), id_col.desc())
+    else:
+        query = query.order_by(created_col.asc(), id_col.asc())
+    rows = query.limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, created_col.key), getattr(last, id_col.key))
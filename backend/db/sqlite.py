@@ -0,0 +1,80 @@
+import os
+import sqlite3
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+# Engine profile for the SQLite database shared by the web process and the pool
+# workers. WAL lets readers (chat requests) run while a worker writes;
+# synchronous=NORMAL is durable across application crashes in WAL mode and
+# only syncs at checkpoints; busy_timeout makes a writer wait for the lock
+# instead of failing with "database is locked". SQLite enforces foreign keys
+# (and their ON DELETE CASCADE) only when foreign_keys is on, per connection.
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "30000"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))
+# Connections per process: the worker's task threads plus the writer and the main thread
+SQLITE_POOL_SIZE = int(os.getenv("SQLITE_POOL_SIZE", "12"))
+SQLITE_MAX_OVERFLOW = int(os.getenv("SQLITE_MAX_OVERFLOW", "8"))
+
+SQLITE_PRAGMAS = (
+    ("journal_mode", "WAL"),
+    ("synchronous", "NORMAL"),
+    ("busy_timeout", SQLITE_BUSY_TIMEOUT_MS),
+    ("mmap_size", SQLITE_MMAP_SIZE),
+    ("cache_size", -SQLITE_CACHE_SIZE_KB),
+    ("temp_store", "MEMORY"),
+    ("foreign_keys", "ON"),
+)
+
+
+def is_sqlite_file(uri: str) -> bool:
+    url = make_url(uri)
+    return url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:")
+
+
+def sqlite_engine_options(uri: str) -> dict:
+    """
+    SQLALCHEMY_ENGINE_OPTIONS for `uri`: a connection pool sized for the worker
+    threads and a driver-level lock timeout matching busy_timeout. Empty for
+    other databases and in-memory SQLite (which keeps its single shared connection).
+    """
+    if not is_sqlite_file(uri):
+        return {}
+    return {
+        "pool_size": SQLITE_POOL_SIZE,
+        "max_overflow": SQLITE_MAX_OVERFLOW,
+        "connect_args": {"timeout": SQLITE_BUSY_TIMEOUT_MS / 1000},
+    }
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in SQLITE_PRAGMAS:
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def apply_sqlite_profile(app) -> None:
+    """
+    Apply the SQLite profile to a Flask app before `db.init_app`: engine
+    options from the app's database URI (unless configured explicitly).
+    Call `attach_sqlite_pragmas` after `db.init_app` for the connection pragmas.
+    """
+    uri = app.config.get("SQLALCHEMY_DATABASE_URI", "")
+    app.config.setdefault("SQLALCHEMY_ENGINE_OPTIONS", sqlite_engine_options(uri))
+
+
+def attach_sqlite_pragmas(app, db) -> None:
+    """
+    Set the pragmas on every new connection of the app's own engines (not on
+    every Engine in the process). Safe to call more than once.
+    """
+    with app.app_context():
+        engines = list(db.engines.values())
+    for engine in engines:
+        if not event.contains(engine, "connect", _set_sqlite_pragmas):
+            event.listen(engine, "connect", _set_sqlite_pragmas)
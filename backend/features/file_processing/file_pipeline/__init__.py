@@ -1,6 +1,7 @@
 from .file_scanning import scan_and_add_files, scan_and_add_files_wrapper
 from .text_extraction import extract_text_from_file
-from .metadata_processing import process_file_for_metadata, get_files_without_metadata_text
+from .metadata_processing import process_file_for_metadata, store_file_metadata, get_files_without_metadata_text
 from .chunking import chunk_text
-from .vector_db import upsert_file_to_vector_db
-from .utils_flatten import flatten_values
\ No newline at end of file
+from .vector_db import upsert_file_to_vector_db, mark_file_uploaded
+from .utils_flatten import flatten_values
+from .keyword_batch import run_keyword_batch, build_keyword_batch_requests, apply_keyword_batch_results
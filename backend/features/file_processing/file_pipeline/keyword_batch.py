@@ -0,0 +1,250 @@
+import os
+import json
+import time
+from flask import current_app
+from openai import OpenAI
+from db.models import db, File
+from .text_extraction import extract_text_from_file
+from utils.services.ai_api_manager import get_shared_client
+from utils.keyword_loader import set_file_keywords
+from utils.services.generators.keyword_generator import (
+    DEFAULT_KEYWORD_MODEL,
+    EMPTY_KEYWORDS,
+    build_openai_keyword_instruction,
+    parse_openai_keyword_response,
+    preprocess_text,
+)
+
+# Batch API limits per input file: 50,000 requests and 200 MB.
+MAX_BATCH_REQUESTS = 50000
+MAX_BATCH_FILE_BYTES = int(os.getenv("KEYWORD_BATCH_MAX_BYTES", 200 * 1024 * 1024))
+BATCH_ENDPOINT = "/v1/chat/completions"
+TERMINAL_STATES = {"completed", "failed", "expired", "cancelled"}
+
+
+def _custom_id(file_id) -> str:
+    return f"file-{file_id}"
+
+
+def _file_id(custom_id: str) -> int:
+    return int(custom_id.split("-", 1)[1])
+
+
+def build_keyword_batch_requests(files, model: str = DEFAULT_KEYWORD_MODEL, short: list | None = None):
+    """
+    Yield one Batch API request line per file, extracting each file's text only
+    when its line is consumed. The ids of files whose text is too short for
+    extraction are appended to `short` instead (they get the empty keyword record).
+    """
+    func = "build_keyword_batch_requests"
+    short = short if short is not None else []
+    for f in files:
+        if not os.path.exists(f.file_path):
+            current_app.logger.warning(f"[{func}] File not found: {f.file_path}")
+            continue
+        text = extract_text_from_file(f.file_path)
+        if not text:
+            current_app.logger.warning(f"[{func}] Empty text extracted from {f.file_path}")
+            continue
+        cleaned = preprocess_text(text, lemmatize=False)
+        if len(cleaned.split()) < 30:
+            short.append(f.id)
+            continue
+        yield {
+            "custom_id": _custom_id(f.id),
+            "method": "POST",
+            "url": BATCH_ENDPOINT,
+            "body": {
+                "model": model,
+                "messages": [
+                    {"role": "system", "content": build_openai_keyword_instruction(cleaned)},
+                    {"role": "user", "content": ""},
+                ],
+            },
+        }
+
+
+def write_batch_files(
+    requests,
+    work_dir: str,
+    max_requests: int = MAX_BATCH_REQUESTS,
+    max_bytes: int = MAX_BATCH_FILE_BYTES,
+) -> tuple[list[tuple[str, int]], int]:
+    """
+    Stream request lines to JSONL files for upload with purpose='batch',
+    starting a new file before one would exceed `max_requests` lines or
+    `max_bytes`. Requests larger than `max_bytes` on their own are skipped.
+    Returns ([(path, request_count), ...], skipped).
+    """
+    files, skipped = [], 0
+    fh, lines, size = None, 0, 0
+    try:
+        for req in requests:
+            line = (json.dumps(req, ensure_ascii=False) + "\n").encode("utf-8")
+            if len(line) > max_bytes:
+                skipped += 1
+                current_app.logger.error(
+                    f"[write_batch_files] Request {req['custom_id']} is {len(line)} bytes, over the batch file limit; skipped"
+                )
+                continue
+            if fh is None or lines >= max_requests or size + len(line) > max_bytes:
+                if fh is not None:
+                    files.append((fh.name, lines))
+                    fh.close()
+                fh, lines, size = open(os.path.join(work_dir, f"keywords_{len(files)}.jsonl"), "wb"), 0, 0
+            fh.write(line)
+            lines += 1
+            size += len(line)
+    finally:
+        if fh is not None:
+            fh.close()
+    if fh is not None:
+        files.append((fh.name, lines))
+    return files, skipped
+
+
+def submit_keyword_batch(path: str, client: OpenAI | None = None, metadata: dict | None = None) -> str:
+    """
+    Upload a JSONL request file and create a batch job. Returns the batch id.
+    """
+    client = client or get_shared_client()
+    with open(path, "rb") as fh:
+        uploaded = client.files.create(file=fh, purpose="batch")
+    batch = client.batches.create(
+        input_file_id=uploaded.id,
+        endpoint=BATCH_ENDPOINT,
+        completion_window="24h",
+        metadata=metadata or {"job": "keyword_extraction"},
+    )
+    current_app.logger.info(f"[submit_keyword_batch] Submitted batch {batch.id} from {path}")
+    return batch.id
+
+
+def wait_for_batch(batch_id: str, client: OpenAI | None = None, poll_interval: float = 30.0, timeout: float | None = None):
+    """
+    Poll a batch until it reaches a terminal state. Returns the final batch object.
+    """
+    return next(wait_for_batches([batch_id], client=client, poll_interval=poll_interval, timeout=timeout))
+
+
+def wait_for_batches(batch_ids: list[str], client: OpenAI | None = None, poll_interval: float = 30.0, timeout: float | None = None):
+    """
+    Poll several batches together, yielding each final batch object as soon
+    as it reaches a terminal state (so results can be applied while the
+    others still run). `timeout` applies to the whole set.
+    """
+    client = client or get_shared_client()
+    started = time.monotonic()
+    pending = list(batch_ids)
+    while pending:
+        for batch_id in list(pending):
+            batch = client.batches.retrieve(batch_id)
+            current_app.logger.info(
+                f"[wait_for_batches] Batch {batch_id} status={batch.status} counts={batch.request_counts}"
+            )
+            if batch.status in TERMINAL_STATES:
+                pending.remove(batch_id)
+                yield batch
+        if not pending:
+            return
+        if timeout is not None and time.monotonic() - started > timeout:
+            raise TimeoutError(f"Batches {pending} did not finish within {timeout}s")
+        time.sleep(poll_interval)
+
+
+def _read_jsonl(client: OpenAI, file_id: str | None):
+    """
+    Yield the records of a JSONL file line by line, without loading the whole
+    download into memory.
+    """
+    if not file_id:
+        return
+    with client.files.with_streaming_response.content(file_id) as response:
+        for line in response.iter_lines():
+            if line.strip():
+                yield json.loads(line)
+
+
+def apply_keyword_batch_results(batch, client: OpenAI | None = None, commit_every: int = 500) -> dict:
+    """
+    Download a finished batch's output and store each answer in
+    File.meta_data['keywords'], committing every `commit_every` results.
+    Returns counters for succeeded/failed requests.
+    """
+    func = "apply_keyword_batch_results"
+    client = client or get_shared_client()
+    results = {}
+    stored = failed = 0
+    for line in _read_jsonl(client, batch.output_file_id):
+        response = line.get("response") or {}
+        if line.get("error") or response.get("status_code") != 200:
+            failed += 1
+            current_app.logger.error(f"[{func}] Request {line.get('custom_id')} failed: {line.get('error') or response}")
+            continue
+        try:
+            raw = response["body"]["choices"][0]["message"]["content"]
+            results[_file_id(line["custom_id"])] = parse_openai_keyword_response(raw)
+        except Exception as e:
+            failed += 1
+            current_app.logger.error(f"[{func}] Could not parse result for {line.get('custom_id')}: {e}")
+            continue
+        if len(results) >= commit_every:
+            _store_keywords(results, commit_every)
+            stored += len(results)
+            results = {}
+    failed += sum(1 for _ in _read_jsonl(client, batch.error_file_id))
+
+    _store_keywords(results, commit_every)
+    stored += len(results)
+    current_app.logger.info(f"[{func}] Batch {batch.id}: stored={stored} failed={failed}")
+    return {"stored": stored, "failed": failed}
+
+
+def _store_keywords(keywords_by_id: dict, commit_every: int = 500) -> None:
+    ids = list(keywords_by_id)
+    for i in range(0, len(ids), commit_every):
+        chunk = ids[i:i + commit_every]
+        for f in File.query.filter(File.id.in_(chunk)).all():
+            set_file_keywords(f, keywords_by_id[f.id])
+        db.session.commit()
+
+
+def run_keyword_batch(
+    files,
+    work_dir: str,
+    client: OpenAI | None = None,
+    poll_interval: float = 30.0,
+    timeout: float | None = None,
+    max_requests: int = MAX_BATCH_REQUESTS,
+    max_bytes: int = MAX_BATCH_FILE_BYTES,
+) -> dict:
+    """
+    Bulk keyword extraction through the Batch API: stream the requests to JSONL
+    files within the per-file limits, submit one batch per file, then poll
+    them together and write each batch's results back to the DB as it finishes. `files` is iterated once and may be
+    a streaming query; nothing is committed until it is exhausted.
+    """
+    client = client or get_shared_client()
+    os.makedirs(work_dir, exist_ok=True)
+    short = []
+    batch_files, skipped = write_batch_files(
+        build_keyword_batch_requests(files, short=short), work_dir,
+        max_requests=max_requests, max_bytes=max_bytes,
+    )
+
+    empty = json.dumps(EMPTY_KEYWORDS, ensure_ascii=False)
+    _store_keywords({fid: empty for fid in short})
+
+    summary = {
+        "submitted": sum(n for _, n in batch_files), "short": len(short),
+        "stored": 0, "failed": skipped, "batches": [],
+    }
+    batch_ids = [submit_keyword_batch(path, client=client) for path, _ in batch_files]
+    for batch in wait_for_batches(batch_ids, client=client, poll_interval=poll_interval, timeout=timeout):
+        summary["batches"].append({"id": batch.id, "status": batch.status})
+        if batch.status != "completed":
+            current_app.logger.error(f"[run_keyword_batch] Batch {batch.id} ended with status {batch.status}")
+        counts = apply_keyword_batch_results(batch, client=client)
+        summary["stored"] += counts["stored"]
+        summary["failed"] += counts["failed"]
+    return summary
@@ -1,9 +1,11 @@
 import os
 from flask import current_app
-from sqlalchemy import or_
-from db.models import File
+from sqlalchemy import JSON, or_
+from db.models import db, File
 from .text_extraction import extract_text_from_file
 from utils.services.ai_api_manager import OpenAIService
+from utils.keyword_loader import set_file_keywords
+from services.job_queue import JobCancelled
 
 aii = OpenAIService()
 
@@ -13,26 +15,49 @@ def truncate_words(text: str, limit: int = 20) -> str:
         return text
     return " ".join(words[:limit]) + "..."
 
-def get_files_without_metadata_text():
-    files = File.query.filter(or_(File.meta_data.is_(None), File.meta_data == {})).all()
-    results = []
-    for f in files:
-        if os.path.exists(f.file_path):
-            contents = extract_text_from_file(f.file_path)
+def get_files_without_metadata_text(batch_size: int = 500):
+    """
+    Yield {'filename', 'contents'} for every file without metadata. Only the
+    paths are read from the DB, `batch_size` rows at a time, and each file's
+    text is extracted when it is consumed.
+    """
+    paths = (
+        db.session.query(File.file_path)
+        # meta_data=None is stored as JSON 'null', not SQL NULL
+        .filter(or_(File.meta_data.is_(None), File.meta_data == JSON.NULL, File.meta_data == {}))
+        .execution_options(yield_per=batch_size)
+    )
+    for (file_path,) in paths:
+        if os.path.exists(file_path):
+            contents = extract_text_from_file(file_path)
             current_app.logger.debug(
                 "Loaded contents for %s: %s",
-                f.file_path,
+                file_path,
                 truncate_words(contents, limit=20)
             )
         else:
             contents = ""
-            current_app.logger.warning(f"File not found: {f.file_path}")
-        results.append({'filename': f.file_path, 'contents': contents})
-    return results
+            current_app.logger.warning(f"File not found: {file_path}")
+        yield {'filename': file_path, 'contents': contents}
+
+def store_file_metadata(f, api_content, type='keywords'):
+    """
+    Store a metadata result on the file (keywords also replace its FileKeyword rows).
+    The caller commits.
+    """
+    if type == 'keywords':
+        set_file_keywords(f, api_content)
+    else:
+        f.meta_data = f.meta_data or {}
+        f.meta_data[type] = api_content
 
-def process_file_for_metadata(f, type='keywords'):
+def process_file_for_metadata(f, type='keywords', cancel_token=None, store=True):
     """
     Process a single file for metadata (keywords or other type).
+    With a `cancel_token`, raises JobCancelled before the API call and before the
+    result is stored if the job was cancelled in the meantime.
+    With `store=False` the file is left untouched; the caller stores the returned
+    'meta_data' with store_file_metadata (e.g. through the worker's DBWriter).
     """
     meta_key = type
     func = "process_file_for_metadata"
@@ -40,6 +65,8 @@ def process_file_for_metadata(f, type='keywords'):
         text = extract_text_from_file(f.file_path)
         current_app.logger.info(f"[{func}] Processing file: {f.file_path} with text length: {len(text)}")
         if text:
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
             try:
                 if type == 'keywords':
                     api_content = aii.keywords(text)
@@ -51,10 +78,14 @@ def process_file_for_metadata(f, type='keywords'):
                         ]
                     })
                     current_app.logger.info(f"[{func}] Raw metadata output for {f.file_path}: {api_content}")
-                f.meta_data = f.meta_data or {}
-                f.meta_data[meta_key] = api_content
-                current_app.logger.info(f"[{func}] Metadata saved for {f.file_path}")
+                if cancel_token is not None:
+                    cancel_token.raise_if_cancelled()
+                if store:
+                    store_file_metadata(f, api_content, meta_key)
+                    current_app.logger.info(f"[{func}] Metadata saved for {f.file_path}")
                 return {'file_path': f.file_path, 'meta_data': api_content}
+            except JobCancelled:
+                raise
             except Exception as e:
                 current_app.logger.error(
                     f"[{func}] Error processing metadata for {f.file_path}: {e}. Text snippet: {truncate_words(text, limit=20)}",
@@ -1,23 +1,30 @@
 import os
-import json
 from flask import current_app
-from utils.pinecone_client import PineconeClient
+from sqlalchemy import update
+from db.models import db, File
+from utils.pinecone_client import get_pinecone_client, pinecone_namespace
 from .text_extraction import extract_text_from_file
 from .chunking import chunk_text
-from .utils_flatten import flatten_values
 from utils.services.ai_api_manager import OpenAIService
+from utils.keyword_loader import file_keyword_values
+from services.job_queue import JobCancelled
+from services.vector_index import chunk_vector_id, delete_stale_chunks
 
 aii = OpenAIService()
 
-def upsert_file_to_vector_db(f, chunk_size: int = 1500, overlap: int = 200):
+def upsert_file_to_vector_db(f, chunk_size: int = 1500, overlap: int = 200, cancel_token=None, keywords=None):
     """
     Upserts embeddings for a single file with metadata to Pinecone in text chunks and marks it uploaded.
+    The number of chunks is recorded in f.vector_count; chunks left over from a
+    longer previous version of the file are deleted.
+    With a `cancel_token` the job is checked between chunks; on cancel the chunks
+    already upserted for this file are deleted and JobCancelled is raised.
+    `keywords` (the file's keyword values) can be passed in when they were read
+    for a whole batch; otherwise they are queried.
     """
     func = "upsert_file_to_vector_db"
-    namespace = os.getenv('PINECONE_NAMESPACE')
-    client = PineconeClient(
-        environment=os.getenv("PINECONE_ENV")
-    )
+    namespace = pinecone_namespace()
+    client = get_pinecone_client()
 
     if not os.path.exists(f.file_path):
         current_app.logger.warning(f"File not found: {f.file_path}")
@@ -31,45 +38,56 @@ def upsert_file_to_vector_db(f, chunk_size: int = 1500, overlap: int = 200):
     chunks = chunk_text(text, chunk_size=chunk_size, overlap=overlap)
     current_app.logger.info(f"Split {f.file_path} into {len(chunks)} chunks")
 
-    file_metadata = f.meta_data if isinstance(f.meta_data, dict) else {}
-
-    raw_keywords = []
-    keys_to_extract = ['locatie', 'data', 'domeniu', 'hotarare', 'legislatie', 'keywords']
-
-    for key in keys_to_extract:
-        val = file_metadata.get(key)
-        if val:
-            if isinstance(val, str):
-                try:
-                    parsed_val = json.loads(val)
-                    val = parsed_val
-                except Exception:
-                    pass
-            flattened = flatten_values(val)
-            raw_keywords.extend(flattened)
-
-    unique_keywords = list({str(k).lower() for k in raw_keywords if k})
+    unique_keywords = keywords if keywords is not None else file_keyword_values(f.id)
 
     results = []
-    for idx, chunk in enumerate(chunks):
-        prompt = f"Represent this document chunk for searching relevant passages: {chunk}"
-        try:
-            embeddings = aii.embeddings(prompt)
-            record = {
-                'id': f"{f.id}_chunk_{idx}",
-                'values': embeddings,
-                'metadata': {
-                    'source_text': chunk,
-                    'source_file': f.file_path,
-                    'chunk_index': idx,
-                    'text_snippet': chunk[:100],
-                    'keywords': unique_keywords
+    upserted_ids = []
+    try:
+        for idx, chunk in enumerate(chunks):
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
+            prompt = f"Represent this document chunk for searching relevant passages: {chunk}"
+            try:
+                embeddings = aii.embeddings(prompt)
+                if cancel_token is not None:
+                    cancel_token.raise_if_cancelled()
+                record = {
+                    'id': chunk_vector_id(f.id, idx),
+                    'values': embeddings,
+                    'metadata': {
+                        'source_text': chunk,
+                        'source_file': f.file_path,
+                        'chunk_index': idx,
+                        'text_snippet': chunk[:100],
+                        'keywords': unique_keywords
+                    }
                 }
-            }
-            vc_resp = client.upsert([record], namespace)
-            results.append({'file_path': f.file_path, 'chunk': idx, 'vector_response': vc_resp})
-        except Exception as e:
-            current_app.logger.error(f"Error upserting chunk {idx} of {f.file_path}: {e}", exc_info=True)
+                vc_resp = client.upsert([record], namespace)
+                upserted_ids.append(record['id'])
+                results.append({'file_path': f.file_path, 'chunk': idx, 'vector_response': vc_resp})
+            except JobCancelled:
+                raise
+            except Exception as e:
+                current_app.logger.error(f"Error upserting chunk {idx} of {f.file_path}: {e}", exc_info=True)
+        if cancel_token is not None:
+            cancel_token.raise_if_cancelled()
+    except JobCancelled:
+        if upserted_ids:
+            current_app.logger.info(f"Job cancelled; removing {len(upserted_ids)} partial vectors of {f.file_path}")
+            client.delete(ids=upserted_ids, namespace=namespace)
+        raise
 
+    delete_stale_chunks(f, len(chunks), client=client, namespace=namespace)
+    f.vector_count = len(chunks)
     f.is_uploaded = True
     return results
+
+
+def mark_file_uploaded(file_id: int, vector_count: int) -> None:
+    """
+    Record a finished upsert (the columns upsert_file_to_vector_db sets) without
+    loading the file. The caller commits.
+    """
+    db.session.execute(
+        update(File).where(File.id == file_id).values(is_uploaded=True, vector_count=vector_count)
+    )
@@ -1,14 +1,14 @@
-import os
 import json
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from pydantic import ValidationError
 from utils.logging import logger, log_call
 from schemas.file_processing import ProcessFolderSchema, CancelSchema
 from services.session_store import SessionStore, ProcessingSession
-from services.mp_init import get_pool, get_manager
+from services.mp_init import get_pool, get_manager, get_event_channel, worker_app_config
 from services.cleanup import SessionCleanup
-import threading
-from utils.services.ws_event_relay import ws_queue_relay
+from services.job_queue import enqueue_job, finish_job, resumable_jobs, release_job_leases
+from utils.services.ws_event_relay import get_event_bridge, start_event_bridge
+from utils.websockets.sockets import socketio
 
 file_bp = Blueprint("files", __name__, url_prefix="/files")
 sessions = None
@@ -49,55 +49,92 @@ def start_process_folder():
     session = session_store.create()
     logger.info("file_processing_routes.start_process_folder: Created session with ID: %s", session.session_id)
 
-    # Only WebSocket queue for events
-    session.ws_queue = get_manager().Queue()
-    logger.info("file_processing_routes.start_process_folder: WebSocket queue created for session %s", session.session_id)
+    enqueue_job(session.session_id, payload.folder_paths, payload.extensions, payload.priority)
+    submit_job(session, payload.folder_paths, payload.extensions)
+    return jsonify({"sessionId": session.session_id}), 202
+
+def submit_job(session, folder_paths, extensions):
+    """
+    Register the session with the event bridge (the single relay of worker
+    events to websocket rooms) and hand its (already persisted) job to the
+    multiprocessing pool.
+
+    A cancelled session is cleaned up only once the worker has stopped: on its
+    `cancelled` acknowledgement, or if the worker dies instead.
+    """
+    session.cancel_event = get_manager().Event()
+    app = current_app._get_current_object()
+    services = getattr(app, "services", None)
+
+    def cleanup_cancelled():
+        def run():
+            with app.app_context():
+                SessionCleanup(session).run()
+            session.final = {"error": "Processing cancelled by user"}
+            logger.info("file_processing_routes.submit_job: Cleanup complete for session %s", session.session_id)
+        # Off the bridge thread: vector deletes must not hold up other sessions' events
+        socketio.start_background_task(run)
 
-    stop_event = threading.Event()
-    relay_thread = threading.Thread(
-        target=ws_queue_relay,
-        args=(session.ws_queue, session.session_id, stop_event),
-        daemon=True,
+    bridge = get_event_bridge() or start_event_bridge(get_event_channel(), socketio)
+    bridge.register(
+        session.session_id,
+        on_keywords=services.apply_keyword_deltas if services else None,
+        on_files_added=session.file_items.extend,
+        on_cancelled=cleanup_cancelled,
     )
-    relay_thread.start()
-    logger.info("file_processing_routes.start_process_folder: WebSocket relay thread started for session %s", session.session_id)
-    session.ws_relay_thread = relay_thread
-    session.ws_stop_event = stop_event
 
     from features.file_processing.file_processing_service import process_folder_task
 
-    app_config = {
-        "SQLALCHEMY_DATABASE_URI": os.getenv("DATABASE_URI", "sqlite:///rag_chat.db"),
-        "SQLALCHEMY_TRACK_MODIFICATIONS": False,
-    }
+    app_config = worker_app_config()
 
     def log_worker_error(e):
-        logger.error("file_processing_routes.start_process_folder: process_folder_task failed: %s", e, exc_info=True)
+        logger.error("file_processing_routes.submit_job: process_folder_task failed: %s", e, exc_info=True)
+        if session.cancelled:
+            # No acknowledgement is coming from a dead worker
+            bridge.unregister(session.session_id)
+            cleanup_cancelled()
 
-    logger.info("file_processing_routes.start_process_folder: Getting multiprocessing pool")
+    logger.info("file_processing_routes.submit_job: Getting multiprocessing pool")
     pool = get_pool()
-    logger.info("file_processing_routes.start_process_folder: Pool object created: %s", str(pool))
+    logger.info("file_processing_routes.submit_job: Pool object created: %s", str(pool))
 
-    logger.info("file_processing_routes.start_process_folder: Enqueuing background job for session %s", session.session_id)
+    logger.info("file_processing_routes.submit_job: Enqueuing background job for session %s", session.session_id)
     pool.apply_async(
         process_folder_task,
         args=(
-            payload.folder_paths,
-            payload.extensions,
+            folder_paths,
+            extensions,
             session.session_id,
-            session.ws_queue,
+            None,  # events go through the worker's inherited event channel
             app_config,
+            session.cancel_event,
         ),
         error_callback=log_worker_error,
     )
-    logger.info("file_processing_routes.start_process_folder: Job enqueued for session %s", session.session_id)
-    return jsonify({"sessionId": session.session_id}), 202
+    logger.info("file_processing_routes.submit_job: Job enqueued for session %s", session.session_id)
+
+@log_call()
+def resume_pending_jobs():
+    """
+    Re-submit jobs that were queued or running when the app last stopped.
+    Call once at start-up, inside an app context, after the pool and session
+    store are set; workers of the previous run are gone, so their leases are dropped.
+    """
+    session_store = get_sessions()
+    jobs = resumable_jobs()
+    release_job_leases(job.id for job in jobs)
+    for job in jobs:
+        session = session_store.get(job.id) or session_store.create(session_id=job.id)
+        logger.info("file_processing_routes.resume_pending_jobs: Resuming job %s (status=%s)", job.id, job.status)
+        submit_job(session, job.folder_paths, job.extensions)
+    return [job.id for job in jobs]
 
 @file_bp.route("/process_folder/cancel", methods=["POST"])
 @log_call()
 def cancel_process_folder():
     """
-    Cancel an in-progress processing session and trigger cleanup.
+    Cancel an in-progress processing session. Cleanup runs once the worker
+    acknowledges the cancel and stops (see submit_job).
     """
     logger.info("file_processing_routes.cancel_process_folder: Received cancel request")
     try:
@@ -117,10 +154,10 @@ def cancel_process_folder():
         logger.warning("file_processing_routes.cancel_process_folder: Cancel requested for unknown session %s", payload.session_id)
         return jsonify({"error": {"code": 404, "message": "Session not found"}}), 404
 
+    # The worker polls both: the event for a prompt stop, the job row as the durable flag
     session.cancelled = True
-    logger.info("file_processing_routes.cancel_process_folder: Session %s marked as cancelled, starting cleanup", payload.session_id)
-    SessionCleanup(session).run()
-    session.ws_stop_event.set()
-    session.final = {"error": "Processing cancelled by user"}
-    logger.info("file_processing_routes.cancel_process_folder: Cleanup complete for session %s", payload.session_id)
+    if session.cancel_event is not None:
+        session.cancel_event.set()
+    finish_job(payload.session_id, "cancelled")  # never resumed after a restart
+    logger.info("file_processing_routes.cancel_process_folder: Session %s marked as cancelled; cleanup waits for the worker to stop", payload.session_id)
     return jsonify({"status": "cancelled"}), 200
@@ -1,145 +1,261 @@
 import logging
+from collections import deque
+from functools import partial
 from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any
-from flask import Flask
-from db.models import File, db
+from db.models import File, ProcessingJob, ProcessingTask, db
 from features.file_processing.file_pipeline import (
     scan_and_add_files_wrapper,
     process_file_for_metadata,
+    store_file_metadata,
     upsert_file_to_vector_db,
+    mark_file_uploaded,
+)
+from services.db_writer import DBWriter
+from utils.keyword_loader import file_keyword_deltas, file_keyword_values_by_file
+from services.mp_init import get_worker_app, get_event_channel
+from services.job_queue import (
+    worker_id,
+    claim_job,
+    heartbeat,
+    mark_scanned,
+    finish_job,
+    add_tasks,
+    lease_tasks,
+    complete_task,
+    fail_task,
+    cancel_open_tasks,
+    is_job_cancelled,
+    open_file_count,
+    job_summary,
+    CancellationToken,
+    JobCancelled,
 )
 
 logger = logging.getLogger("file_processing_service")
 
+TASK_THREADS = 10
+# Tasks leased per round; keep it small enough to finish within the lease.
+TASK_BATCH_SIZE = 20
+# Paths / ids read per query when selecting a job's files
+SELECT_BATCH_SIZE = 500
+
+def _stop_cancelled_job(session_id: str, ws_queue) -> None:
+    finish_job(session_id, "cancelled")
+    cancelled = cancel_open_tasks(session_id)
+    logger.info("file_processing_service.process_folder_task: Job %s cancelled; %d open tasks dropped", session_id, cancelled)
+    # Tell the web process this worker is done with the job's rows, so it can clean them up
+    ws_queue.put({"cancelled": True, "session_id": session_id})
+
+def _store_metadata(f: File, api_content) -> None:
+    # `f` is the detached file the task read; merge it without a SELECT
+    store_file_metadata(db.session.merge(f, load=False), api_content)
+
+def _complete_file_task(task_id: int, write=None) -> None:
+    # The file's new state and its task's completion commit together
+    if write is not None:
+        write()
+    complete_task(task_id)
+
+def _load_detached_files(file_ids: List[int]) -> Dict[int, File]:
+    """
+    Load a batch of files with one IN query and detach them, so the task threads
+    can read (and the pipeline steps set attributes on) them without a session.
+    """
+    files = File.query.filter(File.id.in_(file_ids)).all()
+    for f in files:
+        db.session.expunge(f)
+    return {f.id: f for f in files}
+
+def _needs_metadata(meta_data) -> bool:
+    # JSON null comes back as None; files without keywords were never fully processed
+    return not isinstance(meta_data, dict) or "keywords" not in meta_data
+
+def _queue_scanned_files(session_id: str, file_paths: List[str], priority: int) -> int:
+    """
+    Create the tasks for the files the job's scan found, new or already known:
+    a metadata task for files without keywords, and an upsert task straight
+    away for files that have them but are not uploaded. Only these paths are
+    read, `SELECT_BATCH_SIZE` at a time. Returns the number of files that got
+    a task (each gets at most one here, so this is also the tasks added).
+    """
+    added = 0
+    for start in range(0, len(file_paths), SELECT_BATCH_SIZE):
+        chunk = file_paths[start:start + SELECT_BATCH_SIZE]
+        rows = (
+            db.session.query(File.id, File.meta_data, File.is_uploaded)
+            .filter(File.file_path.in_(chunk))
+            .execution_options(yield_per=SELECT_BATCH_SIZE)
+        )
+        metadata_ids, upsert_ids = [], []
+        for file_id, meta_data, is_uploaded in rows:
+            if _needs_metadata(meta_data):
+                metadata_ids.append(file_id)
+            elif not is_uploaded:
+                upsert_ids.append(file_id)
+        added += add_tasks(session_id, metadata_ids, "metadata", priority=priority)
+        added += add_tasks(session_id, upsert_ids, "upsert", priority=priority)
+    return added
+
+def _queue_upserts(session_id: str, priority: int) -> int:
+    """
+    Add upsert tasks for the job's files whose metadata task is done and that
+    are not uploaded yet. Returns the number of tasks added.
+    """
+    rows = (
+        db.session.query(ProcessingTask.file_id)
+        .join(File, File.id == ProcessingTask.file_id)
+        .filter(
+            ProcessingTask.job_id == session_id,
+            ProcessingTask.phase == "metadata",
+            ProcessingTask.status == "done",
+            File.is_uploaded == False,  # noqa: E712
+        )
+        .execution_options(yield_per=SELECT_BATCH_SIZE)
+    )
+    # add_tasks commits, so read the ids before writing
+    file_ids = [file_id for (file_id,) in rows]
+    added = 0
+    for start in range(0, len(file_ids), SELECT_BATCH_SIZE):
+        added += add_tasks(session_id, file_ids[start:start + SELECT_BATCH_SIZE], "upsert", priority=priority)
+    return added
+
 def process_folder_task(
     folder_paths: List[str],
     extensions: List[str],
     session_id: str,
     ws_queue,
     app_config: Dict[str, Any],
+    cancel_event=None,
 ) -> None:
     """
-    Worker process: scans folders, processes files in parallel, and puts websocket events on ws_queue.
+    Worker process: scans folders, processes files in parallel, and puts websocket events on
+    ws_queue (by default the event channel this worker inherited from the pool initializer).
     This version always queries model objects inside worker app contexts to avoid SQLAlchemy threading/session issues.
-    """
-    import os
-    import logging
-    project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
-    log_path = r"c:/code/lbp2/backend/instance/logs/app.log"
-    log_dir = os.path.dirname(log_path)
-    os.makedirs(log_dir, exist_ok=True)
-    file_handler = logging.FileHandler(log_path)
-    file_handler.setFormatter(logging.Formatter(
-        "{"
-        "\"timestamp\": \"%(asctime)s\", "
-        "\"level\": \"%(levelname)s\", "
-        "\"module\": \"%(module)s\", "
-        "\"funcName\": \"%(funcName)s\", "
-        "\"lineno\": %(lineno)d, "
-        "\"message\": \"%(message)s\""
-        "}"
-    ))
-    root_logger = logging.getLogger()
-    root_logger.setLevel(logging.INFO)
-    if not any(isinstance(h, logging.FileHandler) and h.baseFilename == file_handler.baseFilename for h in root_logger.handlers):
-        root_logger.addHandler(file_handler)
-    logger.addHandler(file_handler)
 
+    Work is tracked in the durable job queue (services.job_queue): the job row is
+    leased by this worker and every file/phase is a task row, so a job interrupted
+    by a crash or restart resumes with only the tasks that are not done yet.
+
+    Cancellation is cooperative: `cancel_event` (set by the web process) and the
+    job's 'cancelled' status are checked between folders, batches, files and
+    vector chunks. The file in flight is rolled back (its partial vectors are
+    deleted and its DB changes discarded) and the job's open tasks are cancelled.
+    Files this job added are reported with a `files_added` message so the web
+    process can clean them up; if the cancel lands during the scan the worker
+    removes them itself.
+
+    A job only selects the files its own scan found (by path, then by its own
+    task rows), so its cost follows the job's size rather than the table's.
+
+    The task threads do no database I/O: files are read a batch at a time and
+    results are written behind through one DBWriter thread, which commits them
+    in transactions of up to DB_WRITE_BATCH_SIZE rows or every
+    DB_WRITE_BATCH_SECONDS.
+    """
     logger.info("file_processing_service.process_folder_task: Task started for session %s (folders=%s, exts=%s)", session_id, folder_paths, extensions)
 
-    app = Flask(__name__)
-    app.config.update(app_config)
-    db.init_app(app)
+    # One app / engine per worker process (built by the pool initializer)
+    app = get_worker_app(app_config)
+    if ws_queue is None:
+        ws_queue = get_event_channel()
 
     with app.app_context():
+        owner = worker_id()
+        token = CancellationToken(session_id, cancel_event)
+        if not claim_job(session_id, owner):
+            logger.warning("file_processing_service.process_folder_task: Job %s is finished or leased by another worker; skipping", session_id)
+            if is_job_cancelled(session_id):
+                # Cancelled before this worker started it: nothing runs that the cleanup must wait for
+                ws_queue.put({"cancelled": True, "session_id": session_id})
+            return
+        job = db.session.get(ProcessingJob, session_id)
+
         # --- Scan Phase ---
-        logger.info("file_processing_service.process_folder_task: Starting scan phase for folders: %s", folder_paths)
-        all_added: List[Any] = []
-        for folder in folder_paths:
-            logger.info("file_processing_service.process_folder_task: Scanning folder: %s", folder)
-            try:
-                res = scan_and_add_files_wrapper(folder, extensions)
-                logger.info("file_processing_service.process_folder_task: Scan result for folder %s: %s", folder, res)
-                all_added.extend(res.get("added", []))
-            except Exception as e:
-                logger.error("file_processing_service.process_folder_task: Error scanning folder %s: %s", folder, e)
-        logger.info("file_processing_service.process_folder_task: Scan phase complete. Files added: %d", len(all_added))
-
-        ws_queue.put({"upload_started": len(all_added), "session_id": session_id})
-
-        files = all_added
-        total = max(len(files), 1)
-
-        # --- Metadata Extraction Phase ---
-        logger.info("file_processing_service.process_folder_task: Starting metadata extraction phase")
-        meta_files = File.query.all()
-        to_process = [f.id for f in meta_files if f.meta_data is None or (isinstance(f.meta_data, dict) and "keywords" not in f.meta_data)]
-        logger.info("file_processing_service.process_folder_task: Files to process for metadata: %d", len(to_process))
-        results = []
-        app_ctx = Flask(__name__)
-        app_ctx.config.update(app_config)
-        db_ctx = db
-        db_ctx.init_app(app_ctx)
-
-        def process_file_with_context(file_id):
-            with app_ctx.app_context():
+        if not job.scanned:
+            logger.info("file_processing_service.process_folder_task: Starting scan phase for folders: %s", folder_paths)
+            all_added: List[Any] = []
+            all_skipped: List[Any] = []
+            for folder in folder_paths:
+                if token.is_cancelled():
+                    break
+                logger.info("file_processing_service.process_folder_task: Scanning folder: %s", folder)
+                try:
+                    res = scan_and_add_files_wrapper(folder, extensions)
+                    logger.info("file_processing_service.process_folder_task: Scan result for folder %s: %s", folder, res)
+                    all_added.extend(res.get("added", []))
+                    all_skipped.extend(res.get("skipped", []))
+                except Exception as e:
+                    logger.error("file_processing_service.process_folder_task: Error scanning folder %s: %s", folder, e)
+            logger.info("file_processing_service.process_folder_task: Scan phase complete. Files added: %d", len(all_added))
+            if token.is_cancelled():
+                # The web process has not been told about these files yet
+                if all_added:
+                    File.query.filter(File.file_path.in_(all_added)).delete(synchronize_session=False)
+                    db.session.commit()
+                _stop_cancelled_job(session_id, ws_queue)
+                return
+            added_ids = [fid for (fid,) in db.session.query(File.id).filter(File.file_path.in_(all_added))] if all_added else []
+            ws_queue.put({"files_added": added_ids, "session_id": session_id})
+
+            # Only the files under this job's folders; other sessions' leftovers are theirs
+            queued = _queue_scanned_files(session_id, all_added + all_skipped, job.priority)
+            logger.info("file_processing_service.process_folder_task: %d of %d scanned files need processing", queued, len(all_added) + len(all_skipped))
+            mark_scanned(session_id)
+            ws_queue.put({"upload_started": queued, "session_id": session_id})
+        else:
+            # Files whose metadata finished before the restart still need their upsert task,
+            # so every file left is counted once in the progress total
+            _queue_upserts(session_id, job.priority)
+            remaining = open_file_count(session_id)
+            logger.info("file_processing_service.process_folder_task: Resuming job %s with %d files left", session_id, remaining)
+            ws_queue.put({"upload_started": remaining, "session_id": session_id})
+
+        def process_file_with_context(f, context):
+            if token.is_cancelled():
+                return None
+            with app.app_context():
                 try:
-                    f = File.query.get(file_id)
-                    if f is None:
-                        logger.warning("File with id %s not found for metadata processing", file_id)
-                        return (str(file_id), False, "File not found")
                     logger.info("file_processing_service.process_folder_task: Processing file for metadata: %s", f.file_path)
-                    result = process_file_for_metadata(f)
-                    db_ctx.session.commit()  # Commit after processing metadata
+                    result = process_file_for_metadata(f, cancel_token=token, store=False)
+                    if result is None:
+                        return (f.file_path, False, "Metadata extraction failed", None)
+                    token.raise_if_cancelled()
                     logger.info("file_processing_service.process_folder_task: Successfully processed metadata for: %s", f.file_path)
-                    return (f.file_path, True, None)
+                    return (f.file_path, True, None, partial(_store_metadata, f, result["meta_data"]))
+                except JobCancelled:
+                    logger.info("file_processing_service.process_folder_task: Metadata for file %s discarded (job cancelled)", f.id)
+                    return None
                 except Exception as e:
-                    db_ctx.session.rollback()
-                    logger.error("file_processing_service.process_folder_task: Error processing file %s: %s", file_id, e)
-                    return (str(file_id), False, str(e))
-
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            for res in executor.map(process_file_with_context, to_process):
-                results.append(res)
-
-        # --- Vector Upsert Phase ---
-        logger.info("file_processing_service.process_folder_task: Starting vector upsert phase")
-        upsert_files = File.query.filter(File.meta_data.isnot(None), File.is_uploaded == False).all()
-        upsert_file_ids = [f.id for f in upsert_files]
-        logger.info("file_processing_service.process_folder_task: Files to upsert to vector DB: %d", len(upsert_file_ids))
-
-        def upsert_file_with_context(file_id):
-            with app_ctx.app_context():
+                    logger.error("file_processing_service.process_folder_task: Error processing file %s: %s", f.id, e)
+                    return (f.file_path, False, str(e), None)
+
+        def upsert_file_with_context(f, context):
+            if token.is_cancelled():
+                return None
+            with app.app_context():
                 try:
-                    f = File.query.get(file_id)
-                    if f is None:
-                        logger.warning("File with id %s not found for vector upsert", file_id)
-                        return (str(file_id), False, "File not found")
                     logger.info("file_processing_service.process_folder_task: Upserting file to vector DB: %s", f.file_path)
-                    result = upsert_file_to_vector_db(f)
-                    db_ctx.session.commit()  # Commit after vector upsert
+                    result = upsert_file_to_vector_db(f, cancel_token=token, keywords=context["keywords"].get(f.id, []))
                     logger.info("file_processing_service.process_folder_task: Successfully upserted: %s", f.file_path)
-                    return (f.file_path, True, None)
+                    write = partial(mark_file_uploaded, f.id, f.vector_count) if result is not None else None
+                    return (f.file_path, True, None, write)
+                except JobCancelled:
+                    logger.info("file_processing_service.process_folder_task: Upsert of file %s rolled back (job cancelled)", f.id)
+                    return None
                 except Exception as e:
-                    db_ctx.session.rollback()
-                    logger.error("file_processing_service.process_folder_task: Error upserting file %s: %s", file_id, e)
-                    return (str(file_id), False, str(e))
-
-        upsert_results = []
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            for res in executor.map(upsert_file_with_context, upsert_file_ids):
-                upsert_results.append(res)
-
-        # --- Combine Results, WebSocket Events, and Summary ---
-        logger.info("file_processing_service.process_folder_task: Combining results")
-        combined_results = {}
-        for file_path, success, error in results:
-            combined_results[file_path] = (success, error)
-        for file_path, success, error in upsert_results:
-            combined_results[file_path] = (success, error)
-
-        logger.info("file_processing_service.process_folder_task: Sending per-file websocket events")
-        for file_path, (success, error) in combined_results.items():
+                    logger.error("file_processing_service.process_folder_task: Error upserting file %s: %s", f.id, e)
+                    return (f.file_path, False, str(e), None)
+
+        def upsert_context(file_ids):
+            # Chunk metadata for the whole batch in one query
+            return {"keywords": file_keyword_values_by_file(file_ids)}
+
+        def publish_keywords(file_ids):
+            # Let the web process add the files to its live keyword index
+            ws_queue.put({"keywords_delta": file_keyword_deltas(file_ids), "session_id": session_id})
+
+        def report(file_path, success, error):
             ws_queue.put({
                 "file": file_path,
                 "success": success,
@@ -147,20 +263,101 @@ def process_folder_task(
                 "session_id": session_id,
             })
 
-        total_files = len(combined_results)
-        uploaded_files = sum(1 for success, _ in combined_results.values() if success)
-        failed_files = [
-            {"file_name": file_path, "error": error}
-            for file_path, (success, error) in combined_results.items()
-            if not success
-        ]
-        summary = {
-            "total_files": total_files,
-            "uploaded_files": uploaded_files,
-            "failed_files": failed_files,
-        }
+        def run_phase(phase, handler, report_success, batch_context=None, on_committed=None):
+            """
+            Lease batches of this job's tasks for `phase` until none are runnable.
+            Each batch's files (and `batch_context(file_ids)`) are read with one
+            query and handed to the task threads detached, so the threads do no
+            database I/O. Their results are written behind by the DBWriter:
+            a file's state change and its task's completion commit together, in
+            transactions shared with other files; failed tasks go back to pending
+            until they run out of attempts. If storing a result fails, the task
+            is failed instead; if that fails too, the file is reported failed.
+            Final per-file results are reported once committed (the web process
+            coalesces them into progress frames); successes only when
+            `report_success`, so a file is counted once across phases, and the
+            committed files are passed to `on_committed`.
+            Stops leasing once the job is cancelled; handlers return None for
+            files they skipped or rolled back, and those tasks stay open.
+            """
+            pending = deque()
+
+            def settle(wait):
+                committed = []
+                while pending and (wait or pending[0][0].done()):
+                    future, task_id, file_id, file_path, success, error, recovering = pending.popleft()
+                    try:
+                        outcome = future.result()
+                    except Exception as e:
+                        logger.error("file_processing_service.process_folder_task: Storing result of file %s failed: %s", file_id, e)
+                        if recovering:
+                            # Recording the failure failed as well; give up on the file
+                            report(file_path, False, str(e))
+                        else:
+                            pending.append((writer.submit(fail_task, task_id, str(e)), task_id, file_id, file_path, False, str(e), True))
+                        continue
+                    if success:
+                        committed.append(file_id)
+                        if report_success:
+                            report(file_path, True, None)
+                    elif not outcome:
+                        report(file_path, False, error)
+                if committed and on_committed is not None:
+                    on_committed(committed)
+
+            with ThreadPoolExecutor(max_workers=TASK_THREADS) as executor:
+                while not token.is_cancelled():
+                    leased = lease_tasks(session_id, phase, limit=TASK_BATCH_SIZE, owner=owner)
+                    if not leased:
+                        if not pending:
+                            break
+                        # Failed tasks become runnable again once their results commit
+                        settle(wait=True)
+                        continue
+                    heartbeat(session_id, owner)
+                    file_ids = [file_id for _, file_id in leased]
+                    files = _load_detached_files(file_ids)
+                    context = batch_context(file_ids) if batch_context else {}
+                    outcomes = executor.map(
+                        lambda file_id: handler(files[file_id], context) if file_id in files
+                        else (str(file_id), False, "File not found", None),
+                        file_ids,
+                    )
+                    for (task_id, file_id), outcome in zip(leased, outcomes):
+                        if outcome is None:
+                            continue
+                        file_path, success, error, write = outcome
+                        if success:
+                            future = writer.submit(_complete_file_task, task_id, write)
+                        else:
+                            future = writer.submit(fail_task, task_id, error)
+                        pending.append((future, task_id, file_id, file_path, success, error, False))
+                    settle(wait=False)
+                settle(wait=True)
+
+        with DBWriter(app) as writer:
+            # --- Metadata Extraction Phase ---
+            logger.info("file_processing_service.process_folder_task: Starting metadata extraction phase")
+            run_phase("metadata", process_file_with_context, report_success=False)
+            if token.is_cancelled():
+                _stop_cancelled_job(session_id, ws_queue)
+                return
+
+            # --- Vector Upsert Phase ---
+            logger.info("file_processing_service.process_folder_task: Starting vector upsert phase")
+            queued = _queue_upserts(session_id, job.priority)
+            logger.info("file_processing_service.process_folder_task: Files to upsert to vector DB: %d", queued)
+            run_phase("upsert", upsert_file_with_context, report_success=True,
+                      batch_context=upsert_context, on_committed=publish_keywords)
+            if token.is_cancelled():
+                _stop_cancelled_job(session_id, ws_queue)
+                return
+
+        # Summary covers every run of the job, including work done before a restart
+        summary = job_summary(session_id)
+        finish_job(session_id, "completed")
         ws_queue.put({"complete": True, "summary": summary, "session_id": session_id})
         logger.info(
             "file_processing_service.process_folder_task: Task complete for session %s (total_files=%d, uploaded_files=%d, failed_files=%d)",
-            session_id, total_files, uploaded_files, len(failed_files)
+            session_id, summary["total_files"], summary["uploaded_files"], len(summary["failed_files"])
         )
@@ -0,0 +1,105 @@
+"""Add file_keyword table and backfill it from file.meta_data
+
+Revision ID: ed8d57201157
+Revises: 749788d22034
+Create Date: 2026-10-19 09:12:41.530218
+
+"""
+import re
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'ed8d57201157'
+down_revision = '749788d22034'
+branch_labels = None
+depends_on = None
+
+
+def _parse(raw):
+    # Frozen copy of utils.keyword_loader.parse_keyword_blob at the time of this revision.
+    if isinstance(raw, dict):
+        return raw
+    if isinstance(raw, (list, tuple)):
+        return {'cuvinte_cheie': list(raw)}
+    if isinstance(raw, str):
+        match = re.search(r"(\{.*\})", raw, re.DOTALL)
+        if match:
+            try:
+                parsed = json.loads(match.group(1))
+                return parsed if isinstance(parsed, dict) else {}
+            except json.JSONDecodeError:
+                pass
+    return {}
+
+
+def _flatten(value):
+    if isinstance(value, dict):
+        return [v for item in value.values() for v in _flatten(item)]
+    if isinstance(value, (list, tuple)):
+        return [v for item in value for v in _flatten(item)]
+    return [value]
+
+
+def _rows(file_id, raw):
+    rows, seen = [], set()
+    for topic, value in _parse(raw).items():
+        topic = str(topic).strip().lower()
+        if topic == 'keywords':
+            topic = 'cuvinte_cheie'
+        for v in _flatten(value):
+            if v is None or not str(v).strip():
+                continue
+            norm = " ".join(str(v).split()).lower()[:255]
+            if (topic, norm) in seen:
+                continue
+            seen.add((topic, norm))
+            rows.append({'file_id': file_id, 'topic': topic, 'value': str(v).strip(), 'normalized_value': norm})
+    return rows
+
+
+def upgrade():
+    file_keyword = op.create_table('file_keyword',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('file_id', sa.Integer(), nullable=False),
+    sa.Column('topic', sa.String(length=64), nullable=False),
+    sa.Column('value', sa.Text(), nullable=False),
+    sa.Column('normalized_value', sa.String(length=255), nullable=False),
+    sa.ForeignKeyConstraint(['file_id'], ['file.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('file_keyword', schema=None) as batch_op:
+        batch_op.create_index('ix_file_keyword_file_id', ['file_id'], unique=False)
+        batch_op.create_index('ix_file_keyword_topic', ['topic'], unique=False)
+        batch_op.create_index('ix_file_keyword_normalized_value', ['normalized_value', 'file_id'], unique=False)
+
+    # Backfill from the JSON-in-string records already stored on files.
+    conn = op.get_bind()
+    file_table = sa.table('file', sa.column('id', sa.Integer), sa.column('meta_data', sa.JSON))
+    batch = []
+    for file_id, meta in conn.execute(sa.select(file_table.c.id, file_table.c.meta_data)):
+        if isinstance(meta, str):
+            try:
+                meta = json.loads(meta)
+            except json.JSONDecodeError:
+                continue
+        if not isinstance(meta, dict) or not meta.get('keywords'):
+            continue
+        batch.extend(_rows(file_id, meta['keywords']))
+        if len(batch) >= 5000:
+            op.bulk_insert(file_keyword, batch)
+            batch = []
+    if batch:
+        op.bulk_insert(file_keyword, batch)
+
+
+def downgrade():
+    with op.batch_alter_table('file_keyword', schema=None) as batch_op:
+        batch_op.drop_index('ix_file_keyword_normalized_value')
+        batch_op.drop_index('ix_file_keyword_topic')
+        batch_op.drop_index('ix_file_keyword_file_id')
+
+    op.drop_table('file_keyword')
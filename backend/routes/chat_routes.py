@@ -1,14 +1,31 @@
 # routes/chat_routes.py
 from flask import Blueprint, request, jsonify, current_app
+from db.pagination import InvalidCursor
 from utils.comms import (
     get_all_conversation_ids,
-    get_all_messages_for_conversation,
+    get_messages_page,
     delete_conversation,
     rename_conversation,
+    list_conversations,
 )
-from utils.emitters.emitters import emitters
 
-def create_chat_blueprint(conv_manager):
+LIST_PAGE_SIZE = 50
+LIST_MAX_PAGE_SIZE = 200
+
+
+def page_args():
+    """
+    (limit, cursor) from the query string; limit is clamped to 1..LIST_MAX_PAGE_SIZE.
+    """
+    limit = request.args.get('limit', LIST_PAGE_SIZE, type=int)
+    return max(1, min(limit, LIST_MAX_PAGE_SIZE)), request.args.get('cursor') or None
+
+
+def create_chat_blueprint(services):
+    """
+    `services` is the app's ServiceContainer; the conversation manager is
+    resolved per request so it is only built when the first message arrives.
+    """
     bp = Blueprint('chat', __name__, url_prefix='/conversation')
 
     @bp.route('/chat', methods=['POST'])
@@ -16,7 +33,7 @@ def create_chat_blueprint(conv_manager):
         data = request.get_json() or {}
         print(data)
         try:
-            result = conv_manager.handle_frontend_message(
+            result = services.conv_manager.handle_frontend_message(
                 text=data['message'],
                 conversation_id=data.get('conversation_id'),
                 additional_params=data.get('params'),
@@ -38,8 +55,11 @@ def create_chat_blueprint(conv_manager):
     @bp.route('/<int:conversation_id>/messages', methods=['GET'])
     def get_conversation_messages(conversation_id):
         try:
-            msgs = get_all_messages_for_conversation(conversation_id)
-            return jsonify({'messages': msgs}), 200
+            limit, cursor = page_args()
+            msgs, next_cursor = get_messages_page(conversation_id, limit, cursor)
+            return jsonify({'messages': msgs, 'next_cursor': next_cursor}), 200
+        except InvalidCursor as e:
+            return jsonify({'error': str(e)}), 400
         except Exception:
             current_app.logger.error(f'Error fetching messages for {conversation_id}', exc_info=True)
             return jsonify({'error': 'Failed to retrieve messages.'}), 500
@@ -51,8 +71,8 @@ def create_chat_blueprint(conv_manager):
         if not convo_id:
             return jsonify({'error': 'Conversation ID is required.'}), 400
         try:
+            # conversation_deleted is emitted by the emitters once committed
             res = delete_conversation(convo_id)
-            emitters.emit_all_conversations()
             status = 200 if 'message' in res else 400
             return jsonify(res), status
         except Exception:
@@ -69,7 +89,6 @@ def create_chat_blueprint(conv_manager):
         try:
             res = rename_conversation(convo_id, new_title)
             if 'message' in res:
-                emitters.emit_conversation_update(convo_id)
                 return jsonify(res), 200
             return jsonify(res), 400
         except Exception:
@@ -77,18 +96,13 @@ def create_chat_blueprint(conv_manager):
             return jsonify({'error': 'Internal server error'}), 500
 
     @bp.route('/list', methods=['GET'])
-    def list_conversations():
+    def list_conversations_route():
         try:
-            from db.models import Conversation
-            convos = Conversation.query.all()
-            conv_list = [{
-                'id': c.id,
-                'title': c.title,
-                'meta_data': c.meta_data,
-                'created_at': c.created_at.isoformat() if c.created_at else None,
-                'updated_at': c.updated_at.isoformat() if c.updated_at else None,
-            } for c in convos]
-            return jsonify({'conversations': conv_list}), 200
+            limit, cursor = page_args()
+            conv_list, next_cursor = list_conversations(limit, cursor)
+            return jsonify({'conversations': conv_list, 'next_cursor': next_cursor}), 200
+        except InvalidCursor as e:
+            return jsonify({'error': str(e)}), 400
         except Exception:
             current_app.logger.error('Error fetching conversations', exc_info=True)
             return jsonify({'error': 'Failed to fetch conversations.'}), 500
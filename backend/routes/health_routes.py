@@ -0,0 +1,14 @@
+from flask import Blueprint, jsonify, current_app
+
+# Liveness / readiness probes. The RAG services are built after start-up,
+# so the UI can poll /health/ready before enabling chat.
+health_bp = Blueprint('health', __name__)
+
+@health_bp.route('/live', methods=['GET'])
+def live():
+    return jsonify({'status': 'ok'})
+
+@health_bp.route('/ready', methods=['GET'])
+def ready():
+    status = current_app.services.status()
+    return jsonify(status), (200 if status['ready'] else 503)
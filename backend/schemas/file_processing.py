@@ -7,6 +7,8 @@ class ProcessFolderSchema(BaseModel):
     """
     folder_paths: List[str] = Field(..., min_items=1)
     extensions: List[str] = Field(..., min_items=1)
+    # Higher runs first when tasks are leased and when jobs resume after a restart.
+    priority: int = 0
 
 class CancelSchema(BaseModel):
     """
@@ -1,12 +1,13 @@
-import os
 from sqlalchemy.orm import sessionmaker
-from db.models import File, db
+from db.models import File, FileKeyword, ProcessingTask, db
 from utils.logging import logger, log_call
-from utils.pinecone_client import PineconeClient
+from services.vector_index import delete_file_vectors
+from utils.pinecone_client import pinecone_namespace
 
 class SessionCleanup:
     """
     Cleanup helper — deletes DB rows and Pinecone vectors for a session.
+    Vectors are deleted by their chunk ids ("{file_id}_chunk_{idx}").
     """
     def __init__(self, session):
         self.session = session
@@ -30,36 +31,38 @@ class SessionCleanup:
             elif isinstance(x, str):
                 paths.append(x)
 
-        if paths and not ids:
-            db_sess = self.SessionLocal()
-            files = db_sess.query(File).filter(File.file_path.in_(paths)).all()
-            ids = [f.id for f in files]
-            db_sess.close()
-            logger.debug("Resolved %d DB IDs from file paths", len(ids))
-
-        if not ids:
-            logger.warning(
-                "Nothing to delete from Pinecone / DB for session %s",
-                self.session.session_id,
-            )
-            return
-
-        # Delete vectors from Pinecone
-        try:
-            namespace = os.getenv("PINECONE_NAMESPACE", "default-namespace")
-            PineconeClient().delete(ids=[str(i) for i in ids], namespace=namespace)
-            logger.info(
-                "Deleted %d vectors from Pinecone (namespace=%s)", len(ids), namespace
-            )
-        except Exception as e:
-            logger.exception("Pinecone deletion error: %s", e)
-
-        # Delete rows from DB
         db_sess = self.SessionLocal()
         try:
-            db_sess.query(File).filter(File.id.in_(ids)).delete(synchronize_session=False)
+            query = db_sess.query(File)
+            if ids:
+                files = query.filter(File.id.in_(ids)).all()
+            else:
+                files = query.filter(File.file_path.in_(paths)).all()
+            logger.debug("Resolved %d files for session %s", len(files), self.session.session_id)
+            if not files:
+                logger.warning(
+                    "Nothing to delete from Pinecone / DB for session %s",
+                    self.session.session_id,
+                )
+                return
+
+            # Delete the files' chunk vectors from Pinecone
+            try:
+                namespace = pinecone_namespace()
+                deleted = delete_file_vectors(files, namespace=namespace)
+                logger.info(
+                    "Deleted %d vectors from Pinecone (namespace=%s)", deleted, namespace
+                )
+            except Exception as e:
+                logger.exception("Pinecone deletion error: %s", e)
+
+            # Delete rows from DB (dependent rows first: the bulk delete skips ORM cascades)
+            file_ids = [f.id for f in files]
+            for model in (FileKeyword, ProcessingTask):
+                db_sess.query(model).filter(model.file_id.in_(file_ids)).delete(synchronize_session=False)
+            db_sess.query(File).filter(File.id.in_(file_ids)).delete(synchronize_session=False)
             db_sess.commit()
-            logger.info("Deleted %d rows from DB", len(ids))
+            logger.info("Deleted %d rows from DB", len(file_ids))
         except Exception as e:
             db_sess.rollback()
             logger.exception("DB deletion error: %s", e)
@@ -0,0 +1,143 @@
+import os
+import time
+import threading
+from typing import Any, Callable, Dict, List, Optional
+from utils.logging import logger, log_call
+
+# "lazy" (default) builds the RAG services on first request, "background" right
+# after start-up without blocking it, "eager" inside create_app.
+DEFAULT_WARMUP_MODE = os.getenv("SERVICES_WARMUP", "lazy")
+
+
+class ServiceContainer:
+    """
+    Lazily constructed RAG services (OpenAI client, keyword index, query
+    processor, search router, conversation manager).
+
+    Importing openai/pinecone and loading the keyword index cost seconds, so
+    nothing is built in create_app; each service is created on first access
+    (or by `start_warm_up` in a background task) and then reused.
+    """
+
+    def __init__(self, app, socketio):
+        self.app = app
+        self.socketio = socketio
+        self._services: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+        self._ready = threading.Event()
+        self._error: Optional[str] = None
+        self._build_seconds: Optional[float] = None
+
+    def _get(self, name: str, factory: Callable[[], Any]) -> Any:
+        service = self._services.get(name)
+        if service is None:
+            with self._lock:
+                service = self._services.get(name)
+                if service is None:
+                    service = factory()
+                    self._services[name] = service
+        return service
+
+    @property
+    def ai_service(self):
+        def build():
+            from utils.services.ai_api_manager import OpenAIService
+            return OpenAIService()
+        return self._get("ai_service", build)
+
+    @property
+    def notifier(self):
+        def build():
+            from utils.services.conversation_manager import SocketNotifier
+            return SocketNotifier(self.socketio, self.app)
+        return self._get("notifier", build)
+
+    @property
+    def keyword_search(self):
+        def build():
+            from utils.search import KeywordSearch
+            from utils.keyword_loader import load_keyword_items
+            with self.app.app_context():
+                return KeywordSearch(load_keyword_items())
+        return self._get("keyword_search", build)
+
+    @property
+    def query_processor(self):
+        def build():
+            from utils.services.agentic.query_processor import QueryProcessor
+            from utils.keyword_loader import build_keyword_topics
+            with self.app.app_context():
+                topics = build_keyword_topics()
+            return QueryProcessor(self.ai_service, topics)
+        return self._get("query_processor", build)
+
+    @property
+    def search_router(self):
+        def build():
+            from utils.search import HybridSearch
+            from utils.services.agentic.search_router import SearchRouter
+            return SearchRouter(self.query_processor, self.keyword_search, HybridSearch())
+        return self._get("search_router", build)
+
+    @property
+    def conv_manager(self):
+        def build():
+            from db.models import db
+            from utils.services.conversation_manager import ConversationManager
+            return ConversationManager(db.session, self.ai_service, self.search_router, self.notifier)
+        manager = self._get("conv_manager", build)
+        if not self._ready.is_set():
+            # Ready however it was built: by warm_up, or lazily on first request
+            self._error = None
+            self._ready.set()
+        return manager
+
+    def apply_keyword_deltas(self, deltas: List[Dict[str, Any]]) -> None:
+        """
+        Apply (file_id, keywords, topics) deltas published by the ingestion worker
+        to the live keyword index and topic list. Services not built yet need
+        nothing: they read the database when they are first created.
+        """
+        with self._lock:
+            keyword_search = self._services.get("keyword_search")
+            query_processor = self._services.get("query_processor")
+            if keyword_search is not None:
+                keyword_search.apply_deltas(deltas)
+            if query_processor is not None:
+                query_processor.add_topics([t for d in deltas for t in d.get("topics", ())])
+        logger.debug("Applied %d keyword deltas", len(deltas))
+
+    @log_call()
+    def warm_up(self) -> None:
+        """
+        Build every service now. Safe to call more than once.
+        """
+        started = time.perf_counter()
+        try:
+            self.conv_manager
+        except Exception as e:
+            self._error = str(e)
+            logger.exception("Service warm-up failed: %s", e)
+            return
+        self._build_seconds = time.perf_counter() - started
+        self._error = None
+        self._ready.set()
+        logger.info("RAG services ready in %.2fs", self._build_seconds)
+
+    def start_warm_up(self) -> None:
+        """
+        Build the services in a background task so start-up does not wait for them.
+        """
+        self.socketio.start_background_task(self.warm_up)
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "services": sorted(self._services),
+            "build_seconds": self._build_seconds,
+            "error": self._error,
+        }
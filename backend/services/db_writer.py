@@ -0,0 +1,135 @@
+import os
+import queue
+import time
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional, Tuple
+from db.models import db
+from utils.logging import logger
+
+# Writes committed together in one transaction, and how long the writer waits
+# for more writes after the first one arrives (writers that wait on their
+# future wait this long at most).
+WRITE_BATCH_SIZE = int(os.getenv("DB_WRITE_BATCH_SIZE", 200))
+WRITE_BATCH_SECONDS = float(os.getenv("DB_WRITE_BATCH_SECONDS", 0.5))
+
+_STOP = object()
+
+Write = Tuple[Callable[..., Any], tuple, dict, Future]
+
+
+class DBWriter:
+    """
+    Single writer thread for one worker process' database writes.
+
+    SQLite allows one writer at a time, so the task threads of a job hand their
+    writes to this thread instead of each committing on its own connection and
+    queueing on the database lock. Writes that arrive together (up to
+    `batch_size`, or within `max_delay` of the first) are applied in
+    submission order on the writer's session and committed as one transaction.
+
+    `submit` returns a Future that resolves once the write is committed, with
+    the write's return value. If one write of a batch raises, the batch is
+    rolled back and replayed one write per transaction, so only the failing
+    write's future gets the exception.
+    """
+
+    def __init__(self, app, batch_size: int = WRITE_BATCH_SIZE, max_delay: float = WRITE_BATCH_SECONDS):
+        self.app = app
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self.batches = 0
+
+    def start(self) -> "DBWriter":
+        self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+        self._thread.start()
+        return self
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        """
+        Queue `fn(*args, **kwargs)` to run on the writer's session (`db.session`
+        inside the writer thread). `fn` must not commit.
+        """
+        if self._thread is None:
+            raise RuntimeError("DBWriter is not running")
+        future: Future = Future()
+        self._queue.put((fn, args, kwargs, future))
+        return future
+
+    def stop(self) -> None:
+        """
+        Commit everything submitted so far and stop the thread.
+        """
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._thread = None
+
+    def __enter__(self) -> "DBWriter":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _run(self) -> None:
+        with self.app.app_context():
+            try:
+                stopping = False
+                while not stopping:
+                    item = self._queue.get()
+                    if item is _STOP:
+                        break
+                    batch: List[Write] = [item]
+                    deadline = time.monotonic() + self.max_delay
+                    while len(batch) < self.batch_size:
+                        try:
+                            item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                        except queue.Empty:
+                            break
+                        if item is _STOP:
+                            stopping = True
+                            break
+                        batch.append(item)
+                    self._write(batch)
+            finally:
+                db.session.remove()
+
+    def _write(self, batch: List[Write]) -> None:
+        batch = [w for w in batch if w[3].set_running_or_notify_cancel()]
+        if not batch:
+            return
+        self.batches += 1
+        results = []
+        try:
+            # ORM changes are flushed once, at commit, so the database write lock
+            # is held for the flush rather than from the batch's first query on
+            with db.session.no_autoflush:
+                for fn, args, kwargs, _ in batch:
+                    results.append(fn(*args, **kwargs))
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            if len(batch) == 1:
+                batch[0][3].set_exception(e)
+                return
+            logger.warning("DBWriter: batch of %d writes failed (%s); retrying them one by one", len(batch), e)
+            for write in batch:
+                self._write_one(write)
+            return
+        for (_, _, _, future), result in zip(batch, results):
+            future.set_result(result)
+
+    def _write_one(self, write: Write) -> None:
+        fn, args, kwargs, future = write
+        try:
+            with db.session.no_autoflush:
+                result = fn(*args, **kwargs)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            future.set_exception(e)
+        else:
+            future.set_result(result)
@@ -0,0 +1,57 @@
+import sys
+import socket
+import multiprocessing
+from typing import Any, Dict, List
+
+try:
+    # Wait on the pipe through the gevent hub instead of blocking it
+    from gevent.socket import wait_read as _wait_read
+except ImportError:  # pragma: no cover
+    _wait_read = None
+if sys.platform == "win32":
+    # Pipe handles are not sockets there; fall back to Connection.poll
+    _wait_read = None
+
+
+class EventChannel:
+    """
+    One pipe carrying events from every pool worker to the web process.
+
+    Created before the pool and handed to the workers through the pool
+    initializer (pipes and locks can only be inherited, not sent with a task).
+    Workers `put` dict events that carry their `session_id`; the lock keeps
+    messages from different processes and threads from interleaving. The web
+    process reads them with `wait` / `drain` from a single consumer.
+    """
+
+    def __init__(self):
+        self._reader, self._writer = multiprocessing.Pipe(duplex=False)
+        self._lock = multiprocessing.Lock()
+
+    def put(self, event: Dict[str, Any]) -> None:
+        with self._lock:
+            self._writer.send(event)
+
+    def wait(self, timeout: float) -> bool:
+        """
+        Block (cooperatively under gevent) until an event is readable or
+        `timeout` seconds pass. Returns True if events are ready.
+        """
+        if self._reader.poll():
+            return True
+        if _wait_read is None:
+            return self._reader.poll(timeout)
+        try:
+            _wait_read(self._reader.fileno(), timeout=timeout)
+        except socket.timeout:
+            return False
+        return True
+
+    def drain(self, limit: int = 1000) -> List[Dict[str, Any]]:
+        """
+        Read up to `limit` events that are already in the pipe, without blocking.
+        """
+        events = []
+        while len(events) < limit and self._reader.poll():
+            events.append(self._reader.recv())
+        return events
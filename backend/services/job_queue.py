@@ -0,0 +1,333 @@
+import os
+import time
+import socket
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import and_, distinct, func, or_, select, update
+from db.models import db, File, ProcessingJob, ProcessingTask
+from utils.logging import logger, log_call
+
+DEFAULT_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", 300))
+DEFAULT_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", 3))
+ACTIVE_JOB_STATES = ("queued", "running")
+FINAL_JOB_STATES = ("completed", "failed", "cancelled")
+# How often a worker re-reads the job row for a cancel made by another process.
+CANCEL_POLL_SECONDS = float(os.getenv("JOB_CANCEL_POLL_SECONDS", 2))
+# last_error of tasks whose worker died on their last attempt
+LOST_WORKER_ERROR = "Worker stopped while processing the file"
+
+
+class JobCancelled(Exception):
+    """
+    Raised inside pipeline steps when their job has been cancelled.
+    """
+
+
+class CancellationToken:
+    """
+    Cross-process cancel flag for one job.
+
+    The web process sets `event` (a multiprocessing Manager Event) when the user
+    cancels; the job row's 'cancelled' status is the durable fallback, polled at
+    most every `poll_seconds`, so a cancel is seen even without the event (e.g.
+    by a worker that resumed the job after a restart). Safe to share between
+    the worker's threads.
+    """
+
+    def __init__(self, job_id: str, event=None, poll_seconds: float = CANCEL_POLL_SECONDS):
+        self.job_id = job_id
+        self.event = event
+        self.poll_seconds = poll_seconds
+        self._cancelled = False
+        self._next_poll = 0.0
+
+    def is_cancelled(self) -> bool:
+        if self._cancelled:
+            return True
+        if self.event is not None and self.event.is_set():
+            self._cancelled = True
+        elif time.monotonic() >= self._next_poll:
+            self._next_poll = time.monotonic() + self.poll_seconds
+            self._cancelled = is_job_cancelled(self.job_id)
+        return self._cancelled
+
+    def raise_if_cancelled(self) -> None:
+        if self.is_cancelled():
+            raise JobCancelled(self.job_id)
+
+
+def worker_id() -> str:
+    """
+    Lease owner name for the current process.
+    """
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _expires(lease_seconds: int) -> datetime:
+    return datetime.utcnow() + timedelta(seconds=lease_seconds)
+
+
+@log_call()
+def enqueue_job(job_id: str, folder_paths: List[str], extensions: List[str], priority: int = 0) -> ProcessingJob:
+    """
+    Persist a folder-processing request before it is handed to the pool.
+    """
+    job = ProcessingJob(id=job_id, folder_paths=folder_paths, extensions=extensions, priority=priority, status="queued")
+    db.session.add(job)
+    db.session.commit()
+    logger.info("Enqueued processing job %s (priority=%d)", job_id, priority)
+    return job
+
+
+def claim_job(job_id: str, owner: Optional[str] = None, lease_seconds: int = DEFAULT_LEASE_SECONDS) -> bool:
+    """
+    Atomically take the lease on an active job. Fails if another live worker
+    holds it; an expired lease can be taken over.
+    """
+    owner = owner or worker_id()
+    now = datetime.utcnow()
+    result = db.session.execute(
+        update(ProcessingJob)
+        .where(
+            ProcessingJob.id == job_id,
+            ProcessingJob.status.in_(ACTIVE_JOB_STATES),
+            or_(
+                ProcessingJob.lease_owner.is_(None),
+                ProcessingJob.lease_owner == owner,
+                ProcessingJob.lease_expires_at < now,
+            ),
+        )
+        .values(status="running", lease_owner=owner, lease_expires_at=_expires(lease_seconds))
+    )
+    db.session.commit()
+    return result.rowcount == 1
+
+
+def heartbeat(job_id: str, owner: Optional[str] = None, lease_seconds: int = DEFAULT_LEASE_SECONDS) -> None:
+    db.session.execute(
+        update(ProcessingJob)
+        .where(ProcessingJob.id == job_id, ProcessingJob.lease_owner == (owner or worker_id()))
+        .values(lease_expires_at=_expires(lease_seconds))
+    )
+    db.session.commit()
+
+
+def mark_scanned(job_id: str) -> None:
+    db.session.execute(update(ProcessingJob).where(ProcessingJob.id == job_id).values(scanned=True))
+    db.session.commit()
+
+
+def finish_job(job_id: str, status: str) -> None:
+    db.session.execute(
+        update(ProcessingJob)
+        .where(ProcessingJob.id == job_id, ProcessingJob.status.in_(ACTIVE_JOB_STATES))
+        .values(status=status, lease_owner=None, lease_expires_at=None)
+    )
+    db.session.commit()
+
+
+def is_job_cancelled(job_id: str) -> bool:
+    """
+    Read the job status on its own connection, so it can be called in the middle
+    of a session's transaction.
+    """
+    with db.engine.connect() as conn:
+        status = conn.execute(select(ProcessingJob.status).where(ProcessingJob.id == job_id)).scalar()
+    return status == "cancelled"
+
+
+def add_tasks(job_id: str, file_ids: Iterable[int], phase: str, priority: int = 0,
+              max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> int:
+    """
+    Create pending tasks for `file_ids` in `phase`, skipping ones the job already
+    has (so it is safe to call again when a job resumes). Returns the number added.
+    """
+    file_ids = list(dict.fromkeys(file_ids))
+    if not file_ids:
+        return 0
+    existing = set(
+        db.session.scalars(
+            select(ProcessingTask.file_id).where(
+                ProcessingTask.job_id == job_id, ProcessingTask.phase == phase,
+                ProcessingTask.file_id.in_(file_ids),
+            )
+        )
+    )
+    rows = [
+        {"job_id": job_id, "file_id": fid, "phase": phase, "status": "pending",
+         "priority": priority, "attempts": 0, "max_attempts": max_attempts}
+        for fid in file_ids if fid not in existing
+    ]
+    if rows:
+        db.session.execute(ProcessingTask.__table__.insert(), rows)
+    db.session.commit()
+    return len(rows)
+
+
+def _fail_exhausted_leases(*criteria) -> None:
+    """
+    Fail the leased tasks matching `criteria` that have used up their attempts:
+    their worker died on every attempt (so fail_task never ran), and leasing
+    them again would crash the next worker the same way.
+    """
+    db.session.execute(
+        update(ProcessingTask)
+        .where(ProcessingTask.status == "leased", ProcessingTask.attempts >= ProcessingTask.max_attempts, *criteria)
+        .values(status="failed", lease_owner=None, lease_expires_at=None, last_error=LOST_WORKER_ERROR)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def lease_tasks(job_id: str, phase: str, limit: int, owner: Optional[str] = None,
+                lease_seconds: int = DEFAULT_LEASE_SECONDS) -> List[Tuple[int, int]]:
+    """
+    Lease up to `limit` runnable tasks of a job phase, highest priority first.
+    Pending tasks and tasks whose lease expired (their worker died) are
+    runnable; expired tasks without attempts left are marked failed instead.
+    Returns (task_id, file_id) pairs.
+    """
+    owner = owner or worker_id()
+    now = datetime.utcnow()
+    _fail_exhausted_leases(
+        ProcessingTask.job_id == job_id, ProcessingTask.phase == phase, ProcessingTask.lease_expires_at < now,
+    )
+    runnable = and_(
+        ProcessingTask.job_id == job_id,
+        ProcessingTask.phase == phase,
+        or_(
+            ProcessingTask.status == "pending",
+            and_(ProcessingTask.status == "leased", ProcessingTask.lease_expires_at < now,
+                 ProcessingTask.attempts < ProcessingTask.max_attempts),
+        ),
+    )
+    candidates = list(db.session.scalars(
+        select(ProcessingTask.id).where(runnable)
+        .order_by(ProcessingTask.priority.desc(), ProcessingTask.id).limit(limit)
+    ))
+    if not candidates:
+        db.session.commit()
+        return []
+    # The status guard in the WHERE clause keeps two workers from leasing the same row.
+    db.session.execute(
+        update(ProcessingTask)
+        .where(ProcessingTask.id.in_(candidates), runnable)
+        .values(
+            status="leased", lease_owner=owner, lease_expires_at=_expires(lease_seconds),
+            attempts=ProcessingTask.attempts + 1,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    rows = db.session.execute(
+        select(ProcessingTask.id, ProcessingTask.file_id)
+        .where(ProcessingTask.id.in_(candidates), ProcessingTask.lease_owner == owner,
+               ProcessingTask.status == "leased")
+        .order_by(ProcessingTask.priority.desc(), ProcessingTask.id)
+    ).all()
+    return [(task_id, file_id) for task_id, file_id in rows]
+
+
+def complete_task(task_id: int) -> None:
+    db.session.execute(
+        update(ProcessingTask).where(ProcessingTask.id == task_id)
+        .values(status="done", lease_owner=None, lease_expires_at=None, last_error=None)
+    )
+
+
+def fail_task(task_id: int, error: Optional[str]) -> bool:
+    """
+    Record a failed attempt. The task goes back to pending while it has attempts
+    left; returns True if it will be retried. A task that no longer exists
+    (its job's files were cleaned up) is not retried.
+    """
+    task = db.session.get(ProcessingTask, task_id)
+    if task is None:
+        return False
+    retry = task.attempts < task.max_attempts
+    task.status = "pending" if retry else "failed"
+    task.lease_owner = None
+    task.lease_expires_at = None
+    task.last_error = error
+    return retry
+
+
+def open_file_count(job_id: str) -> int:
+    """
+    Number of distinct files with a task of the job still to run, in any phase.
+    """
+    return db.session.scalar(
+        select(func.count(distinct(ProcessingTask.file_id)))
+        .where(ProcessingTask.job_id == job_id, ProcessingTask.status.in_(("pending", "leased")))
+    )
+
+
+def cancel_open_tasks(job_id: str) -> int:
+    """
+    Mark every task of a cancelled job that is not done as 'cancelled'.
+    """
+    result = db.session.execute(
+        update(ProcessingTask)
+        .where(ProcessingTask.job_id == job_id, ProcessingTask.status.in_(("pending", "leased")))
+        .values(status="cancelled", lease_owner=None, lease_expires_at=None)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return result.rowcount
+
+
+def job_summary(job_id: str) -> Dict[str, Any]:
+    """
+    Per-file outcome of a job across all its runs: a file succeeded when all its
+    tasks are done and failed when any task ran out of attempts.
+    """
+    rows = db.session.execute(
+        select(File.file_path, ProcessingTask.status, ProcessingTask.last_error)
+        .join(File, File.id == ProcessingTask.file_id)
+        .where(ProcessingTask.job_id == job_id)
+    ).all()
+    outcome: Dict[str, Tuple[bool, Optional[str]]] = {}
+    for path, status, error in rows:
+        ok, err = outcome.get(path, (True, None))
+        if status != "done":
+            ok, err = False, err or error or status
+        outcome[path] = (ok, err)
+    failed = [{"file_name": path, "error": err} for path, (ok, err) in outcome.items() if not ok]
+    return {
+        "total_files": len(outcome),
+        "uploaded_files": len(outcome) - len(failed),
+        "failed_files": failed,
+    }
+
+
+def resumable_jobs() -> List[ProcessingJob]:
+    """
+    Jobs that were queued or running when the previous process stopped,
+    highest priority first.
+    """
+    return (
+        ProcessingJob.query.filter(ProcessingJob.status.in_(ACTIVE_JOB_STATES))
+        .order_by(ProcessingJob.priority.desc(), ProcessingJob.created_at)
+        .all()
+    )
+
+
+def release_job_leases(job_ids: Iterable[str]) -> None:
+    """
+    Drop leases held by workers of a previous run (the pool they belonged to is
+    gone) so the resumed jobs and their leased tasks can be picked up at once.
+    Tasks that have used up their attempts are failed rather than released.
+    """
+    job_ids = list(job_ids)
+    if not job_ids:
+        return
+    db.session.execute(
+        update(ProcessingJob).where(ProcessingJob.id.in_(job_ids)).values(lease_owner=None, lease_expires_at=None)
+    )
+    _fail_exhausted_leases(ProcessingTask.job_id.in_(job_ids))
+    db.session.execute(
+        update(ProcessingTask)
+        .where(ProcessingTask.job_id.in_(job_ids), ProcessingTask.status == "leased")
+        .values(status="pending", lease_owner=None, lease_expires_at=None)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
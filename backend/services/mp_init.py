@@ -1,17 +1,109 @@
 import os
 import sys
+import logging
 from multiprocessing import Pool, Manager, freeze_support, get_start_method
 from utils.logging import logger, log_call
 
 manager = None
 pool = None
+# Worker -> web process event pipe (services.event_channel.EventChannel)
+event_channel = None
+
+
+_worker_app = None
+
+
+def worker_app_config() -> dict:
+    """
+    Configuration for the minimal Flask app used inside pool workers.
+    """
+    return {
+        "SQLALCHEMY_DATABASE_URI": os.getenv("DATABASE_URI", "sqlite:///rag_chat.db"),
+        "SQLALCHEMY_TRACK_MODIFICATIONS": False,
+    }
+
+
+def _configure_worker_logging(app) -> None:
+    log_path = os.getenv("WORKER_LOG_PATH") or os.path.join(app.instance_path, "logs", "app.log")
+    os.makedirs(os.path.dirname(log_path), exist_ok=True)
+    file_handler = logging.FileHandler(log_path, encoding="utf-8")
+    file_handler.setFormatter(logging.Formatter(
+        "{"
+        "\"timestamp\": \"%(asctime)s\", "
+        "\"level\": \"%(levelname)s\", "
+        "\"module\": \"%(module)s\", "
+        "\"funcName\": \"%(funcName)s\", "
+        "\"lineno\": %(lineno)d, "
+        "\"message\": \"%(message)s\""
+        "}"
+    ))
+    root_logger = logging.getLogger()
+    root_logger.setLevel(logging.INFO)
+    if not any(isinstance(h, logging.FileHandler) and h.baseFilename == file_handler.baseFilename for h in root_logger.handlers):
+        root_logger.addHandler(file_handler)
+
+
+def get_worker_app(app_config: dict | None = None):
+    """
+    The Flask app (and with it the SQLAlchemy engine and connection pool) of this
+    worker process. Built once, by worker_init or on first use.
+    """
+    global _worker_app
+    if _worker_app is None:
+        from flask import Flask
+        from db.models import db
+        from db.sqlite import apply_sqlite_profile, attach_sqlite_pragmas
+        app = Flask(__name__)
+        app.config.update(app_config or worker_app_config())
+        apply_sqlite_profile(app)
+        db.init_app(app)
+        attach_sqlite_pragmas(app, db)
+        _configure_worker_logging(app)
+        _worker_app = app
+        logger.info("Worker %s: app and DB engine initialised", os.getpid())
+    return _worker_app
+
+
+def _warm_api_clients() -> None:
+    if os.getenv("OPENAI_API_KEY"):
+        from utils.services.ai_api_manager import get_shared_client
+        get_shared_client()
+    if os.getenv("PINECONE_API_KEY") and os.getenv("PINECONE_ENV"):
+        from utils.pinecone_client import get_pinecone_client
+        try:
+            get_pinecone_client()
+        except Exception as e:
+            logger.warning("Worker %s: Pinecone client not initialised: %s", os.getpid(), e)
+
+
+def worker_init(app_config: dict | None = None, channel=None):
+    """
+    Pool initializer: runs once in every worker process. Builds the worker's
+    Flask app / DB engine and the shared OpenAI and Pinecone clients, so tasks
+    reuse them instead of setting them up per job, and keeps the inherited
+    event `channel` for process_folder_task. Optionally preloads the
+    keyword models named in KEYWORD_WARMUP_METHODS (comma-separated, e.g. "keybert,yake")
+    and opens the compiled ontology label index when ONTOLOGY_INDEX_PATH is set.
+    """
+    global event_channel
+    event_channel = channel
+    get_worker_app(app_config)
+    _warm_api_clients()
+    methods = tuple(m.strip() for m in os.getenv("KEYWORD_WARMUP_METHODS", "").split(",") if m.strip())
+    if methods:
+        from utils.services.generators.keyword_generator import warm_up_keyword_models
+        logger.info("Warming up keyword models in worker %s: %s", os.getpid(), methods)
+        warm_up_keyword_models(methods)
+    if os.getenv("ONTOLOGY_INDEX_PATH"):
+        from utils.services.generators.ontology_index import get_ontology_index
+        get_ontology_index()
 
 @log_call()
 def init_multiprocessing():
     """
     Initialise the task-launcher Pool and Manager exactly once.
     """
-    global manager, pool
+    global manager, pool, event_channel
     if manager is not None and pool is not None:
         logger.debug("Multiprocessing already initialised — skipping")
         return
@@ -29,8 +121,10 @@ def init_multiprocessing():
     if get_start_method(allow_none=True) != "fork":
         freeze_support()
 
+    from services.event_channel import EventChannel
     manager = Manager()
-    pool = Pool(processes=os.cpu_count())
+    event_channel = EventChannel()
+    pool = Pool(processes=os.cpu_count(), initializer=worker_init, initargs=(worker_app_config(), event_channel))
     logger.info("Initialised task-pool (size=%s) and Manager", os.cpu_count())
 
 def get_pool():
@@ -45,7 +139,14 @@ def get_manager():
     """
     return manager
 
-def set_pool_and_manager(mgr, pl):
-    global manager, pool
+def get_event_channel():
+    """
+    Returns the event channel (in the web process and in pool workers).
+    """
+    return event_channel
+
+def set_pool_and_manager(mgr, pl, channel=None):
+    global manager, pool, event_channel
     manager = mgr
     pool = pl
+    event_channel = channel
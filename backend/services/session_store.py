@@ -15,6 +15,8 @@ class ProcessingSession:
     file_items: List[Any] = field(default_factory=list)
     sse_queue: Any = None
     ws_queue: Any = None
+    # Manager Event shared with the worker; set to cancel the job
+    cancel_event: Any = None
 
 class SessionStore:
     """
@@ -24,8 +26,9 @@ class SessionStore:
         self._store: Dict[str, ProcessingSession] = {}
 
     @log_call()
-    def create(self):
-        session_id = uuid.uuid4().hex
+    def create(self, session_id: Optional[str] = None):
+        # An explicit id is used when a persisted job is resumed under its old session
+        session_id = session_id or uuid.uuid4().hex
         sess = ProcessingSession(session_id=session_id)
         # Multiprocessing queues will be attached after creation
         self._store[session_id] = sess
@@ -0,0 +1,148 @@
+import os
+import re
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from db.models import db, File
+from utils.logging import logger, log_call
+from utils.pinecone_client import get_pinecone_client, pinecone_namespace
+
+# Vector ids written by upsert_file_to_vector_db
+VECTOR_ID_RE = re.compile(r"^(\d+)_chunk_(\d+)$")
+RECONCILE_INTERVAL_SECONDS = float(os.getenv("VECTOR_RECONCILE_INTERVAL", 0))
+# Paths per `source_file` filter delete
+FILTER_DELETE_BATCH_SIZE = 1000
+
+
+def chunk_vector_id(file_id: int, idx: int) -> str:
+    return f"{file_id}_chunk_{idx}"
+
+
+def file_vector_ids(file_id: int, count: int, start: int = 0) -> List[str]:
+    return [chunk_vector_id(file_id, idx) for idx in range(start, count)]
+
+
+def parse_vector_id(vector_id: str) -> Optional[Tuple[int, int]]:
+    """
+    (file_id, chunk index) of a chunk vector id, or None for other ids.
+    """
+    m = VECTOR_ID_RE.match(vector_id)
+    return (int(m.group(1)), int(m.group(2))) if m else None
+
+
+def delete_file_vectors(files: Iterable[File], client=None, namespace: Optional[str] = None) -> int:
+    """
+    Delete every vector of `files`. Files with a recorded vector_count are
+    deleted by id in batches; older uploaded files are found by id prefix, or
+    by a `source_file` metadata filter where the index cannot list ids. Files
+    never uploaded may hold chunks of an interrupted upsert (the count is only
+    recorded once it finishes): they are deleted with one `source_file` filter
+    per batch of paths, falling back to per-file prefix listing on indexes
+    without filter deletes.
+    Returns the number of ids deleted (filter deletes are not counted).
+    """
+    client = client or get_pinecone_client()
+    namespace = pinecone_namespace(namespace)
+    ids: List[str] = []
+    pending: List[File] = []
+    for f in files:
+        if f.vector_count is not None:
+            ids.extend(file_vector_ids(f.id, f.vector_count))
+        elif f.is_uploaded:
+            _list_or_filter_delete(f, client, namespace, ids)
+        else:
+            pending.append(f)
+    for start in range(0, len(pending), FILTER_DELETE_BATCH_SIZE):
+        batch = pending[start:start + FILTER_DELETE_BATCH_SIZE]
+        try:
+            client.delete(filter={"source_file": {"$in": [f.file_path for f in batch]}}, namespace=namespace)
+        except Exception as e:
+            logger.warning("Cannot delete vectors by source_file (%s); listing them by file", e)
+            for f in pending[start:]:
+                _list_ids(f, client, namespace, ids)
+            break
+    if ids:
+        client.delete_ids(ids, namespace=namespace)
+    return len(ids)
+
+
+def _list_ids(f: File, client, namespace: str, ids: List[str]) -> None:
+    for page in client.list_ids(prefix=f"{f.id}_chunk_", namespace=namespace):
+        ids.extend(page)
+
+
+def _list_or_filter_delete(f: File, client, namespace: str, ids: List[str]) -> None:
+    try:
+        _list_ids(f, client, namespace, ids)
+    except Exception as e:
+        logger.warning("Cannot list vectors of file %s (%s); deleting by source_file", f.id, e)
+        client.delete(filter={"source_file": {"$eq": f.file_path}}, namespace=namespace)
+
+
+def delete_stale_chunks(f: File, new_count: int, client=None, namespace: Optional[str] = None) -> int:
+    """
+    After `f` was re-ingested into `new_count` chunks, delete its vectors with
+    higher chunk indexes. Files without a recorded count are left to the reconciler.
+    """
+    if f.vector_count is None or f.vector_count <= new_count:
+        return 0
+    client = client or get_pinecone_client()
+    stale = file_vector_ids(f.id, f.vector_count, start=new_count)
+    client.delete_ids(stale, namespace=pinecone_namespace(namespace))
+    logger.info("Deleted %d stale chunk vectors of file %s", len(stale), f.id)
+    return len(stale)
+
+
+@log_call()
+def reconcile_vectors(client=None, namespace: Optional[str] = None, dry_run: bool = False) -> Dict[str, Any]:
+    """
+    Find vectors in the index that no longer match the database and delete them:
+    chunks of files that do not exist, and chunks past the recorded vector_count
+    of an uploaded file. Files still being ingested (not uploaded or without a
+    count) are skipped, and the DB is read after listing the index, so vectors
+    written during the scan are never taken for orphans.
+    """
+    client = client or get_pinecone_client()
+    namespace = pinecone_namespace(namespace)
+    chunk_ids: List[Tuple[str, int, int]] = []
+    scanned = 0
+    for page in client.list_ids(namespace=namespace):
+        for vector_id in page:
+            scanned += 1
+            parsed = parse_vector_id(vector_id)
+            if parsed is not None:
+                chunk_ids.append((vector_id, *parsed))
+
+    files = {
+        file_id: (is_uploaded, vector_count)
+        for file_id, is_uploaded, vector_count in db.session.query(File.id, File.is_uploaded, File.vector_count)
+    }
+    orphans = []
+    for vector_id, file_id, idx in chunk_ids:
+        if file_id not in files:
+            orphans.append(vector_id)
+            continue
+        is_uploaded, vector_count = files[file_id]
+        if is_uploaded and vector_count is not None and idx >= vector_count:
+            orphans.append(vector_id)
+
+    if orphans and not dry_run:
+        client.delete_ids(orphans, namespace=namespace)
+    logger.info(
+        "Vector reconcile: %d ids scanned, %d orphans %s",
+        scanned, len(orphans), "found" if dry_run else "deleted",
+    )
+    return {"scanned": scanned, "orphans": len(orphans), "deleted": 0 if dry_run else len(orphans)}
+
+
+def run_reconciler(app, interval: float = RECONCILE_INTERVAL_SECONDS, sleep: Callable[[float], Any] = time.sleep) -> None:
+    """
+    Reconcile the vector index every `interval` seconds, forever. Meant for a
+    background task; pass the async framework's sleep (e.g. socketio.sleep).
+    """
+    while True:
+        sleep(interval)
+        with app.app_context():
+            try:
+                reconcile_vectors()
+            except Exception as e:
+                logger.exception("Vector reconcile failed: %s", e)
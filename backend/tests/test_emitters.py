@@ -5,7 +5,7 @@ import pytest
 from flask import Flask
 from db.models import db, Conversation
 from utils.websockets import sockets
-from backend.utils.emitters import emitters_old  # This registers the event listener
+from utils.emitters.emitters import emitters
 
 @pytest.fixture
 def app():
@@ -15,30 +15,55 @@ def app():
 
     # Use the existing db instance from db.models
     db.init_app(app)
+    emitters.init_app(app)
 
     with app.app_context():
         db.create_all()
 
     return app
 
-@pytest.fixture
-def client(app):
-    return app.test_client()
+def emitted(emit_mock):
+    return [(call.args[0], call.args[1]) for call in emit_mock.call_args_list]
 
-def test_after_insert_emits_events(app, mocker):
-    # Mock socketio.emit
+def test_commit_emits_one_lightweight_delta(app, mocker):
     emit_mock = mocker.patch.object(sockets.socketio, 'emit')
 
-    # Add a test conversation using the imported Conversation model
     with app.app_context():
-        test_conv = Conversation(title="Test", meta_data={"foo": "bar"})
-        db.session.add(test_conv)
+        conv = Conversation(title="Test", meta_data={"summary": "long text"})
+        db.session.add(conv)
+        db.session.flush()
+        conv.title = "Renamed"
+        db.session.flush()
+        # Nothing is sent before the commit
+        assert emit_mock.call_count == 0
         db.session.commit()
 
-        # Check that 'conversation_list' and 'new_conversation' were emitted
-        assert emit_mock.call_count == 2
+        [(name, data)] = emitted(emit_mock)
+        assert name == 'conversation_created'
+        assert data['id'] == conv.id and data['title'] == "Renamed"
+        assert 'meta_data' not in data
+
+def test_update_and_delete_emit_deltas_rollback_emits_nothing(app, mocker):
+    emit_mock = mocker.patch.object(sockets.socketio, 'emit')
+    with app.app_context():
+        conv = Conversation(title="Test")
+        db.session.add(conv)
+        db.session.commit()
+        conv_id = conv.id
+
+        emit_mock.reset_mock()
+        conv.title = "Discarded"
+        db.session.flush()
+        db.session.rollback()
+        assert emit_mock.call_count == 0
+
+        conv = db.session.get(Conversation, conv_id)
+        conv.title = "Kept"
+        db.session.commit()
+        db.session.delete(conv)
+        db.session.commit()
 
-        # Extract emitted event names
-        emitted_events = [call.args[0] for call in emit_mock.call_args_list]
-        assert 'conversation_list' in emitted_events
-        assert 'new_conversation' in emitted_events
+        events = emitted(emit_mock)
+        assert [name for name, _ in events] == ['conversation_updated', 'conversation_deleted']
+        assert events[0][1]['title'] == "Kept" and events[0][1]['updated_at']
+        assert events[1][1] == {'id': conv_id}
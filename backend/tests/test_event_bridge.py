@@ -0,0 +1,72 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import multiprocessing
+import threading
+import utils.websockets.sockets  # noqa: F401  (import order: sockets before upload_tracking)
+from utils.websockets import upload_tracking
+from utils.services import ws_event_relay
+from services.event_channel import EventChannel
+
+
+def _publish(channel, worker):
+    threads = [
+        threading.Thread(target=lambda t=t: [channel.put({"session_id": f"s{worker}", "file": f"{t}-{i}"}) for i in range(50)])
+        for t in range(4)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+def test_channel_carries_events_from_many_processes_and_threads():
+    channel = EventChannel()
+    procs = [multiprocessing.Process(target=_publish, args=(channel, w)) for w in range(3)]
+    for p in procs:
+        p.start()
+    received = []
+    while len(received) < 600:
+        assert channel.wait(5)
+        received.extend(channel.drain())
+    for p in procs:
+        p.join()
+    assert sorted({e["session_id"] for e in received}) == ["s0", "s1", "s2"]
+    assert len({(e["session_id"], e["file"]) for e in received}) == 600
+    assert not channel.wait(0.01)
+
+
+def test_bridge_routes_events_by_session(monkeypatch):
+    emitted = []
+    monkeypatch.setattr(ws_event_relay, "emit_upload_started", lambda sid, n: emitted.append(("started", sid, n)))
+    monkeypatch.setattr(ws_event_relay, "emit_upload_complete", lambda sid, summary: emitted.append(("complete", sid)))
+    monkeypatch.setattr(upload_tracking, "emit_upload_progress", lambda sid, frame: emitted.append(("progress", sid, frame["processed"])))
+    added = []
+    bridge = ws_event_relay.EventBridge(channel=None)
+    bridge.register("a", on_files_added=added.extend)
+
+    for msg in [
+        {"session_id": "a", "files_added": [1, 2]},
+        {"session_id": "a", "upload_started": 2},
+        {"session_id": "b", "upload_started": 9},  # not registered (e.g. cancelled)
+        {"session_id": "a", "file": "/x.txt", "success": True},
+        {"session_id": "a", "file": "/y.txt", "success": False, "error": "boom"},
+        {"session_id": "a", "complete": True, "summary": {}},
+    ]:
+        bridge.dispatch(msg)
+
+    assert added == [1, 2]
+    assert emitted == [("started", "a", 2), ("progress", "a", 2), ("complete", "a")]
+    assert bridge.sessions == []
+
+
+def test_bridge_hands_cancel_ack_to_session_and_unregisters():
+    cleaned = []
+    bridge = ws_event_relay.EventBridge(channel=None)
+    bridge.register("a", on_cancelled=lambda: cleaned.append("a"))
+
+    bridge.dispatch({"session_id": "a", "cancelled": True})
+    bridge.dispatch({"session_id": "a", "cancelled": True})  # late duplicate is dropped
+
+    assert cleaned == ["a"]
+    assert bridge.sessions == []
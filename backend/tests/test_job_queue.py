@@ -0,0 +1,92 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from datetime import datetime, timedelta
+import pytest
+from flask import Flask
+from db.models import db, File, ProcessingJob, ProcessingTask
+from services import job_queue
+
+
+@pytest.fixture
+def app():
+    app = Flask('test_job_queue')
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+
+
+def _files(n):
+    files = [File(file_path=f"/docs/{i}.txt", file_extension=".txt") for i in range(n)]
+    db.session.add_all(files)
+    db.session.commit()
+    return [f.id for f in files]
+
+
+def test_tasks_are_leased_once_and_retried_until_attempts_run_out(app):
+    ids = _files(3)
+    job_queue.enqueue_job("job1", ["/docs"], [".txt"])
+    assert job_queue.claim_job("job1", owner="w1")
+    assert not job_queue.claim_job("job1", owner="w2")  # lease held by a live worker
+
+    assert job_queue.add_tasks("job1", ids, "metadata", max_attempts=2) == 3
+    assert job_queue.add_tasks("job1", ids, "metadata") == 0  # idempotent on resume
+
+    first = job_queue.lease_tasks("job1", "metadata", limit=2, owner="w1")
+    second = job_queue.lease_tasks("job1", "metadata", limit=5, owner="w2")
+    assert len(first) == 2 and len(second) == 1
+    assert not {t for t, _ in first} & {t for t, _ in second}
+
+    for task_id, _ in first:
+        job_queue.complete_task(task_id)
+    task_id = second[0][0]
+    assert job_queue.fail_task(task_id, "timeout") is True
+    db.session.commit()
+    retry = job_queue.lease_tasks("job1", "metadata", limit=5, owner="w1")
+    assert [t for t, _ in retry] == [task_id]
+    assert job_queue.fail_task(task_id, "timeout again") is False
+    db.session.commit()
+    assert job_queue.lease_tasks("job1", "metadata", limit=5, owner="w1") == []
+
+    summary = job_queue.job_summary("job1")
+    assert summary["total_files"] == 3 and summary["uploaded_files"] == 2
+    assert summary["failed_files"] == [{"file_name": "/docs/2.txt", "error": "timeout again"}]
+
+
+def test_expired_leases_are_taken_over_and_jobs_resume(app):
+    ids = _files(2)
+    job_queue.enqueue_job("low", ["/a"], [".txt"], priority=0)
+    job_queue.enqueue_job("high", ["/b"], [".txt"], priority=5)
+    job_queue.claim_job("low", owner="dead-worker")
+    job_queue.add_tasks("low", ids, "upsert")
+    job_queue.lease_tasks("low", "upsert", limit=1, owner="dead-worker")
+
+    # Expire the dead worker's task lease: another worker can take the task over
+    db.session.query(ProcessingTask).update({"lease_expires_at": datetime.utcnow() - timedelta(seconds=1)})
+    db.session.commit()
+    assert len(job_queue.lease_tasks("low", "upsert", limit=5, owner="w2")) == 2
+
+    assert [j.id for j in job_queue.resumable_jobs()] == ["high", "low"]
+    job_queue.release_job_leases(["low"])
+    assert db.session.get(ProcessingJob, "low").lease_owner is None
+    assert ProcessingTask.query.filter_by(status="leased").count() == 0
+
+    job_queue.finish_job("high", "cancelled")
+    assert [j.id for j in job_queue.resumable_jobs()] == ["low"]
+
+
+def test_tasks_that_keep_killing_their_worker_are_failed(app):
+    ids = _files(1)
+    job_queue.enqueue_job("job", ["/docs"], [".txt"])
+    job_queue.add_tasks("job", ids, "metadata", max_attempts=2)
+    for owner in ("w1", "w2"):
+        assert len(job_queue.lease_tasks("job", "metadata", limit=1, owner=owner)) == 1
+        # The worker crashes: fail_task never runs and the lease runs out
+        db.session.query(ProcessingTask).update({"lease_expires_at": datetime.utcnow() - timedelta(seconds=1)})
+        db.session.commit()
+
+    assert job_queue.lease_tasks("job", "metadata", limit=1, owner="w3") == []
+    task = ProcessingTask.query.one()
+    assert task.status == "failed" and task.last_error == job_queue.LOST_WORKER_ERROR
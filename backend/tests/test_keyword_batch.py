@@ -0,0 +1,136 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+import json
+import httpx
+import pytest
+from flask import Flask
+from openai import OpenAI
+from db.models import db, File
+from features.file_processing.file_pipeline import keyword_batch
+
+
+class FakeBatchServer:
+    """Local stand-in for the OpenAI Files + Batches endpoints."""
+
+    def __init__(self):
+        self.files = {}
+        self.batches = {}
+        self.polls = 0
+        self.calls = []
+
+    def _batch(self, bid):
+        return httpx.Response(200, json=self.batches[bid])
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        self.calls.append((request.method, path.split("/v1/", 1)[-1].split("/")[0]))
+        if request.method == "POST" and path.endswith("/files"):
+            body = request.content.decode("utf-8", errors="ignore")
+            lines = [l for l in body.splitlines() if l.startswith("{")]
+            fid = f"file-in-{len(self.files)}"
+            self.files[fid] = "\n".join(lines)
+            return httpx.Response(200, json={"id": fid, "object": "file", "bytes": len(body),
+                                             "created_at": 0, "filename": "in.jsonl", "purpose": "batch", "status": "processed"})
+        if request.method == "POST" and path.endswith("/batches"):
+            payload = json.loads(request.content)
+            bid = f"batch-{len(self.batches)}"
+            self.batches[bid] = {"id": bid, "object": "batch", "endpoint": payload["endpoint"],
+                                 "input_file_id": payload["input_file_id"], "completion_window": "24h",
+                                 "status": "in_progress", "created_at": 0, "output_file_id": None,
+                                 "error_file_id": None, "request_counts": {"total": 0, "completed": 0, "failed": 0}}
+            return self._batch(bid)
+        if request.method == "GET" and "/batches/" in path:
+            bid = path.rsplit("/", 1)[1]
+            self.polls += 1
+            batch = self.batches[bid]
+            if self.polls >= 2 and batch["status"] != "completed":
+                out = []
+                for line in self.files[batch["input_file_id"]].splitlines():
+                    req = json.loads(line)
+                    content = json.dumps({"locatie": "Arad", "cuvinte_cheie": ["contract", req["custom_id"]]})
+                    out.append(json.dumps({"custom_id": req["custom_id"], "response": {"status_code": 200,
+                               "body": {"choices": [{"message": {"content": content}}]}}}))
+                oid = f"file-out-{bid}"
+                self.files[oid] = "\n".join(out)
+                batch.update(status="completed", output_file_id=oid)
+            return self._batch(bid)
+        if request.method == "GET" and path.endswith("/content"):
+            fid = path.split("/")[-2]
+            return httpx.Response(200, text=self.files[fid])
+        return httpx.Response(404, json={"error": {"message": path}})
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = Flask('test_keyword_batch')
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+
+
+def test_run_keyword_batch_writes_keywords(app, tmp_path):
+    long_doc = tmp_path / "long.txt"
+    long_doc.write_text("cuvant " * 50, encoding="utf-8")
+    short_doc = tmp_path / "short.txt"
+    short_doc.write_text("scurt", encoding="utf-8")
+
+    f1 = File(file_path=str(long_doc), file_extension=".txt", is_uploaded=False)
+    f2 = File(file_path=str(short_doc), file_extension=".txt", is_uploaded=False)
+    db.session.add_all([f1, f2])
+    db.session.commit()
+
+    server = FakeBatchServer()
+    client = OpenAI(api_key="test", base_url="http://stand-in/v1",
+                    http_client=httpx.Client(transport=httpx.MockTransport(server.handler)))
+
+    summary = keyword_batch.run_keyword_batch([f1, f2], str(tmp_path / "work"), client=client, poll_interval=0)
+
+    assert summary["submitted"] == 1 and summary["short"] == 1 and summary["stored"] == 1
+    stored = json.loads(db.session.get(File, f1.id).meta_data["keywords"])
+    assert stored["locatie"] == "Arad"
+    assert stored["cuvinte_cheie"] == ["contract", f"file-{f1.id}"]
+    assert json.loads(db.session.get(File, f2.id).meta_data["keywords"])["cuvinte_cheie"] == []
+
+
+def test_run_keyword_batch_submits_every_batch_before_polling(app, tmp_path):
+    files = []
+    for i in range(3):
+        doc = tmp_path / f"doc{i}.txt"
+        doc.write_text(f"cuvant{i} " * 50, encoding="utf-8")
+        files.append(File(file_path=str(doc), file_extension=".txt", is_uploaded=False))
+    db.session.add_all(files)
+    db.session.commit()
+
+    server = FakeBatchServer()
+    client = OpenAI(api_key="test", base_url="http://stand-in/v1",
+                    http_client=httpx.Client(transport=httpx.MockTransport(server.handler)))
+
+    summary = keyword_batch.run_keyword_batch(files, str(tmp_path / "work"), client=client,
+                                              poll_interval=0, max_requests=1)
+
+    assert summary["submitted"] == 3 and summary["stored"] == 3 and len(summary["batches"]) == 3
+    first_poll = server.calls.index(("GET", "batches"))
+    assert [c for c in server.calls if c == ("POST", "batches")] == [("POST", "batches")] * 3
+    assert max(i for i, c in enumerate(server.calls) if c == ("POST", "batches")) < first_poll
+    assert all(json.loads(db.session.get(File, f.id).meta_data["keywords"])["locatie"] == "Arad" for f in files)
+
+
+def test_batch_files_respect_the_byte_limit(app, tmp_path):
+    requests = ({"custom_id": f"file-{i}", "body": "x" * 100} for i in range(5))
+    huge = {"custom_id": "file-9", "body": "x" * 1000}
+    line_bytes = len(json.dumps({"custom_id": "file-0", "body": "x" * 100}) + "\n")
+
+    files, skipped = keyword_batch.write_batch_files(
+        (r for part in (requests, [huge]) for r in part), str(tmp_path), max_bytes=2 * line_bytes,
+    )
+
+    assert skipped == 1
+    assert [n for _, n in files] == [2, 2, 1]
+    for path, n in files:
+        assert os.path.getsize(path) <= 2 * line_bytes
+        with open(path, encoding="utf-8") as fh:
+            assert len(fh.readlines()) == n
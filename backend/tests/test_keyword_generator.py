@@ -0,0 +1,222 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.services.generators import keyword_generator
+from utils.services.generators.keyword_generator import preprocess_text
+
+
+def test_clean_text_drops_footers_and_numbered_lines():
+    text = "Tribunalul Arad\n12 nota de subsol\nPagina 3 din 10 hotaraste\r\n\tadmite"
+    assert preprocess_text(text, lemmatize=False) == "Tribunalul Arad hotaraste admite"
+
+
+def test_ocr_fix_only_touches_words():
+    text = "H0TARARE nr. 10/2001 din 12.01.2020, art. 1 alin. (2) DEC1ZIA a1"
+    assert preprocess_text(text, lemmatize=False) == (
+        "HOTARARE nr. 10/2001 din 12.01.2020, art. 1 alin. (2) DECIZIA a1"
+    )
+
+
+def test_ocr_fix_follows_letter_case():
+    assert preprocess_text("h0tarare f0l0sire DEC1ZIA H0tarare", lemmatize=False) == (
+        "hotarare folosire DECIZIA Hotarare"
+    )
+    # Half digits: too ambiguous to rewrite, and never rewritten to mixed case
+    assert preprocess_text("x01y", lemmatize=False) == "x01y"
+
+
+def test_ocr_fix_leaves_codes_and_numbers_alone():
+    text = "S.C. ABC1 SRL, 10ani, 1a0b1"
+    assert preprocess_text(text, lemmatize=False) == text
+
+
+def test_ocr_fix_splits_tokens_on_hyphens():
+    assert preprocess_text("PR0CES-VERBAL nr. 5-10a", lemmatize=False) == "PROCES-VERBAL nr. 5-10a"
+
+
+def test_cedilla_letters_normalised():
+    assert preprocess_text("instanţa reţine şi", lemmatize=False) == "instanța reține și"
+
+
+def test_models_are_loaded_once_per_process():
+    calls = []
+
+    def factory():
+        calls.append(1)
+        return object()
+
+    key = ("test-model", "x")
+    try:
+        first = keyword_generator._cached_model(key, factory)
+        assert keyword_generator._cached_model(key, factory) is first
+        assert len(calls) == 1
+    finally:
+        keyword_generator._model_cache.pop(key, None)
+
+
+def test_spacy_pipeline_is_loaded_once_across_threads(monkeypatch):
+    import time
+    import types
+    from concurrent.futures import ThreadPoolExecutor
+    loads = []
+
+    def load(name, disable=()):
+        loads.append(name)
+        time.sleep(0.05)  # slow enough for every thread to miss the cache
+        return object()
+
+    monkeypatch.setitem(sys.modules, "spacy", types.SimpleNamespace(load=load))
+    monkeypatch.setattr(keyword_generator, "_nlp_cache", {})
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        pipelines = list(pool.map(lambda _: keyword_generator._get_nlp(("ner",)), range(8)))
+    assert len(loads) == 1 and all(p is pipelines[0] for p in pipelines)
+
+
+def test_corpus_tfidf_scores_against_corpus(tmp_path):
+    from utils.services.generators.corpus_tfidf import CorpusTfidf
+    corpus = [
+        "instanta contract vanzare teren",
+        "instanta contract inchiriere apartament",
+        "instanta contract divort custodie",
+    ]
+    model = CorpusTfidf(n_features=2 ** 16, ngram_range=(1, 1), max_df=0.85).partial_fit(corpus)
+    top = model.top_terms(["instanta contract custodie custodie"], top_k=1)
+    assert top == [["custodie"]]
+
+    path = model.save(str(tmp_path / "tfidf.joblib"))
+    loaded = CorpusTfidf.load(path)
+    assert loaded.n_docs == 3
+    assert loaded.top_terms(["instanta teren"], top_k=1) == [["teren"]]
+
+
+def test_corpus_tfidf_returns_the_documents_own_phrase_on_collision():
+    from utils.services.generators.corpus_tfidf import CorpusTfidf
+    # Two buckets: many corpus terms share one with the document's phrase
+    model = CorpusTfidf(n_features=2, ngram_range=(1, 1), max_df=1.0)
+    model.partial_fit(["alfa beta gama delta", "epsilon zeta eta theta"])
+    assert model.top_terms(["custodie"], top_k=1) == [["custodie"]]
+
+
+def test_flashtext_automaton_is_persisted_and_reused(tmp_path, mocker):
+    from utils.services.generators import term_matcher
+    mocker.patch.dict(term_matcher._automata, clear=True)
+    vocab = ["contract de vanzare", "custodie", "teren"]
+    automaton = term_matcher.get_term_automaton(vocab, cache_dir=str(tmp_path))
+    assert automaton.extract("Contract de vanzare pentru teren si teren") == ["contract de vanzare", "teren"]
+    assert len(list(tmp_path.iterdir())) == 1
+
+    term_matcher._automata.clear()
+    reloaded = term_matcher.get_term_automaton(vocab, cache_dir=str(tmp_path))
+    assert reloaded is not automaton
+    assert reloaded.extract("custodie") == ["custodie"]
+
+
+def test_ontology_lookups_hash_the_vocabulary_once(tmp_path, mocker, monkeypatch):
+    from utils.services.generators import term_matcher
+    from utils.services.generators.keyword_generator import extract_ontology_terms
+    monkeypatch.chdir(tmp_path)
+    mocker.patch.dict(term_matcher._automata, clear=True)
+    digest = mocker.spy(term_matcher, "vocabulary_digest")
+    label_map = {"custodie": "uri:custodie", "teren": "uri:teren"}
+    vocab = ["contract de vanzare"]
+
+    for _ in range(3):
+        found = extract_ontology_terms("contract de vanzare pentru teren", label_map, vocab)
+    assert found == {"contract de vanzare": None, "teren": "uri:teren"}
+    assert digest.call_count == 1
+
+
+def test_fuzzy_ontology_mapping_uses_trigram_candidates():
+    label_map = {"drept civil": "uri:civil", "drept penal": "uri:penal", "dreptul muncii": "uri:muncii"}
+    mapped = keyword_generator.map_terms_to_ontology(["Drept penall", "astronomie"], label_map, matcher="fuzzy")
+    assert mapped == {"Drept penall": "uri:penal", "astronomie": None}
+
+
+def test_compiled_ontology_index_filters_language_and_matches(tmp_path):
+    from utils.services.generators.ontology_index import OntologyLabelIndex, compile_ontology_index
+    source = tmp_path / "thesaurus.rdf"
+    source.write_text(
+        '<?xml version="1.0"?>'
+        '<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"'
+        ' xmlns:skos="http://www.w3.org/2004/02/skos/core#">'
+        '<skos:Concept rdf:about="uri:penal"><skos:prefLabel xml:lang="ro">Drept penal</skos:prefLabel>'
+        '<skos:prefLabel xml:lang="en">Criminal law</skos:prefLabel></skos:Concept>'
+        '<skos:Concept rdf:about="uri:civil"><skos:altLabel xml:lang="ro">Drept civil</skos:altLabel></skos:Concept>'
+        '</rdf:RDF>',
+        encoding="utf-8",
+    )
+    out = tmp_path / "labels.db"
+    assert compile_ontology_index(str(source), str(out), lang="ro") == 2
+
+    index = OntologyLabelIndex(str(out))
+    assert len(index) == 2
+    assert "criminal law" not in index
+    assert keyword_generator.map_terms_to_ontology(["Drept civil"], index) == {"Drept civil": "uri:civil"}
+    mapped = keyword_generator.map_terms_to_ontology(["Drept penall", "astronomie"], index, matcher="fuzzy")
+    assert mapped == {"Drept penall": "uri:penal", "astronomie": None}
+
+
+def test_compiled_ontology_index_extracts_terms_without_loading_labels(tmp_path, mocker, monkeypatch):
+    from utils.services.generators import term_matcher
+    from utils.services.generators.ontology_index import OntologyLabelIndex
+    import sqlite3
+    out = tmp_path / "labels.db"
+    conn = sqlite3.connect(out)
+    conn.execute("CREATE TABLE labels (label TEXT PRIMARY KEY, uri TEXT NOT NULL) WITHOUT ROWID")
+    conn.executemany("INSERT INTO labels VALUES (?, ?)",
+                     [("drept", "uri:drept"), ("drept penal", "uri:penal"), ("teren", "uri:teren")])
+    conn.commit()
+    conn.close()
+    monkeypatch.chdir(tmp_path)
+    mocker.patch.dict(term_matcher._automata, clear=True)
+    index = OntologyLabelIndex(str(out))
+    walk = mocker.spy(OntologyLabelIndex, "__iter__")
+
+    found = keyword_generator.extract_ontology_terms(
+        "Cauza de drept penal privind un teren, contract de vanzare.", index, ["contract de vanzare"]
+    )
+
+    assert found == {"drept penal": "uri:penal", "teren": "uri:teren", "contract de vanzare": None}
+    assert walk.call_count == 0
+
+
+def test_label_indexes_are_keyed_by_content_and_bounded(mocker):
+    from utils.services.generators import term_matcher
+    mocker.patch.dict(term_matcher._label_indexes, clear=True)
+    first = term_matcher.get_label_index({"drept civil": "uri:civil"})
+    assert term_matcher.get_label_index({"drept civil": "uri:other"}) is first  # same labels
+    for i in range(term_matcher._LABEL_INDEX_CACHE_SIZE + 2):
+        term_matcher.get_label_index({f"label {i}": "uri"})
+    assert len(term_matcher._label_indexes) == term_matcher._LABEL_INDEX_CACHE_SIZE
+
+
+def test_keyword_limiter_is_held_only_for_the_request(mocker):
+    import httpx
+    import openai
+    from types import SimpleNamespace
+    from utils.services.rate_limiter import RateLimiter
+
+    limiter = RateLimiter(rpm=6000, tpm=10 ** 6, concurrency={"keywords": 1})
+    held = []
+    calls = {"n": 0}
+
+    def create(**kwargs):
+        held.append(limiter.adaptive.in_flight)
+        calls["n"] += 1
+        if calls["n"] == 1:
+            request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+            raise openai.RateLimitError("slow down", response=httpx.Response(429, request=request), body=None)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content='{"cuvinte_cheie": ["a"]}'))])
+
+    # Backoff sleeps and preprocessing must run with the slot released
+    mocker.patch("tenacity.nap.time.sleep", side_effect=lambda s: held.append(limiter.adaptive.in_flight))
+    real_preprocess = keyword_generator.preprocess_text
+    mocker.patch.object(keyword_generator, "preprocess_text",
+                        side_effect=lambda *a, **kw: held.append(limiter.adaptive.in_flight) or real_preprocess(*a, **kw))
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+    result = keyword_generator.generate_keywords(" ".join(["cuvant"] * 40), client=client, limiter=limiter)
+
+    assert '"a"' in result
+    assert held == [0, 1, 0, 1]
+    assert limiter.adaptive.in_flight == 0
@@ -0,0 +1,103 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import json
+import pytest
+from flask import Flask
+from db.models import db, File, FileKeyword
+from utils.keyword_loader import set_file_keywords, load_keyword_items, build_keyword_topics, file_keyword_values
+from utils.search import KeywordSearch
+
+
+@pytest.fixture
+def app():
+    app = Flask('test_keyword_loader')
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+
+
+def _file(path, uploaded=True):
+    f = File(file_path=path, file_extension=".txt", is_uploaded=uploaded)
+    db.session.add(f)
+    db.session.flush()
+    return f
+
+
+def test_keywords_are_stored_as_rows_and_queried(app):
+    f1, f2, f3 = _file("a.txt"), _file("b.txt"), _file("c.txt", uploaded=False)
+    blob = json.dumps({"locatie": "Arad", "domeniu": "", "legislatie": ["Legea 10/2001", "Legea 10/2001"],
+                       "cuvinte_cheie": ["Contract  de vanzare", "teren"]}, ensure_ascii=False)
+    set_file_keywords(f1, "Raspuns: " + blob)
+    set_file_keywords(f2, {"locatie": "Cluj", "cuvinte_cheie": ["teren"]})
+    set_file_keywords(f3, {"locatie": "Iasi"})
+    db.session.commit()
+
+    assert f1.meta_data["keywords"].startswith("Raspuns")
+    assert FileKeyword.query.filter_by(file_id=f1.id).count() == 4
+    assert sorted(file_keyword_values(f1.id)) == ["arad", "contract de vanzare", "legea 10/2001", "teren"]
+    assert sorted(build_keyword_topics()) == ["legislatie", "locatie"]
+
+    items = load_keyword_items()
+    assert [item["id"] for item in items] == [str(f1.id), str(f2.id)]
+    search = KeywordSearch(items)
+    assert [i["id"] for i in search.search("TEREN")] == [str(f1.id), str(f2.id)]
+    assert search.search("iasi") == []
+
+    # Re-extraction replaces the old rows
+    set_file_keywords(f1, {"cuvinte_cheie": ["uzucapiune"]})
+    db.session.commit()
+    assert file_keyword_values(f1.id) == ["uzucapiune"]
+
+
+def test_keyword_search_applies_deltas_copy_on_write(app):
+    search = KeywordSearch([{"id": "1", "keywords": ["teren", "arad"]}])
+    before = search.search("teren")
+
+    search.apply_deltas([
+        {"file_id": "2", "keywords": ["teren", "cluj"]},
+        {"file_id": "1", "keywords": ["uzucapiune"]},
+    ])
+
+    assert [i["id"] for i in before] == ["1"]  # earlier results are untouched
+    assert [i["id"] for i in search.search("teren")] == ["2"]
+    assert [i["id"] for i in search.search("uzucapiune")] == ["1"]
+    assert search.search("arad") == []
+
+    search.apply_deltas([{"file_id": "2", "keywords": []}])
+    assert search.search("cluj") == [] and [i["id"] for i in search.items] == ["1"]
+
+
+def test_keyword_deltas_only_rebuild_the_keywords_they_touch(app):
+    search = KeywordSearch([{"id": str(i), "keywords": ["contract", f"k{i}"]} for i in range(100)])
+    by_id, index = search._state
+    untouched = index["k1"]
+
+    search.apply_deltas([{"file_id": "100", "keywords": ["contract", "nou"]}])
+
+    assert search._state[1]["k1"] is untouched
+    # A reader holding the previous snapshot sees none of the batch
+    assert "nou" not in index and len(index["contract"]) == 100 and "100" not in by_id
+    assert len(search.search("contract")) == 101 and [i["id"] for i in search.search("nou")] == ["100"]
+
+
+def test_worker_delta_reaches_live_index(app):
+    from utils.keyword_loader import file_keyword_delta
+    from services.container import ServiceContainer
+    from utils.services.agentic.query_processor import QueryProcessor
+
+    f = _file("a.txt")
+    set_file_keywords(f, {"domeniu": "civil", "cuvinte_cheie": ["teren"]})
+    db.session.commit()
+    delta = file_keyword_delta(f.id)
+    assert delta == {"file_id": str(f.id), "keywords": ["civil", "teren"], "topics": ["domeniu"]}
+
+    services = ServiceContainer(app, socketio=None)
+    services._services["keyword_search"] = KeywordSearch([])
+    services._services["query_processor"] = QueryProcessor(ai_service=None, keyword_topics=["locatie"])
+    services.apply_keyword_deltas([delta])
+
+    assert [i["id"] for i in services.keyword_search.search("teren")] == [str(f.id)]
+    assert services.query_processor.keyword_topics == ["domeniu", "locatie"]
@@ -0,0 +1,105 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from datetime import datetime, timedelta
+
+import pytest
+from flask import Flask
+from db.models import db, Conversation, ConversationMessage
+from db.pagination import InvalidCursor
+from utils.websockets import sockets  # noqa: F401  (import order: sockets before comms)
+from utils.comms import get_messages_page, list_conversations
+from utils.services.conversation_manager import ConversationManager
+
+
+@pytest.fixture
+def app():
+    app = Flask('test_pagination')
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+
+
+def _conversation(messages):
+    conv = Conversation(title="Long", meta_data={"summary": "x" * 1000})
+    db.session.add(conv)
+    db.session.flush()
+    start = datetime(2026, 1, 1)
+    for i in range(messages):
+        # Pairs share a timestamp, so the id has to break ties
+        db.session.add(ConversationMessage(
+            conversation_id=conv.id, sender="user" if i % 2 == 0 else "ai",
+            message=f"m{i}", created_at=start + timedelta(seconds=i // 2),
+        ))
+    db.session.commit()
+    return conv
+
+
+def test_message_pages_walk_back_without_gaps_or_repeats(app):
+    conv = _conversation(7)
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = get_messages_page(conv.id, limit=3, cursor=cursor)
+        assert 'meta_data' not in page[0]
+        # Each page is in display order and older than the one before it
+        assert [m['id'] for m in page] == sorted(m['id'] for m in page)
+        seen = page + seen
+        if cursor is None:
+            break
+    assert [m['message'] for m in seen] == [f"m{i}" for i in range(7)]
+
+    with pytest.raises(InvalidCursor):
+        get_messages_page(conv.id, cursor="not-a-cursor")
+
+
+@pytest.mark.parametrize("descending", [True, False])
+def test_pages_include_rows_without_a_timestamp(app, descending):
+    from db.pagination import keyset_page
+    for i in range(5):
+        db.session.add(Conversation(title=f"c{i}", created_at=datetime(2026, 1, 1 + i)))
+    db.session.commit()
+    # Rows from before the column had a default
+    Conversation.query.filter(Conversation.title.in_(["c0", "c2", "c4"])).update({"created_at": None})
+    db.session.commit()
+    query = Conversation.query
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = keyset_page(query, Conversation.created_at, Conversation.id, 2, cursor, descending=descending)
+        seen += [c.title for c in page]
+        if cursor is None:
+            break
+    # Undated rows sort as the oldest, by id among themselves
+    expected = ["c3", "c1", "c4", "c2", "c0"]
+    assert seen == (expected if descending else expected[::-1])
+
+
+def test_build_context_limit_zero_sends_whole_history(app):
+    conv = _conversation(30)
+    manager = ConversationManager(db.session, ai_service=None, search_router=None, notifier=None)
+    assert len(manager.build_context(conv, limit=0)) == 30
+
+
+def test_conversation_list_is_newest_first(app):
+    for i in range(3):
+        db.session.add(Conversation(title=f"c{i}", created_at=datetime(2026, 1, 1 + i)))
+    db.session.commit()
+
+    first, cursor = list_conversations(limit=2)
+    rest, last_cursor = list_conversations(limit=2, cursor=cursor)
+    assert [c['title'] for c in first + rest] == ["c2", "c1", "c0"]
+    assert last_cursor is None
+
+
+def test_build_context_is_bounded_to_recent_messages(app):
+    conv = _conversation(30)
+    manager = ConversationManager(db.session, ai_service=None, search_router=None, notifier=None)
+
+    history = manager.build_context(conv, limit=4)
+    assert [h['content'] for h in history] == ["m26", "m27", "m28", "m29"]
+    assert [h['role'] for h in history] == ["user", "assistant", "user", "assistant"]
+    assert not manager.is_new(conv)
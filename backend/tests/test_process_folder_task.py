@@ -0,0 +1,215 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+import queue
+import threading
+import pytest
+from sqlalchemy import event
+from db.models import db, File, ProcessingTask
+from services import mp_init, job_queue
+from features.file_processing import file_processing_service as service
+
+
+@pytest.fixture
+def worker(tmp_path, monkeypatch):
+    monkeypatch.setattr(mp_init, "_worker_app", None)
+    monkeypatch.setenv("WORKER_LOG_PATH", str(tmp_path / "logs" / "worker.log"))
+    config = {"SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'jobs.db'}", "SQLALCHEMY_TRACK_MODIFICATIONS": False}
+    mp_init.worker_init(config)
+    app = mp_init.get_worker_app()
+    with app.app_context():
+        db.create_all()
+    return app, config
+
+
+def _fake_metadata(f, cancel_token=None, store=True):
+    if "bad" in f.file_path:
+        raise RuntimeError("model error")
+    return {"file_path": f.file_path, "meta_data": {"cuvinte_cheie": ["teren"]}}
+
+
+def _fake_upsert(f, cancel_token=None, keywords=None):
+    f.vector_count = 1
+    f.is_uploaded = True
+    return []
+
+
+def test_worker_reuses_one_app_and_resumes_unfinished_tasks(worker, tmp_path, monkeypatch):
+    app, config = worker
+    assert mp_init.get_worker_app(config) is app
+
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    for name in ("a.txt", "b.txt", "bad.txt"):
+        (docs / name).write_text("text", encoding="utf-8")
+    monkeypatch.setattr(service, "process_file_for_metadata", _fake_metadata)
+    monkeypatch.setattr(service, "upsert_file_to_vector_db", _fake_upsert)
+
+    with app.app_context():
+        job_queue.enqueue_job("s1", [str(docs)], [".txt"])
+
+    events = queue.Queue()
+    service.process_folder_task([str(docs)], [".txt"], "s1", events, config)
+    messages = [events.get_nowait() for _ in range(events.qsize())]
+    summary = messages[-1]["summary"]
+    assert summary["total_files"] == 3 and summary["uploaded_files"] == 2
+    assert summary["failed_files"][0]["file_name"].endswith("bad.txt")
+
+    with app.app_context():
+        bad = ProcessingTask.query.join(File).filter(File.file_path.like("%bad.txt"), ProcessingTask.phase == "metadata").one()
+        assert bad.status == "failed" and bad.attempts == bad.max_attempts
+
+
+def test_cancel_stops_worker_and_discards_file_in_flight(worker, tmp_path, monkeypatch):
+    app, config = worker
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    for name in ("a.txt", "b.txt", "c.txt"):
+        (docs / name).write_text("text", encoding="utf-8")
+    cancel_event = threading.Event()
+    calls = []
+
+    def metadata_then_cancel(f, cancel_token=None, store=True):
+        calls.append(f.file_path)
+        cancel_event.set()  # user cancels while this file's API call is in flight
+        return _fake_metadata(f, store=store)
+
+    monkeypatch.setattr(service, "TASK_THREADS", 1)
+    monkeypatch.setattr(service, "process_file_for_metadata", metadata_then_cancel)
+    monkeypatch.setattr(service, "upsert_file_to_vector_db", lambda f, **kwargs: pytest.fail("upsert after cancel"))
+
+    with app.app_context():
+        job_queue.enqueue_job("s2", [str(docs)], [".txt"])
+
+    events = queue.Queue()
+    service.process_folder_task([str(docs)], [".txt"], "s2", events, config, cancel_event)
+    messages = [events.get_nowait() for _ in range(events.qsize())]
+
+    assert len(calls) == 1
+    assert len(next(m for m in messages if "files_added" in m)["files_added"]) == 3
+    assert not any("complete" in m for m in messages)
+    assert messages[-1] == {"cancelled": True, "session_id": "s2"}  # the ack comes after the worker is done
+    with app.app_context():
+        assert db.session.get(job_queue.ProcessingJob, "s2").status == "cancelled"
+        assert {t.status for t in ProcessingTask.query.filter_by(job_id="s2")} == {"cancelled"}
+        assert all(f.meta_data is None for f in File.query.filter(File.file_path.like(f"{docs}%")))
+
+
+def test_job_reads_and_commits_in_batches(worker, tmp_path, monkeypatch):
+    app, config = worker
+    docs = tmp_path / "many"
+    docs.mkdir()
+    for i in range(60):
+        (docs / f"{i}.txt").write_text("text", encoding="utf-8")
+    monkeypatch.setattr(service, "process_file_for_metadata", _fake_metadata)
+    monkeypatch.setattr(service, "upsert_file_to_vector_db", _fake_upsert)
+    with app.app_context():
+        job_queue.enqueue_job("s3", [str(docs)], [".txt"])
+        engine = db.engine
+
+    commits, file_gets = [], []
+    event.listen(engine, "commit", lambda conn: commits.append(1))
+    event.listen(engine, "before_cursor_execute",
+                 lambda conn, cursor, stmt, params, ctx, many: file_gets.append(stmt) if stmt.startswith("SELECT") and "WHERE file.id = ?" in stmt else None)
+    events = queue.Queue()
+    service.process_folder_task([str(docs)], [".txt"], "s3", events, config)
+
+    messages = [events.get_nowait() for _ in range(events.qsize())]
+    assert messages[-1]["summary"]["uploaded_files"] == 60
+    assert sum(len(m["keywords_delta"]) for m in messages if "keywords_delta" in m) == 60
+    # Per-file lookups and per-file commits are gone: two phases of 60 files
+    # took a few commits per leased batch instead of several per file
+    assert not file_gets
+    assert len(commits) < 60
+
+
+def test_job_only_selects_its_own_files(worker, tmp_path, monkeypatch):
+    app, config = worker
+    docs = tmp_path / "own"
+    docs.mkdir()
+    for name in ("new.txt", "ready.txt"):
+        (docs / name).write_text("text", encoding="utf-8")
+    with app.app_context():
+        # Leftovers of an earlier failed session elsewhere, and a file of this
+        # folder that already has keywords but never reached the vector DB
+        db.session.add_all([
+            File(file_path=str(tmp_path / "old" / "stray.txt"), file_extension=".txt", meta_data=None),
+            File(file_path=str(tmp_path / "old" / "half.txt"), file_extension=".txt", meta_data={"tags": []}),
+            File(file_path=str(docs / "ready.txt"), file_extension=".txt", meta_data={"keywords": ["teren"]}),
+        ])
+        db.session.commit()
+        job_queue.enqueue_job("s4", [str(docs)], [".txt"])
+
+    metadata_calls, upsert_calls = [], []
+    monkeypatch.setattr(service, "process_file_for_metadata",
+                        lambda f, **kwargs: metadata_calls.append(f.file_path) or _fake_metadata(f, **kwargs))
+    monkeypatch.setattr(service, "upsert_file_to_vector_db",
+                        lambda f, **kwargs: upsert_calls.append(f.file_path) or _fake_upsert(f, **kwargs))
+    events = queue.Queue()
+    service.process_folder_task([str(docs)], [".txt"], "s4", events, config)
+
+    messages = [events.get_nowait() for _ in range(events.qsize())]
+    assert [m["upload_started"] for m in messages if "upload_started" in m] == [2]
+    assert metadata_calls == [str(docs / "new.txt")]
+    assert sorted(upsert_calls) == [str(docs / "new.txt"), str(docs / "ready.txt")]
+    with app.app_context():
+        assert not File.query.filter(File.file_path.like(f"{tmp_path / 'old'}%"), File.is_uploaded == True).count()  # noqa: E712
+        assert ProcessingTask.query.filter_by(job_id="s4").count() == 3
+
+
+def test_resumed_job_announces_the_files_left(worker, tmp_path, monkeypatch):
+    app, config = worker
+    monkeypatch.setattr(service, "process_file_for_metadata", _fake_metadata)
+    monkeypatch.setattr(service, "upsert_file_to_vector_db", _fake_upsert)
+    with app.app_context():
+        files = {name: File(file_path=str(tmp_path / name), file_extension=".txt") for name in ("a", "b", "c")}
+        files["c"].is_uploaded = True
+        db.session.add_all(files.values())
+        db.session.commit()
+        ids = {name: f.id for name, f in files.items()}
+        job_queue.enqueue_job("s5", [str(tmp_path)], [".txt"])
+        job_queue.add_tasks("s5", list(ids.values()), "metadata")
+        job_queue.add_tasks("s5", [ids["c"]], "upsert")
+        # Before the restart: a's metadata and all of c were done
+        for task in ProcessingTask.query.filter(ProcessingTask.file_id.in_([ids["a"], ids["c"]])):
+            task.status = "done"
+        job_queue.mark_scanned("s5")
+
+    events = queue.Queue()
+    service.process_folder_task([str(tmp_path)], [".txt"], "s5", events, config)
+
+    messages = [events.get_nowait() for _ in range(events.qsize())]
+    assert [m["upload_started"] for m in messages if "upload_started" in m] == [2]
+    assert messages[-1]["summary"]["uploaded_files"] == 3
+
+
+def test_phase_ends_when_a_files_rows_are_deleted_mid_run(worker, tmp_path, monkeypatch):
+    app, config = worker
+    docs = tmp_path / "cleaned"
+    docs.mkdir()
+    for name in ("a.txt", "gone.txt"):
+        (docs / name).write_text("text", encoding="utf-8")
+
+    def metadata_then_delete(f, cancel_token=None, store=True):
+        if f.file_path.endswith("gone.txt"):
+            # Cleanup removes the file's rows while its result is in flight
+            ProcessingTask.query.filter_by(file_id=f.id).delete()
+            File.query.filter_by(id=f.id).delete()
+            db.session.commit()
+        return _fake_metadata(f, store=store)
+
+    monkeypatch.setattr(service, "process_file_for_metadata", metadata_then_delete)
+    monkeypatch.setattr(service, "upsert_file_to_vector_db", _fake_upsert)
+    with app.app_context():
+        job_queue.enqueue_job("s6", [str(docs)], [".txt"])
+
+    events = queue.Queue()
+    worker_thread = threading.Thread(
+        target=service.process_folder_task, args=([str(docs)], [".txt"], "s6", events, config), daemon=True,
+    )
+    worker_thread.start()
+    worker_thread.join(timeout=20)
+    assert not worker_thread.is_alive()
+    messages = [events.get_nowait() for _ in range(events.qsize())]
+    assert messages[-1]["summary"]["uploaded_files"] == 1
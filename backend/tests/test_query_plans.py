@@ -0,0 +1,132 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+import re
+from contextlib import contextmanager
+from datetime import datetime
+
+import pytest
+from flask import Flask
+from sqlalchemy import event, text
+from db.models import db, Conversation, ConversationMessage, File, FileKeyword
+from utils.websockets import sockets  # noqa: F401  (import order: sockets before comms)
+from utils.comms import get_messages_page, list_conversations
+from utils.keyword_loader import load_keyword_items
+from utils.services.conversation_manager import load_file_records
+from features.file_processing.file_pipeline.file_scanning import scan_and_add_files
+from services import job_queue
+from features.file_processing import file_processing_service as service
+
+# Tables that grow with the workspace; reading one of them start to end is a regression
+HOT_TABLES = ("file", "file_keyword", "conversation", "conversation_message", "processing_task")
+FULL_SCAN = re.compile(r"^SCAN (%s)\b(?! USING (COVERING )?INDEX)" % "|".join(HOT_TABLES))
+
+
+@pytest.fixture
+def app():
+    app = Flask('test_query_plans')
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+
+
+@contextmanager
+def query_plans():
+    """
+    Record the SELECTs run inside the block; yields a list that is filled with
+    (statement, [plan details]) from EXPLAIN QUERY PLAN when the block exits.
+    """
+    statements, plans = [], []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    try:
+        yield plans
+    finally:
+        event.remove(db.engine, "before_cursor_execute", record)
+    with db.engine.connect() as conn:
+        for statement, parameters in statements:
+            rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).fetchall()
+            plans.append((statement, [row[-1] for row in rows]))
+
+
+def assert_no_full_scans(plans):
+    assert plans, "no queries were captured"
+    for statement, details in plans:
+        scans = [d for d in details if FULL_SCAN.match(d)]
+        assert not scans, f"full table scan {scans} in:\n{statement}"
+
+
+def _seed():
+    conv = Conversation(title="c", created_at=datetime(2026, 1, 1))
+    db.session.add(conv)
+    db.session.flush()
+    for i in range(3):
+        f = File(file_path=f"/data/{i}.txt", file_extension=".txt", is_uploaded=i > 0, meta_data={})
+        db.session.add(f)
+        db.session.flush()
+        db.session.add(FileKeyword(file_id=f.id, topic="cuvinte_cheie", value="x", normalized_value="x"))
+        db.session.add(ConversationMessage(conversation_id=conv.id, sender="user", message=str(i)))
+    db.session.commit()
+    return conv
+
+
+def test_scanner_looks_up_paths_by_index(app, tmp_path):
+    (tmp_path / "a.txt").write_text("a")
+    with query_plans() as plans:
+        scan_and_add_files(str(tmp_path), [".txt"])
+    assert_no_full_scans(plans)
+    assert any("ix_file_file_path" in d for _, details in plans for d in details)
+
+
+def test_uploaded_file_selections_use_indexes(app):
+    _seed()
+    with query_plans() as plans:
+        load_keyword_items()
+        load_file_records()
+        File.query.filter(File.file_path.in_(["/data/0.txt", "/data/1.txt"])).all()
+        File.query.filter(File.meta_data.isnot(None), File.is_uploaded == False).all()  # noqa: E712
+    assert_no_full_scans(plans)
+
+
+def test_conversation_pages_use_indexes(app):
+    conv = _seed()
+    with query_plans() as plans:
+        get_messages_page(conv.id, limit=2)
+        list_conversations(limit=2)
+    assert_no_full_scans(plans)
+    # The keyset order comes from the index, not a sort
+    for statement, details in plans:
+        assert not any("TEMP B-TREE" in d for d in details), statement
+
+
+def test_task_leasing_uses_claim_index(app):
+    _seed()
+    job_queue.enqueue_job("job", ["/data"], [".txt"])
+    job_queue.add_tasks("job", [f.id for f in File.query.all()], "metadata")
+    with query_plans() as plans:
+        job_queue.lease_tasks("job", "metadata", limit=2)
+    assert_no_full_scans(plans)
+
+
+def test_job_file_selection_uses_indexes(app):
+    _seed()
+    job_queue.enqueue_job("job", ["/data"], [".txt"])
+    with query_plans() as plans:
+        service._queue_scanned_files("job", ["/data/0.txt", "/data/1.txt"], 0)
+        service._queue_upserts("job", 0)
+    assert_no_full_scans(plans)
+
+
+def test_harness_flags_full_scans(app):
+    _seed()
+    with query_plans() as plans:
+        db.session.execute(text("SELECT * FROM file WHERE file_extension = '.txt'")).all()
+    with pytest.raises(AssertionError, match="full table scan"):
+        assert_no_full_scans(plans)
@@ -0,0 +1,68 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import threading
+import time
+import pytest
+from utils.services.rate_limiter import TokenBucket, RateLimiter, AdaptiveConcurrency, estimate_tokens
+
+
+def test_token_bucket_allows_burst_then_delays():
+    bucket = TokenBucket(60)  # one token per second
+    for _ in range(60):
+        assert bucket.reserve(1) == 0.0
+    delay = bucket.reserve(1)
+    assert 0.9 < delay <= 1.0
+
+
+def test_token_bucket_clamps_oversized_requests():
+    bucket = TokenBucket(10)
+    assert bucket.reserve(1000) == 0.0
+
+
+def test_rate_limiter_rejects_unknown_purpose():
+    limiter = RateLimiter(rpm=100, tpm=1000)
+    with pytest.raises(ValueError):
+        with limiter.limit("unknown"):
+            pass
+
+
+def test_concurrency_cap_is_respected():
+    limiter = RateLimiter(rpm=10000, tpm=100000, concurrency={"keywords": 2})
+    lock = threading.Lock()
+    active = 0
+    peak = 0
+
+    def worker():
+        nonlocal active, peak
+        with limiter.limit("keywords", estimate_tokens("abcd" * 10)):
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.01)
+            with lock:
+                active -= 1
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert peak == 2
+
+
+def test_adaptive_concurrency_aimd():
+    adaptive = AdaptiveConcurrency(max_limit=8)
+    adaptive.on_throttle()
+    adaptive.on_throttle()
+    assert adaptive.limit == 2
+    for _ in range(2):
+        adaptive.on_success()
+    assert adaptive.limit == 3
+
+
+def test_throttle_pause_is_capped():
+    limiter = RateLimiter(rpm=60, max_pause=2.0)
+    limiter.on_throttle(600.0)
+    assert limiter.requests.reserve(1) <= 2.0 + 1.0
+
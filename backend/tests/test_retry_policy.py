@@ -0,0 +1,62 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import httpx
+import openai
+import pytest
+from utils.services import retry_policy
+from utils.services.retry_policy import classify_error, retry_after_seconds, server_retry_after, openai_retry, RATE_LIMIT, SERVER_ERROR
+
+
+def _status_error(cls, status, headers=None):
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    response = httpx.Response(status, headers=headers or {}, request=request)
+    return cls("error", response=response, body=None)
+
+
+def test_classify_error():
+    assert classify_error(_status_error(openai.RateLimitError, 429)) == RATE_LIMIT
+    assert classify_error(_status_error(openai.InternalServerError, 503)) == SERVER_ERROR
+    assert classify_error(_status_error(openai.BadRequestError, 400)) is None
+    assert classify_error(ValueError("nope")) is None
+
+
+def test_retry_after_headers():
+    assert retry_after_seconds(_status_error(openai.RateLimitError, 429, {"retry-after-ms": "250"})) == 0.25
+    assert retry_after_seconds(_status_error(openai.RateLimitError, 429, {"retry-after": "3"})) == 3.0
+    exc = _status_error(openai.RateLimitError, 429, {
+        "x-ratelimit-reset-requests": "1s",
+        "x-ratelimit-reset-tokens": "1m30s",
+    })
+    assert retry_after_seconds(exc) == 90.0
+    assert server_retry_after(exc) is None  # time to a full refill, not a retry hint
+
+
+def test_retries_rate_limits_and_throttles(mocker):
+    mocker.patch("tenacity.nap.time.sleep")
+    throttle = mocker.patch.object(retry_policy.get_rate_limiter(), "on_throttle")
+    calls = {"n": 0}
+
+    @openai_retry(max_attempts=3)
+    def flaky():
+        calls["n"] += 1
+        if calls["n"] < 3:
+            raise _status_error(openai.RateLimitError, 429, {"retry-after": "1"})
+        return "ok"
+
+    assert flaky() == "ok"
+    assert calls["n"] == 3
+    assert throttle.call_count == 2
+
+
+def test_does_not_retry_client_errors():
+    calls = {"n": 0}
+
+    @openai_retry(max_attempts=3)
+    def bad():
+        calls["n"] += 1
+        raise _status_error(openai.BadRequestError, 400)
+
+    with pytest.raises(openai.BadRequestError):
+        bad()
+    assert calls["n"] == 1
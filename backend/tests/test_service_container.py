@@ -0,0 +1,56 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from flask import Flask
+from services.container import ServiceContainer
+from routes.health_routes import health_bp
+
+
+class InlineSocketIO:
+    def start_background_task(self, target, *args, **kwargs):
+        target(*args, **kwargs)
+
+
+def test_services_are_built_once_on_first_use(monkeypatch):
+    app = Flask('test_service_container')
+    app.register_blueprint(health_bp, url_prefix='/health')
+    services = ServiceContainer(app, InlineSocketIO())
+    app.services = services
+    built = []
+    monkeypatch.setattr(ServiceContainer, 'conv_manager',
+                        property(lambda self: self._get('conv_manager', lambda: built.append(1) or object())))
+
+    client = app.test_client()
+    assert client.get('/health/ready').status_code == 503
+
+    services.start_warm_up()
+    first = services.conv_manager
+    assert services.conv_manager is first and built == [1]
+    resp = client.get('/health/ready')
+    assert resp.status_code == 200 and resp.get_json()['services'] == ['conv_manager']
+
+
+def test_lazy_build_after_failed_warm_up_marks_ready(monkeypatch):
+    from utils.services import conversation_manager
+    app = Flask('test_service_container')
+    app.register_blueprint(health_bp, url_prefix='/health')
+    services = ServiceContainer(app, InlineSocketIO())
+    app.services = services
+    for name in ('ai_service', 'search_router', 'notifier'):
+        monkeypatch.setattr(ServiceContainer, name, property(lambda self: None))
+    attempts = []
+
+    def manager(*args):
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("index unavailable")
+        return object()
+
+    monkeypatch.setattr(conversation_manager, 'ConversationManager', manager)
+    client = app.test_client()
+
+    services.start_warm_up()
+    assert client.get('/health/ready').status_code == 503
+    services.conv_manager  # first request builds it lazily
+    resp = client.get('/health/ready')
+    assert resp.status_code == 200 and resp.get_json()['error'] is None
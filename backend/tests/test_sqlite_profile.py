@@ -0,0 +1,144 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from flask import Flask
+from sqlalchemy import text
+from db.models import db, Conversation, ConversationMessage, File, FileKeyword
+from db.sqlite import apply_sqlite_profile, attach_sqlite_pragmas, _set_sqlite_pragmas, SQLITE_BUSY_TIMEOUT_MS
+from services.db_writer import DBWriter
+from utils.websockets import sockets  # noqa: F401  (import order: sockets before comms)
+from utils.comms import get_messages_page
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = Flask('test_sqlite_profile')
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'profile.db'}"
+    apply_sqlite_profile(app)
+    db.init_app(app)
+    attach_sqlite_pragmas(app, db)
+    with app.app_context():
+        db.create_all()
+        yield app
+
+
+def _set_meta(file_id, value):
+    f = db.session.get(File, file_id)
+    if f is None:
+        raise LookupError(file_id)
+    f.meta_data = {"keywords": value}
+
+
+def test_connections_use_the_profile(app):
+    assert app.config["SQLALCHEMY_ENGINE_OPTIONS"]["pool_size"] >= 10
+    with db.engine.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+        assert conn.exec_driver_sql("PRAGMA busy_timeout").scalar() == SQLITE_BUSY_TIMEOUT_MS
+        assert conn.exec_driver_sql("PRAGMA foreign_keys").scalar() == 1
+
+
+def test_pragmas_only_apply_to_the_apps_engine(app, tmp_path):
+    from sqlalchemy import create_engine, event
+    attach_sqlite_pragmas(app, db)  # a second call does not register twice
+    assert event.contains(db.engine, "connect", _set_sqlite_pragmas)
+    other = create_engine(f"sqlite:///{tmp_path / 'other.db'}")
+    with other.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "delete"
+        assert conn.exec_driver_sql("PRAGMA foreign_keys").scalar() == 0
+    other.dispose()
+
+
+def test_deleting_a_file_cascades_to_its_keywords(app):
+    f = File(file_path="/k/a.txt", file_extension=".txt")
+    db.session.add(f)
+    db.session.flush()
+    db.session.add(FileKeyword(file_id=f.id, topic="cuvinte_cheie", value="x", normalized_value="x"))
+    db.session.commit()
+
+    File.query.filter_by(id=f.id).delete(synchronize_session=False)
+    db.session.commit()
+    assert FileKeyword.query.count() == 0
+
+
+def test_writer_groups_concurrent_writes_and_isolates_failures(app):
+    files = [File(file_path=f"/w/{i}.txt", file_extension=".txt") for i in range(40)]
+    db.session.add_all(files)
+    db.session.commit()
+    ids = [f.id for f in files]
+
+    with DBWriter(app, batch_size=50, max_delay=0.2) as writer:
+        with ThreadPoolExecutor(max_workers=10) as pool:
+            futures = list(pool.map(lambda fid: writer.submit(_set_meta, fid, fid), ids))
+        missing = writer.submit(_set_meta, -1, 0)
+        for future in futures:
+            future.result(timeout=10)
+        with pytest.raises(LookupError):
+            missing.result(timeout=10)
+
+    assert writer.batches < len(ids)
+    db.session.expire_all()
+    assert all(f.meta_data == {"keywords": f.id} for f in File.query.all())
+
+
+def test_ingestion_and_chat_do_not_block_each_other(app):
+    """
+    Ten ingestion threads write through the DBWriter (each write holding the
+    lock a little) while a chat thread keeps adding and paging messages on its
+    own connection. Chat must neither fail with "database is locked" nor wait
+    for the ingestion to finish.
+    """
+    files = [File(file_path=f"/s/{i}.txt", file_extension=".txt") for i in range(300)]
+    conv = Conversation(title="chat")
+    db.session.add_all(files + [conv])
+    db.session.commit()
+    ids, conv_id = [f.id for f in files], conv.id
+
+    def slow_write(file_id):
+        _set_meta(file_id, "x" * 100)
+        time.sleep(0.002)
+
+    chat_latencies, errors = [], []
+    ingesting = threading.Event()
+    ingesting.set()
+
+    def chat():
+        with app.app_context():
+            i = 0
+            while ingesting.is_set():
+                start = time.perf_counter()
+                try:
+                    db.session.add(ConversationMessage(conversation_id=conv_id, sender="user", message=str(i)))
+                    db.session.commit()
+                    get_messages_page(conv_id, limit=20)
+                except Exception as e:  # pragma: no cover - reported below
+                    db.session.rollback()
+                    errors.append(e)
+                chat_latencies.append(time.perf_counter() - start)
+                i += 1
+            db.session.remove()
+
+    chat_thread = threading.Thread(target=chat)
+    started = time.perf_counter()
+    with DBWriter(app) as writer:
+        chat_thread.start()
+        with ThreadPoolExecutor(max_workers=10) as pool:
+            futures = list(pool.map(lambda fid: writer.submit(slow_write, fid), ids))
+        for future in futures:
+            future.result(timeout=60)
+    ingest_seconds = time.perf_counter() - started
+    ingesting.clear()
+    chat_thread.join()
+
+    assert not errors
+    assert len(chat_latencies) > 5
+    # No chat operation waited for anything close to the whole ingestion
+    assert max(chat_latencies) < max(1.0, ingest_seconds / 2)
+    with app.app_context():
+        assert db.session.execute(text("SELECT COUNT(*) FROM file WHERE meta_data IS NOT NULL")).scalar() == len(ids)
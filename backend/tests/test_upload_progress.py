@@ -0,0 +1,71 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import utils.websockets.sockets  # noqa: F401  (import order: sockets before upload_tracking)
+from utils.websockets import upload_tracking
+from utils.websockets.upload_tracking import UploadProgress, FRAME_RECENT_FILES
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_results_are_coalesced_into_rate_limited_frames(monkeypatch):
+    frames = []
+    monkeypatch.setattr(upload_tracking, "emit_upload_progress", lambda sid, frame: frames.append(frame))
+    clock = FakeClock()
+    progress = UploadProgress("s1", total_files=1000, interval=0.25, every=400, clock=clock)
+
+    for i in range(300):
+        progress.record(f"/docs/{i}.txt", success=i % 100 != 0, error="parse error")
+        progress.maybe_flush()
+    assert frames == []  # same instant, below the file threshold
+
+    clock.now += 1.0
+    progress.maybe_flush()
+    frame = frames[-1]
+    assert (frame["processed"], frame["uploaded"], frame["failed"]) == (300, 297, 3)
+    assert frame["files_per_second"] == 300.0 and frame["eta_seconds"] == round(700 / 300, 1)
+    assert len(frame["recent_files"]) == FRAME_RECENT_FILES and len(frame["new_failures"]) == 3
+
+    for i in range(400):
+        progress.record(f"/more/{i}.txt", success=True)
+    assert len(frames) == 2 and frames[-1]["new_failures"] == []  # flushed by count, no new failures
+
+    progress.maybe_flush()
+    assert len(frames) == 2  # nothing pending
+    assert progress.get_failures(offset=1, limit=5) == {
+        "total": 3,
+        "failures": [{"file_name": "/docs/100.txt", "error": "parse error"},
+                     {"file_name": "/docs/200.txt", "error": "parse error"}],
+    }
+
+
+def test_event_log_is_bounded_replayable_and_expires():
+    clock = FakeClock()
+    log = upload_tracking.UploadEventLog(maxlen=3, ttl=60, completed_ttl=5, clock=clock)
+    log.record("s1", "upload_started", {"total_files": 10})
+    log.record("s1", "upload_progress", {"processed": 1})
+    log.record("s1", "upload_progress", {"processed": 5})  # replaces the previous frame
+    assert log.since("s1") == [("upload_started", {"total_files": 10, "seq": 1}),
+                               ("upload_progress", {"processed": 5, "seq": 3})]
+    log.record("s1", "file_failed", {"file_name": "a"})
+    log.record("s1", "upload_complete", {})
+    assert [d["seq"] for _, d in log.since("s1")] == [3, 4, 5]  # ring keeps the newest 3
+    assert [d["seq"] for _, d in log.since("s1", offset=4)] == [5]
+
+    log.join("s1", "sid-1")
+    assert log.has_clients("s1")
+    assert log.leave("sid-1") == "s1" and not log.has_clients("s1")
+
+    log.record("s2", "upload_started", {"total_files": 1})  # never completes
+    clock.now += 10
+    assert log.expired() == ["s1"]
+    clock.now += 60
+    assert sorted(log.expired()) == ["s1", "s2"]
+    log.discard("s1")
+    assert len(log) == 1 and log.since("s1") == []
@@ -0,0 +1,108 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import pytest
+from flask import Flask
+from db.models import db, File
+from services import vector_index
+
+
+class FakeIndexClient:
+    def __init__(self, ids):
+        self.ids = set(ids)
+        self.deleted = []
+
+    def list_ids(self, prefix=None, namespace=None):
+        yield sorted(i for i in self.ids if prefix is None or i.startswith(prefix))
+
+    def delete_ids(self, ids, namespace=None):
+        self.deleted.extend(ids)
+        self.ids.difference_update(ids)
+        return len(ids)
+
+
+@pytest.fixture
+def app():
+    app = Flask('test_vector_index')
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+
+
+def _file(path, vector_count=None, is_uploaded=True):
+    f = File(file_path=path, file_extension=".txt", is_uploaded=is_uploaded, vector_count=vector_count)
+    db.session.add(f)
+    db.session.commit()
+    return f
+
+
+def test_delete_file_vectors_uses_chunk_ids(app):
+    tracked = _file("/docs/a.txt", vector_count=2)
+    legacy = _file("/docs/b.txt")
+    client = FakeIndexClient([f"{tracked.id}_chunk_0", f"{tracked.id}_chunk_1",
+                              f"{legacy.id}_chunk_0", f"{legacy.id}_chunk_7", "99_chunk_0"])
+
+    assert vector_index.delete_file_vectors([tracked, legacy], client=client) == 4
+    assert client.ids == {"99_chunk_0"}
+
+
+def test_delete_file_vectors_filters_files_never_uploaded_in_one_call(app):
+    pending = [_file(f"/docs/{i}.txt", is_uploaded=False) for i in range(3)]
+    client = FakeIndexClient(["99_chunk_0"])
+    client.list_ids = lambda **kwargs: pytest.fail("listed vectors per file")
+    filters = []
+    client.delete = lambda filter=None, namespace=None: filters.append(filter)
+
+    assert vector_index.delete_file_vectors(pending, client=client) == 0
+    assert filters == [{"source_file": {"$in": [f.file_path for f in pending]}}]
+
+
+def test_delete_file_vectors_lists_interrupted_upserts_without_filter_deletes(app):
+    pending = _file("/docs/p.txt", is_uploaded=False)
+    client = FakeIndexClient([f"{pending.id}_chunk_0", f"{pending.id}_chunk_1", "99_chunk_0"])
+
+    def no_filter_deletes(filter=None, namespace=None):
+        raise RuntimeError("serverless indexes do not support deleting by metadata")
+    client.delete = no_filter_deletes
+
+    assert vector_index.delete_file_vectors([pending], client=client) == 2
+    assert client.ids == {"99_chunk_0"}
+
+
+def test_reconcile_removes_orphans_only(app):
+    shrunk = _file("/docs/a.txt", vector_count=1)
+    ingesting = _file("/docs/b.txt", vector_count=1, is_uploaded=False)
+    client = FakeIndexClient([
+        f"{shrunk.id}_chunk_0", f"{shrunk.id}_chunk_1",        # chunk 1 left over from a longer version
+        f"{ingesting.id}_chunk_0", f"{ingesting.id}_chunk_3",  # re-ingestion in progress
+        "999_chunk_0",                                         # file deleted
+        "manual-vector",
+    ])
+
+    dry = vector_index.reconcile_vectors(client=client, dry_run=True)
+    assert dry == {"scanned": 6, "orphans": 2, "deleted": 0} and not client.deleted
+
+    vector_index.reconcile_vectors(client=client)
+    assert sorted(client.deleted) == sorted([f"{shrunk.id}_chunk_1", "999_chunk_0"])
+
+
+def test_cleanup_uses_upsert_namespace_and_removes_dependent_rows(app, monkeypatch):
+    from types import SimpleNamespace
+    from db.models import FileKeyword, ProcessingTask
+    from services import cleanup, job_queue
+
+    monkeypatch.delenv("PINECONE_NAMESPACE", raising=False)
+    f = _file("/docs/a.txt", vector_count=1)
+    db.session.add(FileKeyword(file_id=f.id, topic="cuvinte_cheie", value="x", normalized_value="x"))
+    job_queue.enqueue_job("s1", ["/docs"], [".txt"])
+    job_queue.add_tasks("s1", [f.id], "metadata")
+    namespaces = []
+    monkeypatch.setattr(cleanup, "delete_file_vectors", lambda files, namespace=None: namespaces.append(namespace) or 1)
+
+    cleanup.SessionCleanup(SimpleNamespace(session_id="s1", file_items=[f.id])).run()
+
+    assert namespaces == [None]  # the index's default namespace, as the upserts use
+    assert not File.query.count()
+    assert not FileKeyword.query.count() and not ProcessingTask.query.count()
@@ -1,13 +1,13 @@
 # comms.py
 from db.models import db, Conversation, ConversationMessage
-from utils.ai_apis import send_to_api, openai_api_logic
 from flask import current_app
+from sqlalchemy.orm import load_only
+from db.pagination import keyset_page
 from utils.websockets.sockets import socketio
 import logging
 
 import datetime
 import pendulum
-from utils.search import default_search as search
 
 def conversation_to_dict(conversation):
     return {
@@ -32,6 +32,10 @@ def process_chat_message(frontend_message, conversation_id=None, additional_para
     Returns a dictionary with conversation details, including a new_conversation_id
     if a new conversation was created.
     """
+    # Imported here: openai / pinecone are slow to import and only needed for chat.
+    from utils.ai_apis import send_to_api, openai_api_logic
+    from utils.search import default_search as search
+
     # Step 1: Ensure a valid conversation exists.
     if conversation_id:
         conversation = Conversation.query.get(conversation_id)
@@ -40,10 +44,8 @@ def process_chat_message(frontend_message, conversation_id=None, additional_para
             db.session.add(conversation)
             db.session.commit()
             conversation_id = conversation.id
-            with current_app.app_context():
-                conversation_list = [conversation_to_dict(c) for c in Conversation.query.all()]
-                socketio.emit('conversation_list', conversation_list)
-                socketio.emit('new_conversation', {'id': conversation.id})
+            # conversation_created is emitted on commit; no full list broadcast
+            socketio.emit('new_conversation', {'id': conversation.id})
         # Consider the conversation new if it has fewer than two messages.
         is_new = len(conversation.messages) < 2
     else:
@@ -137,6 +139,8 @@ def summarize_conversation(conversation_id, new_message, additional_params=None)
     Returns:
         str: A new summary of the conversation.
     """
+    from utils.ai_apis import send_to_api, openai_api_logic
+
     # Retrieve the conversation from the database.
     conversation = Conversation.query.get(conversation_id)
     if not conversation:
@@ -194,8 +198,23 @@ def get_all_conversation_ids():
     Retrieve all conversation IDs from the database.
     Returns a list of IDs.
     """
-    conversations = Conversation.query.all()
-    return [conversation.id for conversation in conversations]
+    return [row.id for row in db.session.query(Conversation.id).all()]
+
+
+def list_conversations(limit=50, cursor=None):
+    """
+    Retrieve one page of conversations, newest first, with only the lightweight
+    fields (no meta_data). `cursor` is the next_cursor of the previous page.
+    Returns a tuple of (conversations, next_cursor).
+    """
+    from utils.emitters.emitters import conversation_summary
+
+    query = db.session.query(Conversation).options(
+        load_only(Conversation.id, Conversation.title,
+                  Conversation.created_at, Conversation.updated_at)
+    )
+    rows, next_cursor = keyset_page(query, Conversation.created_at, Conversation.id, limit, cursor)
+    return [conversation_summary(c) for c in rows], next_cursor
 
 def model_to_dict(instance):
     result = {}
@@ -207,6 +226,38 @@ def model_to_dict(instance):
         result[column.name] = value
     return result
 
+def message_summary(message):
+    """
+    Message fields sent to the client (meta_data is left out).
+    """
+    return {
+        "id": message.id,
+        "conversation_id": message.conversation_id,
+        "sender": message.sender,
+        "message": message.message,
+        "created_at": pendulum.instance(message.created_at).to_iso8601_string() if message.created_at else None,
+    }
+
+def get_messages_page(conversation_id, limit=50, cursor=None, sender=None):
+    """
+    Retrieve one page of a conversation's messages, walking back from the newest.
+
+    The page itself is returned oldest first (display order); pass the returned
+    cursor to get the messages before it. Served by the
+    (conversation_id, created_at, id) index, so opening a long conversation
+    costs the same as a short one.
+    Returns a tuple of (messages, next_cursor).
+    """
+    query = ConversationMessage.query.filter_by(conversation_id=conversation_id).options(
+        load_only(ConversationMessage.id, ConversationMessage.conversation_id,
+                  ConversationMessage.sender, ConversationMessage.message,
+                  ConversationMessage.created_at)
+    )
+    if sender is not None:
+        query = query.filter_by(sender=sender)
+    rows, next_cursor = keyset_page(query, ConversationMessage.created_at, ConversationMessage.id, limit, cursor)
+    return [message_summary(m) for m in reversed(rows)], next_cursor
+
 def get_all_messages_for_conversation(conversation_id, sender=None):
     """
     Retrieve all messages for a given conversation ID.
@@ -1,10 +1,14 @@
 from flask import current_app
-from sqlalchemy import event
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import object_session
 from db.models import Conversation
 from utils.websockets.sockets import socketio
 from db.models import db  # Adjust the import to match your project structure
 import logging
 
+# Key in Session.info where conversation changes wait for the commit
+PENDING_EVENTS_KEY = "conversation_events"
+
 def conversation_to_dict(conversation):
     return {
         'id': conversation.id,
@@ -14,43 +18,85 @@ def conversation_to_dict(conversation):
         'updated_at': conversation.updated_at.isoformat() if conversation.updated_at else None,
     }
 
+def conversation_summary(conversation):
+    """
+    Lightweight fields of a conversation for lists and change events (no meta_data,
+    which holds the long summaries). Reads only already-loaded attributes, so it
+    is safe inside a flush.
+    """
+    loaded = inspect(conversation).dict
+    created_at = loaded.get('created_at')
+    updated_at = loaded.get('updated_at')
+    return {
+        'id': loaded.get('id'),
+        'title': loaded.get('title'),
+        'created_at': created_at.isoformat() if created_at else None,
+        'updated_at': updated_at.isoformat() if updated_at else None,
+    }
+
 class EmitterManager:
     def __init__(self):
         self.app = None
+        self._listening = False
 
     def init_app(self, app):
         """
         Initialize emitter manager with Flask app context.
-        Registers SQLAlchemy event listeners if needed.
+        Registers SQLAlchemy event listeners that turn conversation inserts,
+        updates and deletes into `conversation_created` / `conversation_updated`
+        / `conversation_deleted` events. Changes are collected during the flush
+        (without querying) and emitted once the transaction commits.
         """
         self.app = app
-        # Example: emit full list when a conversation is inserted or updated
-        @event.listens_for(Conversation, 'after_insert')
-        @event.listens_for(Conversation, 'after_update')
-        def _emit_conversation(mapper, connection, target):
-            self.emit_conversation_update(target.id)
+        if self._listening:
+            return
+        self._listening = True
+
+        def _queue(kind):
+            def listener(mapper, connection, target):
+                session = object_session(target)
+                if session is not None:
+                    session.info.setdefault(PENDING_EVENTS_KEY, []).append((kind, conversation_summary(target)))
+            return listener
+
+        event.listen(Conversation, 'after_insert', _queue('conversation_created'))
+        event.listen(Conversation, 'after_update', _queue('conversation_updated'))
+        event.listen(Conversation, 'after_delete', _queue('conversation_deleted'))
+
+        @event.listens_for(db.session, 'after_commit')
+        def _emit_committed(session):
+            for event_name, data in self._collapse(session.info.pop(PENDING_EVENTS_KEY, [])):
+                self.emit(event_name, data)
+
+        @event.listens_for(db.session, 'after_soft_rollback')
+        def _discard_rolled_back(session, previous_transaction):
+            session.info.pop(PENDING_EVENTS_KEY, None)
+
+    @staticmethod
+    def _collapse(pending):
+        """
+        One event per conversation and commit: the last state wins, a conversation
+        created in the same transaction stays 'created', and deleted wins over all.
+        """
+        by_id = {}
+        for kind, data in pending:
+            previous = by_id.get(data['id'])
+            if previous and previous[0] == 'conversation_created' and kind == 'conversation_updated':
+                kind = 'conversation_created'
+            by_id[data['id']] = (kind, data)
+        for kind, data in by_id.values():
+            if kind == 'conversation_deleted':
+                data = {'id': data['id']}
+            yield kind, data
 
     def emit(self, event_name, data):
         """Emit an event via Socket.IO."""
         logging.info(f"Emitting event '{event_name}' with data: {data}")
-        socketio.emit(event_name, data)
-
-    def emit_conversation_update(self, conversation_id):
-        """Emit update for a single conversation."""
-        with self.app.app_context():
-            conversation = Conversation.query.get(conversation_id)
-            if conversation:
-                data = conversation_to_dict(conversation)
-                self.emit("conversation_update", data)
-            else:
-                logging.error(f"Conversation with ID {conversation_id} not found.")
-
-    def emit_all_conversations(self):
-        """Emit list of all conversations."""
-        with self.app.app_context():
-            conversations = Conversation.query.all()
-            data = [conversation_to_dict(conv) for conv in conversations]
-            self.emit("conversation_list", data)
+        try:
+            socketio.emit(event_name, data)
+        except Exception:
+            # The transaction is already committed; a failed broadcast must not fail it
+            logging.error(f"Failed to emit '{event_name}'", exc_info=True)
 
 # Singleton instance for application use
 emitters = EmitterManager()
@@ -1,88 +1,178 @@
 import logging
 import re
 import json
-from typing import List, Dict, Any, Set
-from db.models import File
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from db.models import db, File, FileKeyword
 
 logger = logging.getLogger(__name__)
 
-def load_keyword_items() -> List[Dict[str, Any]]:
-    """
-    Build a simple keyword-only index from uploaded File records.
-    Each item has:
-      - id: File.id (as string)
-      - metadata: {'keywords': JSON-string '{"keywords":[...]}' }
-    """
-    items: List[Dict[str, Any]] = []
-    files = File.query.filter_by(is_uploaded=True).all()
-    for f in files:
-        metadata = f.meta_data or {}
-        kws_raw   = metadata.get("keywords", [])
-        logger.debug("load_keyword_items: file_id=%s raw_kws=%r", f.id, kws_raw)
-
-        # Parse JSON blob if stored as a string
-        if isinstance(kws_raw, str):
-            match = re.search(r"(\{.*\})", kws_raw, re.DOTALL)
-            if match:
-                try:
-                    kw_dict = json.loads(match.group(1))
-                    kws = kw_dict.get("keywords", [])
-                except Exception as e:
-                    logger.warning("Failed to parse keywords for file %s: %s", f.id, e)
-                    kws = []
-            else:
-                kws = []
-        elif isinstance(kws_raw, (list, tuple)):
-            kws = kws_raw
-        else:
-            kws = []
-
-        items.append({
-            "id": str(f.id),
-            "metadata": {"keywords": json.dumps({"keywords": kws})},
-        })
-    return items
+# Free-form keyword list inside the keyword record; every other field is a topic.
+KEYWORD_LIST_TOPIC = "cuvinte_cheie"
+MAX_NORMALIZED_LENGTH = 255
 
 
-def build_keyword_topics() -> List[str]:
+def normalize_keyword(value: Any) -> str:
     """
-    Extracts top-level metadata fields (as lowercase strings)
-    from every File.meta_data['keywords'] JSON blob,
-    excluding 'cuvinte_cheie'.
+    Lowercase and collapse whitespace; this is the form keywords are matched on.
     """
-    topics: Set[str] = set()
-    files = File.query.all()
+    return " ".join(str(value).split()).lower()[:MAX_NORMALIZED_LENGTH]
 
-    for f in files:
-        metadata = f.meta_data or {}
-        kws_raw: Any = metadata.get("keywords")
-        logger.debug("build_keyword_topics: file_id=%s raw_kws=%r", f.id, kws_raw)
-        if not kws_raw:
-            continue
 
-        # 1) If it's a string, try to pull out the JSON object
-        if isinstance(kws_raw, str):
-            match = re.search(r"(\{.*\})", kws_raw, re.DOTALL)
-            if not match:
-                continue
+def parse_keyword_blob(raw: Any) -> Dict[str, Any]:
+    """
+    Decode a legacy meta_data['keywords'] value (JSON string, possibly wrapped in
+    extra text, a dict, or a bare list) into a dict of topic -> value(s).
+    """
+    if isinstance(raw, dict):
+        return raw
+    if isinstance(raw, (list, tuple)):
+        return {KEYWORD_LIST_TOPIC: list(raw)}
+    if isinstance(raw, str):
+        match = re.search(r"(\{.*\})", raw, re.DOTALL)
+        if match:
             try:
-                kw_dict: Dict[str, Any] = json.loads(match.group(1))
+                parsed = json.loads(match.group(1))
+                return parsed if isinstance(parsed, dict) else {}
             except json.JSONDecodeError as e:
-                logger.warning("Invalid JSON in file %s: %s", f.id, e)
+                logger.warning("Invalid keyword JSON: %s", e)
+    return {}
+
+
+def _flatten(value: Any) -> List[Any]:
+    if isinstance(value, dict):
+        return [v for item in value.values() for v in _flatten(item)]
+    if isinstance(value, (list, tuple)):
+        return [v for item in value for v in _flatten(item)]
+    return [value]
+
+
+def keyword_rows(file_id: int, raw: Any) -> List[FileKeyword]:
+    """
+    Turn one keyword record into FileKeyword rows, skipping empty and duplicate values.
+    """
+    rows, seen = [], set()
+    for topic, value in parse_keyword_blob(raw).items():
+        topic = str(topic).strip().lower()
+        # Older records nest the list under 'keywords'
+        if topic == "keywords":
+            topic = KEYWORD_LIST_TOPIC
+        for v in _flatten(value):
+            if v is None or not str(v).strip():
                 continue
+            norm = normalize_keyword(v)
+            if (topic, norm) in seen:
+                continue
+            seen.add((topic, norm))
+            rows.append(FileKeyword(file_id=file_id, topic=topic, value=str(v).strip(), normalized_value=norm))
+    return rows
+
+
+def set_file_keywords(f: File, raw: Any) -> None:
+    """
+    Store a keyword record for a file: keep the raw record in meta_data (it marks
+    the file as processed) and replace the file's structured FileKeyword rows.
+    The caller commits.
+    """
+    f.meta_data = f.meta_data or {}
+    f.meta_data["keywords"] = raw
+    FileKeyword.query.filter_by(file_id=f.id).delete(synchronize_session=False)
+    db.session.add_all(keyword_rows(f.id, raw))
 
-        # 2) If it's already a dict (rare), use it directly
-        elif isinstance(kws_raw, dict):
-            kw_dict = kws_raw
 
-        # 3) Any other type (list, None, etc.) — skip
-        else:
-            continue
+def file_keyword_values(file_id: int) -> List[str]:
+    """
+    All distinct normalized keyword values of a file, across topics.
+    """
+    rows = (
+        db.session.query(FileKeyword.normalized_value)
+        .filter(FileKeyword.file_id == file_id)
+        .distinct()
+        .all()
+    )
+    return [value for (value,) in rows]
 
-        # 4) Add each top-level key (except 'cuvinte_cheie')
-        for key in kw_dict:
-            if key != "cuvinte_cheie":
-                topics.add(key.lower())
 
+def file_keyword_values_by_file(file_ids: Iterable[int]) -> Dict[int, List[str]]:
+    """
+    file_keyword_values for a batch of files, read with one query.
+    """
+    by_file: Dict[int, set] = {file_id: set() for file_id in file_ids}
+    if by_file:
+        rows = (
+            db.session.query(FileKeyword.file_id, FileKeyword.normalized_value)
+            .filter(FileKeyword.file_id.in_(list(by_file)))
+        )
+        for file_id, value in rows:
+            by_file[file_id].add(value)
+    return {file_id: sorted(values) for file_id, values in by_file.items()}
+
+
+def _keyword_delta(file_id: int, rows: List[Tuple[str, str]]) -> Dict[str, Any]:
+    return {
+        "file_id": str(file_id),
+        "keywords": sorted({value for _, value in rows}),
+        "topics": sorted({topic for topic, _ in rows if topic != KEYWORD_LIST_TOPIC}),
+    }
+
+
+def file_keyword_delta(file_id: int) -> Dict[str, Any]:
+    """
+    Keyword index delta for one file, published by the ingestion worker so the
+    web process can update its in-memory keyword index without a rebuild.
+    """
+    rows = db.session.query(FileKeyword.topic, FileKeyword.normalized_value).filter(FileKeyword.file_id == file_id).all()
+    return _keyword_delta(file_id, rows)
+
+
+def file_keyword_deltas(file_ids: Iterable[int]) -> List[Dict[str, Any]]:
+    """
+    file_keyword_delta for a batch of files, read with one query.
+    """
+    by_file: Dict[int, List[Tuple[str, str]]] = {file_id: [] for file_id in file_ids}
+    if by_file:
+        rows = (
+            db.session.query(FileKeyword.file_id, FileKeyword.topic, FileKeyword.normalized_value)
+            .filter(FileKeyword.file_id.in_(list(by_file)))
+        )
+        for file_id, topic, value in rows:
+            by_file[file_id].append((topic, value))
+    return [_keyword_delta(file_id, rows) for file_id, rows in by_file.items()]
+
+
+def load_keyword_items(file_ids: Optional[List[int]] = None) -> List[Dict[str, Any]]:
+    """
+    Build a simple keyword-only index from uploaded File records.
+    Each item has:
+      - id: File.id (as string)
+      - keywords: sorted list of the file's normalized keyword values
+    """
+    query = (
+        db.session.query(FileKeyword.file_id, FileKeyword.normalized_value)
+        .join(File, File.id == FileKeyword.file_id)
+        .filter(File.is_uploaded.is_(True))
+    )
+    if file_ids is not None:
+        query = query.filter(FileKeyword.file_id.in_(file_ids))
+    by_file: Dict[int, set] = defaultdict(set)
+    for file_id, value in query:
+        by_file[file_id].add(value)
+    items = [{"id": str(fid), "keywords": sorted(values)} for fid, values in sorted(by_file.items())]
+    logger.debug("load_keyword_items: %d files", len(items))
+    return items
+
+
+def build_keyword_topics() -> List[str]:
+    """
+    Distinct keyword topics across all files (lowercase), excluding the
+    free-form 'cuvinte_cheie' list.
+    """
+    rows = (
+        db.session.query(FileKeyword.topic)
+        .filter(FileKeyword.topic != KEYWORD_LIST_TOPIC)
+        .distinct()
+        .all()
+    )
+    topics = [topic for (topic,) in rows]
     logger.debug("build_keyword_topics: deduped topics=%s", topics)
-    return list(topics)
\ No newline at end of file
+    return topics
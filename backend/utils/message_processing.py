@@ -130,10 +130,9 @@ def process_chat_message(frontend_message, conversation_id=None, additional_para
             # End transaction – all operations committed at once.
 
             # Step 7: If a new conversation was created, emit the updates.
+            # (conversation_created itself is emitted on commit by the emitters)
             if is_new:
-                conversation_list = [conversation_to_dict(c) for c in Conversation.query.all()]
-                socketio.emit('conversation_list', conversation_list)
-                socketio.emit('new_conversation', {'id': conv_id})
+                emit_new_conversation(conv_id)
 
             # Return the processed results.
             return {
@@ -1,10 +1,21 @@
 import os
-from typing import List, Dict, Optional, Any
-from pinecone import Pinecone
+from typing import List, Dict, Iterator, Optional, Any
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of IDs per delete request
+DELETE_BATCH_SIZE = 1000
+
+
+def pinecone_namespace(namespace: Optional[str] = None) -> Optional[str]:
+    """
+    Namespace for vector reads and writes: `namespace`, else PINECONE_NAMESPACE,
+    else None (the index's default namespace).
+    """
+    return namespace or os.getenv("PINECONE_NAMESPACE")
+
 class PineconeClient:
     def __init__(
         self,
@@ -29,12 +40,10 @@ class PineconeClient:
             or os.getenv("PINECONE_INDEX") 
             or "default-index"
         )
-        self.namespace = (
-            namespace 
-            or os.getenv("PINECONE_NAMESPACE")
-        )
+        self.namespace = pinecone_namespace(namespace)
 
-        # Instantiate the Pinecone v3 client
+        # Instantiate the Pinecone v3 client (imported here: the SDK is slow to import)
+        from pinecone import Pinecone
         self.client = Pinecone(
             api_key=self.api_key,
             environment=self.environment
@@ -83,6 +92,36 @@ class PineconeClient:
         else:
             raise ValueError("Must provide ids or filter to delete")
 
+    def delete_ids(
+        self,
+        ids: List[str],
+        namespace: Optional[str] = None,
+        batch_size: int = DELETE_BATCH_SIZE,
+    ) -> int:
+        """
+        Delete vectors by ID in batches (the API caps IDs per delete request).
+        Returns the number of IDs sent.
+        """
+        ns = namespace or self.namespace
+        for i in range(0, len(ids), batch_size):
+            self.index.delete(ids=ids[i : i + batch_size], namespace=ns)
+        return len(ids)
+
+    def list_ids(
+        self,
+        prefix: Optional[str] = None,
+        namespace: Optional[str] = None,
+    ) -> Iterator[List[str]]:
+        """
+        Yield pages of vector IDs, optionally only those starting with `prefix`.
+        Only serverless indexes support listing.
+        """
+        ns = namespace or self.namespace
+        kwargs = {"namespace": ns}
+        if prefix:
+            kwargs["prefix"] = prefix
+        yield from self.index.list(**kwargs)
+
     def query(
         self,
         vector: List[float],
@@ -127,3 +166,20 @@ class PineconeClient:
         Shortcut to index.describe_index_stats().
         """
         return self.index.describe_index_stats()
+
+
+_shared_pinecone: Optional[PineconeClient] = None
+_shared_pinecone_lock = threading.Lock()
+
+
+def get_pinecone_client() -> PineconeClient:
+    """
+    Process-wide PineconeClient built from the environment, so the client and
+    its index connection pool are created once per process instead of per file.
+    """
+    global _shared_pinecone
+    if _shared_pinecone is None:
+        with _shared_pinecone_lock:
+            if _shared_pinecone is None:
+                _shared_pinecone = PineconeClient()
+    return _shared_pinecone
@@ -1,7 +1,7 @@
 import os
 import logging
-from typing import Optional, Dict, Any, List
-import json
+import threading
+from typing import Optional, Dict, Any, List, Tuple
 
 from utils.services.ai_api_manager import OpenAIService
 from utils.pinecone_client import PineconeClient
@@ -32,18 +32,78 @@ class Embedder:
 
 class KeywordSearch:
     """
-    Performs exact keyword matching over items whose metadata['keywords'] is a JSON string:
-      {"keywords": ["term1", "term2", ...]}
+    Performs exact keyword matching over items carrying a structured keyword list
+    (see utils.keyword_loader.load_keyword_items):
+      {"id": "42", "keywords": ["term1", "term2", ...]}
+    Lookups go through an inverted index built once from the items.
+
+    The index can be updated with `apply_deltas` as files are ingested.
+    Updates are copy-on-write per batch: the batch is applied to shallow copies
+    of the id map and the index (posting lists are tuples, so untouched ones are
+    shared, and only those the batch touches are rebuilt), and the new pair is
+    published with one assignment. Searches never take a lock and see either
+    all of a batch or none of it.
     """
 
     def __init__(self, items: List[Dict[str, Any]]):
         """
         items: list of dicts, each having at least:
           - 'id'
-          - 'metadata': containing a JSON-string under metadata['keywords']
+          - 'keywords': list of normalized (lowercase) keyword values
           - other fields you want to return (e.g. 'file_path', 'text', etc.)
         """
-        self.items = items
+        index: Dict[str, List[Dict[str, Any]]] = {}
+        for item in items:
+            for kw in set(item.get("keywords") or ()):
+                index.setdefault(kw, []).append(item)
+        # (items by id, keyword -> postings), replaced as a whole by apply_deltas
+        self._state: Tuple[Dict[str, Dict[str, Any]], Dict[str, Tuple[Dict[str, Any], ...]]] = (
+            {str(item["id"]): item for item in items},
+            {kw: tuple(p) for kw, p in index.items()},
+        )
+        self._write_lock = threading.Lock()
+
+    @property
+    def items(self) -> List[Dict[str, Any]]:
+        return list(self._state[0].values())
+
+    def apply_deltas(self, deltas: List[Dict[str, Any]]) -> None:
+        """
+        Insert or replace items, e.g. {"file_id": "42", "keywords": [...]}.
+        A delta with an empty keyword list removes the item.
+        """
+        with self._write_lock:
+            by_id, index = (dict(d) for d in self._state)
+            touched: Dict[str, List[Dict[str, Any]]] = {}
+
+            def postings(kw):
+                plist = touched.get(kw)
+                if plist is None:
+                    plist = touched[kw] = list(index.get(kw, ()))
+                return plist
+
+            for delta in deltas:
+                item_id = str(delta.get("file_id", delta.get("id")))
+                old = by_id.pop(item_id, None)
+                if old is not None:
+                    for kw in set(old.get("keywords") or ()):
+                        plist = postings(kw)
+                        plist[:] = [i for i in plist if i is not old]
+                keywords = list(delta.get("keywords") or ())
+                if not keywords:
+                    continue
+                item = {"id": item_id, "keywords": keywords}
+                by_id[item_id] = item
+                for kw in set(keywords):
+                    postings(kw).append(item)
+            for kw, plist in touched.items():
+                if plist:
+                    index[kw] = tuple(plist)
+                else:
+                    index.pop(kw, None)
+            self._state = (by_id, index)
+            indexed = len(by_id)
+        logging.debug("KeywordSearch: applied %d deltas, %d items indexed", len(deltas), indexed)
 
     def search(
         self, 
@@ -53,30 +113,16 @@ class KeywordSearch:
     ) -> List[Dict[str, Any]]:
         """
         Return items whose keywords list contains the exact term.
-        If case_insensitive=True, matching is done in lowercase.
+        If case_insensitive=True, the term is normalized the same way stored keywords are.
         limit: max number of results to return (None means no limit).
         """
-        matches = []
-        t = term.lower() if case_insensitive else term
-
-        for item in self.items:
-            raw = item.get("metadata", {}).get("keywords", "")
-            try:
-                data = json.loads(raw)
-                kws = data.get("keywords", [])
-            except json.JSONDecodeError:
-                continue
-
-            # Normalize
-            norm_kws = [k.lower() for k in kws] if case_insensitive else kws
-
-            if t in norm_kws:
-                matches.append(item)
+        t = " ".join(term.split()).lower() if case_insensitive else term
+        matches = self._state[1].get(t, ())
 
         # Optionally limit and return
         if limit:
-            return matches[:limit]
-        return matches
+            return list(matches[:limit])
+        return list(matches)
 
 class VectorSearch:
     """
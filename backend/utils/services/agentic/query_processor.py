@@ -1,4 +1,3 @@
-import json
 import logging
 from typing import Any, Dict, List, Optional, Literal, Tuple
 
@@ -159,8 +158,7 @@ def process_keyword_results(
         {
             "id": item["id"],
             "score": None,
-            "keywords": json.loads(item.get("metadata", {}).get("keywords", "{}"))
-                          .get("keywords", []),
+            "keywords": item.get("keywords", []),
             "summary": None,
             "text": item.get("text", ""),
         }
@@ -183,6 +181,16 @@ class QueryProcessor:
         self.ai = ai_service
         self.keyword_topics = keyword_topics
 
+    def add_topics(self, topics: List[str]) -> None:
+        """
+        Merge newly ingested keyword topics. The list is rebuilt and rebound in one
+        assignment, so concurrent readers keep iterating the list they already hold.
+        """
+        new = {t.strip().lower() for t in topics if t and t.strip()} - set(self.keyword_topics)
+        if new:
+            self.keyword_topics = sorted(set(self.keyword_topics) | new)
+            logger.info("QueryProcessor: added keyword topics %s", sorted(new))
+
     def identify_intent(self, query: str) -> Tuple[Literal['keyword','semantic','conversational'], Optional[str]]:
         logger.debug("QueryProcessor.identify_intent called with query='%s'", query)
         intent, topic = identify_intent(
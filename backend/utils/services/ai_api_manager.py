@@ -1,21 +1,14 @@
 import os
 import logging
+import threading
 from typing import Any, Dict, List, Optional, Union
 from utils.services.generators.keyword_generator import generate_keywords
 
 from openai import OpenAI
 
-# Fallback for OpenAIError import on clients lacking openai.error module
-try:
-    from openai.error import OpenAIError
-except ImportError:
-    class OpenAIError(Exception):
-        """Fallback exception when openai.error cannot be imported."""
-        pass
-
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
-
 from utils.models.chat_payload import ChatPayload
+from utils.services.rate_limiter import RateLimiter, get_rate_limiter, estimate_tokens
+from utils.services.retry_policy import openai_retry
 
 
 class OpenAIAPIError(Exception):
@@ -23,6 +16,32 @@ class OpenAIAPIError(Exception):
     pass
 
 
+# One pooled client per process, shared by every service instance.
+_shared_client: Optional[OpenAI] = None
+_client_lock = threading.Lock()
+
+
+def get_shared_client() -> OpenAI:
+    """
+    Return the process-wide synchronous OpenAI client (one HTTP pool per process).
+    """
+    global _shared_client
+    if _shared_client is None:
+        with _client_lock:
+            if _shared_client is None:
+                # Retries are handled by utils.services.retry_policy, not the SDK
+                _shared_client = OpenAI(max_retries=0)
+    return _shared_client
+
+
+def _messages_tokens(messages: List[Any]) -> int:
+    total = 0
+    for m in messages:
+        content = m.get("content") if isinstance(m, dict) else getattr(m, "content", "")
+        total += estimate_tokens(content or "")
+    return total
+
+
 class OpenAIService:
     """
     Service wrapper around the OpenAI client, with retry, logging, and
@@ -32,10 +51,12 @@ class OpenAIService:
     def __init__(
         self,
         client: Optional[OpenAI] = None,
-        model_map: Optional[Dict[str, str]] = None
+        model_map: Optional[Dict[str, str]] = None,
+        limiter: Optional[RateLimiter] = None
     ):
-        # Allow injection of a preconfigured OpenAI client        
-        self.client = client or OpenAI()
+        # Allow injection of a preconfigured OpenAI client; default to the shared pool
+        self.client = client or get_shared_client()
+        self.limiter = limiter or get_rate_limiter()
         # Configure default models, overridable via environment variables
         self.model_map = model_map or {
             "chat": os.getenv("OPENAI_CHAT_MODEL", "gpt-4.1-mini"),
@@ -43,11 +64,7 @@ class OpenAIService:
         }
         self.logger = logging.getLogger(self.__class__.__name__)
 
-    @retry(
-        retry=retry_if_exception_type(OpenAIError),
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10)
-    )
+    @openai_retry()
     def _chat_completion(
         self,
         context: str,
@@ -65,36 +82,30 @@ class OpenAIService:
             )},
             {"role": "user", "content": f"{context}\nThis is where the prompt starts: {prompt}"}
         ]
-        response = self.client.chat.completions.create(
-            model=self.model_map["chat"],
-            messages=messages,
-            stream=stream
-        )
+        with self.limiter.limit("chat", _messages_tokens(messages)):
+            response = self.client.chat.completions.create(
+                model=self.model_map["chat"],
+                messages=messages,
+                stream=stream
+            )
         if stream:
             return response
         return response.choices[0].message.content
 
-    @retry(
-        retry=retry_if_exception_type(OpenAIError),
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10)
-    )
+    @openai_retry()
     def _create_embeddings(self, input_text: str) -> List[float]:
         """
         Internal method for generating embeddings.
         """
         self.logger.debug("Embedding request [model=%s]", self.model_map["embeddings"])
-        resp = self.client.embeddings.create(
-            model=self.model_map["embeddings"],
-            input=input_text
-        )
+        with self.limiter.limit("embeddings", estimate_tokens(input_text)):
+            resp = self.client.embeddings.create(
+                model=self.model_map["embeddings"],
+                input=input_text
+            )
         return resp.data[0].embedding
 
-    @retry(
-        retry=retry_if_exception_type(OpenAIError),
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10)
-    )
+    @openai_retry()
     def _generic_completion(
         self,
         prompt: str,
@@ -109,10 +120,11 @@ class OpenAIService:
             {"role": "system", "content": system_instruction},
             {"role": "user", "content": prompt}
         ]
-        response = self.client.chat.completions.create(
-            model=model,
-            messages=messages
-        )
+        with self.limiter.limit("chat", _messages_tokens(messages)):
+            response = self.client.chat.completions.create(
+                model=model,
+                messages=messages
+            )
         return response.choices[0].message.content
 
     def chat(self, payload: ChatPayload) -> Union[str, Any]:
@@ -132,7 +144,8 @@ class OpenAIService:
         params.setdefault("model", self.model_map["chat"])
 
         # Call OpenAI
-        response = self.client.chat.completions.create(**params)
+        with self.limiter.limit("chat", _messages_tokens(params.get("messages", []))):
+            response = self.client.chat.completions.create(**params)
 
         if payload.stream:
             return response
@@ -157,7 +170,7 @@ class OpenAIService:
         Returns 'broken' if the input is too short.
         """
         try:
-            return generate_keywords(text, client=self.client)
+            return generate_keywords(text, client=self.client, limiter=self.limiter)
         except Exception as e:
             self.logger.error("Keyword extraction failed", exc_info=True)
             raise OpenAIAPIError("Keyword extraction failed") from e
@@ -1,12 +1,13 @@
 import logging
 import os
-import re
-import json
 from flask import current_app
 from db.models import db, Conversation, ConversationMessage, File
+from db.pagination import keyset_page
+from sqlalchemy.orm import load_only
 from utils.services.ai_api_manager import OpenAIService
 from utils.models.chat_payload import ChatPayload, OpenAIMessage
 from utils.search import default_search
+from utils.keyword_loader import load_keyword_items, build_keyword_topics as load_topics
 from utils.websockets.sockets import socketio
 import pendulum
 from typing import Any, Dict, List, Optional, Union
@@ -15,6 +16,9 @@ from utils.services.agentic.search_router import SearchRouter
 
 logger = logging.getLogger(__name__)
 
+# Most recent messages sent to the model as chat history; 0 sends the whole conversation
+CONTEXT_MESSAGES = int(os.getenv("CHAT_CONTEXT_MESSAGES", "20"))
+
 
 def load_file_records():
     """
@@ -42,53 +46,13 @@ def build_keyword_index():
     """
     Build a simple keyword-only index from uploaded File records.
     """
-    items = []
-    for f in File.query.filter_by(is_uploaded=True).all():
-        kws = f.meta_data.get("keywords", [])
-        items.append({
-            "id": f.id,
-            "metadata": {"keywords": json.dumps({"keywords": kws})},
-        })
-    return items
+    return load_keyword_items()
 
 def build_keyword_topics():
     """
-    Extract and clean keyword topics from uploaded files' metadata.
+    Keyword topics present in the structured keyword table.
     """
-    topics = []
-    for f in File.query.all():
-        kws_raw = f.meta_data.get("keywords", None)
-        logger.debug("build_keyword_topics: file_id=%s raw_kws=%r", f.id, kws_raw)
-
-        if not kws_raw:
-            continue
-
-        if isinstance(kws_raw, str):
-            try:
-                kw_dict = json.loads(re.search(r"(\{.*\})", kws_raw, re.DOTALL).group(1))
-            except Exception as e:
-                logger.warning("Failed to parse keywords for file %s: %s", f.id, e)
-                continue
-
-        elif isinstance(kws_raw, dict):
-            kw_dict = kws_raw
-
-        elif isinstance(kws_raw, list):
-            kw_dict = {"cuvinte_cheie": kws_raw}
-
-        else:
-            continue
-
-        for key, value in kw_dict.items():
-            if key == "cuvinte_cheie":
-                continue
-            if isinstance(value, str):
-                topics.append(key)
-
-    clean = {t.strip().lower() for t in topics if isinstance(t, str) and t.strip()}
-    logger.debug("build_keyword_topics: deduped topics=%s", clean)
-
-    return list(clean)
+    return load_topics()
 
 
 class ConversationManager:
@@ -121,7 +85,13 @@ class ConversationManager:
         return convo
 
     def is_new(self, conversation):
-        return len(conversation.messages) < 2
+        # Counts at most two rows instead of loading the whole history
+        return (
+            self.session.query(ConversationMessage.id)
+            .filter_by(conversation_id=conversation.id)
+            .limit(2)
+            .count()
+        ) < 2
 
     def generate_title(self, first_message: str, conversation: Conversation) -> str:
         title = self.ai_service.generate_title(first_message)
@@ -153,9 +123,13 @@ class ConversationManager:
             logging.error("Error updating conversation summary", exc_info=True)
             return conversation.meta_data.get("summary", "")
 
-    def build_context(self, conversation: Conversation) -> List[dict]:
+    def build_context(self, conversation: Conversation, limit: int = CONTEXT_MESSAGES) -> List[dict]:
+        """
+        Chat history for the model: the last `limit` messages (CHAT_CONTEXT_MESSAGES,
+        default 20), oldest first, or every message when `limit` is 0.
+        """
         history = []
-        for msg in conversation.messages:
+        for msg in MessageRepository(self.session).get_recent(conversation.id, limit):
             if msg.sender == "ai":
                 role = "assistant"
             elif msg.sender == "user":
@@ -237,6 +211,20 @@ class MessageRepository:
             query = query.filter_by(sender=sender)
         return query.all()
 
+    def get_recent(self, conversation_id: int, limit: int) -> List[ConversationMessage]:
+        """
+        The last `limit` messages of a conversation, oldest first (all of them
+        when `limit` is 0).
+        """
+        query = self.session.query(ConversationMessage).filter_by(conversation_id=conversation_id).options(
+            load_only(ConversationMessage.id, ConversationMessage.sender,
+                      ConversationMessage.message, ConversationMessage.created_at)
+        )
+        if not limit:
+            return query.order_by(ConversationMessage.created_at, ConversationMessage.id).all()
+        rows, _ = keyset_page(query, ConversationMessage.created_at, ConversationMessage.id, limit)
+        return rows[::-1]
+
 class AIOrchestrator:
     def __init__(self, ai_service: OpenAIService, search_client=default_search):
         self.ai_service = ai_service
@@ -280,22 +268,9 @@ class SocketNotifier:
         self.socketio = socketio
         self.app = app
 
-    def emit_conversation_list(self):
-        with self.app.app_context():
-            convos = Conversation.query.all()
-            payload = []
-            for c in convos:
-                payload.append({
-                    'id': c.id,
-                    'title': c.title,
-                    'meta_data': c.meta_data,
-                    'created_at': c.created_at.isoformat() if c.created_at else None,
-                    'updated_at': c.updated_at.isoformat() if c.updated_at else None,
-                })
-            self.socketio.emit('conversation_list', payload)
-
     def emit_new_conversation(self, conversation):
-        self.emit_conversation_list()
+        # The conversation_created delta is emitted on commit by the emitters'
+        # listeners; this only tells the client which conversation is new.
         self.socketio.emit('new_conversation', {'id': conversation.id})
 
     def emit_title(self, conversation_id: int, title: str):
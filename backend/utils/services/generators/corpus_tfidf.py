@@ -0,0 +1,152 @@
+import os
+import heapq
+import logging
+import threading
+from collections import Counter
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger("KeywordGenerator")
+
+DEFAULT_TFIDF_PATH = os.getenv("KEYWORD_TFIDF_PATH", os.path.join("instance", "keyword_tfidf.joblib"))
+DEFAULT_N_FEATURES = 2 ** 20
+
+
+def _romanian_stop_words() -> frozenset:
+    try:
+        from spacy.lang.ro.stop_words import STOP_WORDS
+        return frozenset(STOP_WORDS)
+    except ImportError:
+        return frozenset()
+
+
+class CorpusTfidf:
+    """
+    Corpus-level TF-IDF keyword model.
+
+    Documents are hashed into a fixed-size sparse space (FeatureHasher over the
+    word n-gram analyzer), so the model can be updated incrementally with
+    `partial_fit` as new text is ingested without refitting a vocabulary.
+    Only document frequencies per hash bucket are kept: phrases are scored
+    from the document's own n-grams, each looking up the df of its bucket, so
+    no reverse map of the corpus vocabulary is needed.
+    """
+
+    def __init__(self, n_features: int = DEFAULT_N_FEATURES, ngram_range=(1, 3), max_df: float = 0.85):
+        self.n_features = n_features
+        self.ngram_range = tuple(ngram_range)
+        self.max_df = max_df
+        self.n_docs = 0
+        self.df = np.zeros(n_features, dtype=np.int64)
+        self._lock = threading.Lock()
+        self._build()
+
+    def _build(self):
+        from sklearn.feature_extraction import FeatureHasher
+        from sklearn.feature_extraction.text import CountVectorizer
+        self._analyzer = CountVectorizer(
+            ngram_range=self.ngram_range,
+            stop_words=list(_romanian_stop_words()) or None,
+        ).build_analyzer()
+        self._hasher = FeatureHasher(n_features=self.n_features, input_type="string", alternate_sign=False)
+
+    def _counts(self, texts: List[str]):
+        return self._hasher.transform(self._analyzer(t) for t in texts).tocsr()
+
+    def partial_fit(self, texts: Iterable[str]) -> "CorpusTfidf":
+        """
+        Add a batch of documents to the corpus statistics.
+        """
+        texts = list(texts)
+        if not texts:
+            return self
+        X = self._counts(texts)
+        with self._lock:
+            self.df += np.bincount(X.indices, minlength=self.n_features)
+            self.n_docs += X.shape[0]
+        return self
+
+    def idf(self) -> np.ndarray:
+        # Smoothed idf, as in TfidfTransformer(smooth_idf=True)
+        idf = np.log((1 + self.n_docs) / (1 + self.df)) + 1.0
+        if self.n_docs:
+            idf[self.df > self.max_df * self.n_docs] = 0.0
+        return idf
+
+    def transform(self, texts: List[str]):
+        """
+        Sublinear TF x IDF matrix (sparse CSR, one row per text).
+        """
+        X = self._counts(texts).astype(np.float64)
+        X.data = 1.0 + np.log(X.data)
+        idf = self.idf()
+        X.data *= idf[X.indices]
+        X.eliminate_zeros()
+        return X
+
+    def top_terms(self, texts: List[str], top_k: int = 8) -> List[List[str]]:
+        """
+        Highest-scoring phrases for each text in the batch. Each candidate
+        n-gram of a text is scored as sublinear TF x the IDF of its own hash
+        bucket; the batch's distinct candidates are hashed in one transform.
+        """
+        counts = [Counter(term for term in self._analyzer(t) if term) for t in texts]
+        candidates = list({term for c in counts for term in c})
+        if not candidates:
+            return [[] for _ in texts]
+        buckets = dict(zip(candidates, self._hasher.transform([[t] for t in candidates]).tocsr().indices))
+        idf = self.idf()
+        results = []
+        for c in counts:
+            scored = [((1.0 + np.log(n)) * idf[buckets[term]], term) for term, n in c.items()]
+            top = heapq.nlargest(top_k, (s for s in scored if s[0] > 0), key=lambda s: s[0])
+            results.append([term for _, term in top])
+        return results
+
+    def save(self, path: str = DEFAULT_TFIDF_PATH) -> str:
+        import joblib
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._lock:
+            state = {
+                "n_features": self.n_features,
+                "ngram_range": self.ngram_range,
+                "max_df": self.max_df,
+                "n_docs": self.n_docs,
+                "df": self.df,
+            }
+            joblib.dump(state, path, compress=3)
+        logger.info("Saved corpus TF-IDF model (%d docs) to %s", self.n_docs, path)
+        return path
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_TFIDF_PATH) -> "CorpusTfidf":
+        import joblib
+        state = joblib.load(path)
+        model = cls(n_features=state["n_features"], ngram_range=state["ngram_range"], max_df=state["max_df"])
+        model.n_docs = state["n_docs"]
+        model.df = state["df"]
+        logger.info("Loaded corpus TF-IDF model (%d docs) from %s", model.n_docs, path)
+        return model
+
+
+_corpus_model: Optional[CorpusTfidf] = None
+_corpus_lock = threading.Lock()
+
+
+def get_corpus_tfidf(path: str = DEFAULT_TFIDF_PATH) -> Optional[CorpusTfidf]:
+    """
+    Return the persisted corpus model, loading it once per process.
+    Returns None when no model has been built yet.
+    """
+    global _corpus_model
+    if _corpus_model is None:
+        with _corpus_lock:
+            if _corpus_model is None and os.path.exists(path):
+                _corpus_model = CorpusTfidf.load(path)
+    return _corpus_model
+
+
+def set_corpus_tfidf(model: Optional[CorpusTfidf]) -> None:
+    global _corpus_model
+    _corpus_model = model
@@ -2,19 +2,37 @@ import os
 import logging
 import re
 import json
+import threading
+from contextlib import nullcontext
+from itertools import chain
 from openai import OpenAI
-try:
-    from openai.error import OpenAIError
-except ImportError:
-    class OpenAIError(Exception):
-        pass
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
-
-#Lazy-loaded NLP model 
-placeholder_nlp = None
+from utils.services.retry_policy import openai_retry
+from utils.services.rate_limiter import RateLimiter, estimate_tokens
+
+#Lazy-loaded NLP models, keyed by the tuple of disabled pipeline components
+_nlp_cache: dict[tuple, object] = {}
+_nlp_lock = threading.Lock()
+# Process-level cache for embedding models and keyword extractors
+# (reentrant: the KeyBERT factory loads its sentence model through the cache)
+_model_cache: dict[tuple, object] = {}
+_model_lock = threading.RLock()
+# Extractors that keep per-document state (RAKE) are cached per thread instead
+_thread_local = threading.local()
+
+DEFAULT_KEYBERT_MODEL = os.getenv("KEYBERT_MODEL", "paraphrase-multilingual-MiniLM-L12-v2")
+KEYBERT_BATCH_SIZE = int(os.getenv("KEYBERT_BATCH_SIZE", 32))
 
 DEFAULT_KEYWORD_MODEL = os.getenv("OPENAI_CHAT_MODEL", "gpt-4.1-mini")
 
+# Lemmatization only needs entities (for merging) and the POS/morph features the
+# lemmatizer reads; the dependency parser is the most expensive unused component.
+LEMMA_DISABLED_COMPONENTS = ("parser",)
+# Large documents are lemmatized in segments via nlp.pipe to stay under nlp.max_length.
+NLP_SEGMENT_CHARS = int(os.getenv("KEYWORD_NLP_SEGMENT_CHARS", 100000))
+NLP_BATCH_SIZE = int(os.getenv("KEYWORD_NLP_BATCH_SIZE", 8))
+# Keep at 1 inside multiprocessing.Pool workers: daemonic processes cannot fork children.
+NLP_PROCESSES = int(os.getenv("KEYWORD_NLP_PROCESSES", 1))
+
 # -----------------------------------------------------------------------------
 #                    Ontology & Taxonomy Integration
 # -----------------------------------------------------------------------------
@@ -49,31 +67,61 @@ def index_labels_from_rdf(graph: 'rdflib.Graph', lang: str = "ro") -> dict[str,
     return label_map
 
 
+def load_ontology_labels(path: str | None = None, lang: str = "ro", format: str = "xml", index_path: str | None = None):
+    """
+    Label -> URI lookup for an ontology. Prefers the compiled, memory-mapped
+    label index (see `flask compile-ontology`) and only falls back to parsing
+    the RDF source with rdflib when no index has been built.
+    """
+    from utils.services.generators.ontology_index import DEFAULT_ONTOLOGY_INDEX, get_ontology_index
+    index = get_ontology_index(index_path or DEFAULT_ONTOLOGY_INDEX)
+    if index is not None:
+        return index
+    if path is None:
+        raise FileNotFoundError("No compiled ontology index and no ontology source given")
+    return index_labels_from_rdf(load_rdf_ontology(path, format=format), lang=lang)
+
+
 def map_terms_to_ontology(terms: list[str], label_map: dict[str, str], matcher: str = "exact", fuzzy_threshold: int = 85) -> dict[str, str]:
-    from thefuzz import fuzz
+    from utils.services.generators.term_matcher import get_label_index
     mapped: dict[str, str] = {}
+    index = None
+    if matcher == "fuzzy":
+        # Compiled label indexes carry their own trigram search
+        index = label_map if hasattr(label_map, "best_match") else get_label_index(label_map)
     for term in terms:
         key = term.lower()
         if matcher == "exact" and key in label_map:
             mapped[term] = str(label_map[key])
         elif matcher == "fuzzy":
-            best, score = None, 0
-            for label, uri in label_map.items():
-                s = fuzz.token_set_ratio(key, label)
-                if s > score:
-                    best, score = label, s
-            mapped[term] = str(label_map[best]) if score >= fuzzy_threshold else None
+            best, score = index.best_match(key)
+            mapped[term] = str(label_map[best]) if best is not None and score >= fuzzy_threshold else None
         else:
             mapped[term] = None
     return mapped
 
 
-@retry(
-    retry=retry_if_exception_type(OpenAIError),
-    stop=stop_after_attempt(3),
-    wait=wait_exponential(multiplier=1, min=2, max=10)
-)
-def _generic_completion(prompt: str, system_instruction: str, model: str, client: OpenAI | None = None) -> str:
+def extract_ontology_terms(text: str, label_map: dict[str, str], vocabulary: list[str] | None = None) -> dict[str, str | None]:
+    """
+    Find ontology labels (and extra vocabulary terms) in `text` with the
+    persisted term automaton. A compiled label index is searched directly, and
+    only the vocabulary goes into an automaton. Returns {matched term: URI or None}.
+    """
+    from utils.services.generators.term_matcher import cached_vocabulary_digest, get_term_automaton
+    if hasattr(label_map, "extract"):
+        terms = label_map.extract(text)
+        if vocabulary:
+            automaton = get_term_automaton(vocabulary, digest=cached_vocabulary_digest(vocabulary))
+            terms = list(dict.fromkeys(terms + automaton.extract(text)))
+    else:
+        sources = (label_map, vocabulary or ())
+        terms = get_term_automaton(chain(*sources), digest=cached_vocabulary_digest(*sources)).extract(text)
+    return {term: (str(label_map[term]) if term in label_map else None) for term in terms}
+
+
+@openai_retry()
+def _generic_completion(prompt: str, system_instruction: str, model: str, client: OpenAI | None = None,
+                        limiter: RateLimiter | None = None) -> str:
     logger = logging.getLogger("KeywordGenerator")
     logger.debug("Generic completion for keywords [model=%s]", model)
     messages = [
@@ -82,71 +130,204 @@ def _generic_completion(prompt: str, system_instruction: str, model: str, client
     ]
     if client is None:
         client = OpenAI()
-    response = client.chat.completions.create(
-        model=model,
-        messages=messages
-    )    
+    # Only the request itself holds a slot; retry backoff happens outside it
+    with limiter.limit("keywords", estimate_tokens(system_instruction + prompt)) if limiter else nullcontext():
+        response = client.chat.completions.create(
+            model=model,
+            messages=messages
+        )
     return response.choices[0].message.content
 
 
-def _get_nlp():
-    global placeholder_nlp
-    if placeholder_nlp is None:
-        import spacy
-        placeholder_nlp = spacy.load("ro_core_news_sm")
-    return placeholder_nlp
+def _get_nlp(disable: tuple = ()):
+    key = tuple(sorted(disable))
+    nlp = _nlp_cache.get(key)
+    if nlp is None:
+        with _nlp_lock:
+            nlp = _nlp_cache.get(key)
+            if nlp is None:
+                import spacy
+                nlp = spacy.load("ro_core_news_sm", disable=list(key))
+                _nlp_cache[key] = nlp
+    return nlp
+
+
+def _cached_model(key: tuple, factory):
+    model = _model_cache.get(key)
+    if model is None:
+        with _model_lock:
+            model = _model_cache.get(key)
+            if model is None:
+                logging.getLogger("KeywordGenerator").info("Loading keyword model %s", key)
+                model = factory()
+                _model_cache[key] = model
+    return model
+
+
+def _get_sentence_model(model_name: str = DEFAULT_KEYBERT_MODEL):
+    def factory():
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(model_name)
+    return _cached_model(("sentence_transformer", model_name), factory)
+
+
+def _get_keybert(model_name: str = DEFAULT_KEYBERT_MODEL):
+    def factory():
+        from keybert import KeyBERT
+        return KeyBERT(model=_get_sentence_model(model_name))
+    return _cached_model(("keybert", model_name), factory)
+
+
+def _get_yake(top_k: int, ngram_max: int):
+    def factory():
+        import yake
+        return yake.KeywordExtractor(lan="ro", n=ngram_max, top=top_k)
+    return _cached_model(("yake", top_k, ngram_max), factory)
+
+
+def _get_rake():
+    rake = getattr(_thread_local, "rake", None)
+    if rake is None:
+        from rake_nltk import Rake
+        rake = Rake(language="romanian")
+        _thread_local.rake = rake
+    return rake
+
+
+def warm_up_keyword_models(methods: tuple = ("keybert",)) -> None:
+    """
+    Load the models behind the given extraction methods ahead of time, e.g. from
+    a worker-process initializer, so the first document does not pay for it.
+    """
+    loaders = {
+        "keybert": lambda: _get_keybert(),
+        "yake": lambda: _get_yake(8, 3),
+        "rake": _get_rake,
+        "pke": lambda: _get_nlp(),
+        "lda": lambda: _get_nlp(),
+        "word2vec": lambda: _get_nlp(),
+        "spacy": lambda: _get_nlp(disable=LEMMA_DISABLED_COMPONENTS),
+    }
+    for method in methods:
+        loader = loaders.get(method)
+        if loader is None:
+            logging.getLogger("KeywordGenerator").warning("No warm-up loader for method %r", method)
+            continue
+        loader()
+
+
+# Numbered footnote/list lines and "Pagina X din Y" page footers are dropped.
+# Kept as two patterns: an alternation defeats sre's literal-prefix scan and is slower.
+_NUMBERED_LINE_RE = re.compile(r"^\s*\[?\d+\]?\s.*$", re.MULTILINE)
+_PAGE_FOOTER_RE = re.compile(r"Pagina\s+\d+\s+din\s+\d+")
+# OCR confuses O/0 and I/1 inside words ("H0TARARE"). Candidates are runs of 0/1
+# with a letter on both sides, so leading/trailing digits ("10ani", "ABC1") are
+# never touched; the pattern starts with [01] so sre can skip ahead quickly.
+_OCR_CANDIDATE_RE = re.compile(r"[01](?<=[^\W\d_][01])[01]*(?=[^\W\d_])")
+_OCR_UPPER = str.maketrans("01", "OI")
+_OCR_LOWER = str.maketrans("01", "ol")
+_TOKEN_PUNCT = ".,;:!?()[]{}\"'„”«»"
+# Legacy PDF encodings: NBSP, soft hyphens and cedilla s/t instead of comma-below.
+_CHAR_FIXES = (
+    ("\u00a0", " "),
+    ("\u00ad", ""),
+    ("\u015f", "\u0219"), ("\u015e", "\u0218"),
+    ("\u0163", "\u021b"), ("\u0162", "\u021a"),
+)
 
 
-def preprocess_text(text: str) -> str:
-    logger = logging.getLogger("KeywordGenerator")
-    text = re.sub(r"^\s*\[?\d+\]?\s.*$", "", text, flags=re.MULTILINE)
-    text = re.sub(r"Pagina\s+\d+\s+din\s+\d+", "", text)
-    text = re.sub(r"[\r\n]+", " ", text)
-    text = re.sub(r"[\s\f\t\v]+", " ", text).strip()
-    for wrong, right in {'0': 'O', '1': 'I'}.items():
-        text = text.replace(wrong, right)
-    nlp = _get_nlp()
-    doc = nlp(text)
-    with doc.retokenize() as retokenizer:
-        for ent in doc.ents:
-            retokenizer.merge(ent)
-    tokens = [token.lemma_ for token in doc if not token.is_space]
+def _fix_ocr_digits(match: re.Match) -> str:
+    """
+    Only fix 0/1 inside word tokens (split on spaces and hyphens) made of letters
+    and 0/1, with more letters than digits, so dates, article numbers,
+    "nr. 10/2001" and codes like "a1" stay intact. The replacement takes the
+    case of the neighbouring letters: "H0TARARE" -> "HOTARARE", "h0tarare" -> "hotarare".
+    """
+    text = match.string
+    start, end = match.span()
+    left = max(text.rfind(" ", 0, start), text.rfind("-", 0, start)) + 1
+    right = min((i for i in (text.find(" ", end), text.find("-", end)) if i != -1), default=len(text))
+    token = text[left:right].strip(_TOKEN_PUNCT)
+    letters = sum(ch.isalpha() for ch in token)
+    digits = token.count("0") + token.count("1")
+    if letters <= digits or letters + digits != len(token):
+        return match.group(0)
+    upper = text[start - 1].isupper() and text[end].isupper()
+    return match.group(0).translate(_OCR_UPPER if upper else _OCR_LOWER)
+
+
+def _clean_text(text: str) -> str:
+    text = _NUMBERED_LINE_RE.sub("", text)
+    text = _PAGE_FOOTER_RE.sub("", text)
+    for wrong, right in _CHAR_FIXES:
+        if wrong in text:
+            text = text.replace(wrong, right)
+    # str.split() collapses every run of whitespace (\r\n\t\f\v, unicode) and strips.
+    text = " ".join(text.split())
+    return _OCR_CANDIDATE_RE.sub(_fix_ocr_digits, text)
+
+
+def _split_segments(text: str, size: int = NLP_SEGMENT_CHARS) -> list[str]:
+    segments = []
+    start = 0
+    while start < len(text):
+        end = min(start + size, len(text))
+        if end < len(text):
+            cut = text.rfind(" ", start, end)
+            if cut > start:
+                end = cut
+        segments.append(text[start:end])
+        start = end
+    return segments
+
+
+def _lemmatize(text: str) -> str:
+    nlp = _get_nlp(disable=LEMMA_DISABLED_COMPONENTS)
+    tokens = []
+    for doc in nlp.pipe(_split_segments(text), batch_size=NLP_BATCH_SIZE, n_process=NLP_PROCESSES):
+        with doc.retokenize() as retokenizer:
+            for ent in doc.ents:
+                retokenizer.merge(ent)
+        tokens.extend(token.lemma_ for token in doc if not token.is_space)
     return " ".join(tokens)
 
 
+def preprocess_text(text: str, lemmatize: bool = True) -> str:
+    """
+    Clean extracted document text. With lemmatize=False (the LLM path) spaCy is
+    skipped entirely; otherwise the text is lemmatized with the parser disabled.
+    """
+    text = _clean_text(text)
+    if not lemmatize or not text:
+        return text
+    return _lemmatize(text)
+
+
 def extract_tfidf_keywords(text: str, top_k: int = 8, ngram_range=(1,3)) -> list[str]:
-    from sklearn.feature_extraction.text import TfidfVectorizer
-    from sklearn.feature_selection import SelectKBest, chi2
-    vect = TfidfVectorizer(
-        ngram_range=ngram_range,
-        stop_words="romanian",
-        max_df=0.85,
-        min_df=2,
-    )
-    X = vect.fit_transform([text])
-    X_dup = X.vstack([X])
-    y = [1, 0]
-    skb = SelectKBest(chi2, k=min(top_k, X.shape[1]))
-    skb.fit(X_dup, y)
-    mask = skb.get_support()
-    candidates = [
-        (feat, score) for feat, score in zip(vect.get_feature_names_out(), skb.scores_)
-        if mask[vect.vocabulary_.get(feat)]
-    ]
-    best = sorted(candidates, key=lambda x: -x[1])[:top_k]
-    return [phrase for phrase, score in best]
+    return extract_tfidf_keywords_batch([text], top_k=top_k, ngram_range=ngram_range)[0]
+
+
+def extract_tfidf_keywords_batch(texts: list[str], top_k: int = 8, ngram_range=(1,3)) -> list[list[str]]:
+    """
+    Score documents against the persisted corpus TF-IDF model as one batch.
+    Without a corpus model the batch itself is used as the corpus.
+    """
+    from utils.services.generators.corpus_tfidf import CorpusTfidf, get_corpus_tfidf
+    model = get_corpus_tfidf()
+    if model is None:
+        logging.getLogger("KeywordGenerator").warning("No corpus TF-IDF model found; scoring against the batch only")
+        model = CorpusTfidf(ngram_range=ngram_range, max_df=1.0).partial_fit(texts)
+    return model.top_terms(texts, top_k=top_k)
 
 
 def extract_rake_keywords(text: str, top_k: int = 8) -> list[str]:
-    from rake_nltk import Rake
-    rake = Rake(language="romanian")
+    rake = _get_rake()
     rake.extract_keywords_from_text(text)
     return rake.get_ranked_phrases()[:top_k]
 
 
 def extract_yake_keywords(text: str, top_k: int = 8, ngram_max=3) -> list[str]:
-    import yake
-    kw_extractor = yake.KeywordExtractor(lan="ro", n=ngram_max, top=top_k)
+    kw_extractor = _get_yake(top_k, ngram_max)
     keywords = kw_extractor.extract_keywords(text)
     return [phrase for phrase, score in sorted(keywords, key=lambda x: x[1])]
 
@@ -155,18 +336,37 @@ def extract_pke_keywords(text: str, top_k: int = 8, method: str = "TextRank") ->
     import pke
     extractor_cls = getattr(pke.unsupervised, method)
     extractor = extractor_cls()
-    extractor.load_document(input=text, language='ro')
+    # Reuse the cached spaCy pipeline instead of letting pke load one per document
+    extractor.load_document(input=text, language='ro', spacy_model=_get_nlp())
     extractor.candidate_selection()
     extractor.candidate_weighting()
     return [kp for kp, _ in extractor.get_n_best(n=top_k)]
 
 
-def extract_keybert_keywords(text: str, top_k: int = 8, model_name: str = 'paraphrase-multilingual-MiniLM-L12-v2') -> list[str]:
-    from sentence_transformers import SentenceTransformer
-    from keybert import KeyBERT
-    bert_model = SentenceTransformer(model_name)
-    kw_model = KeyBERT(model=bert_model)
-    return [kw for kw, _ in kw_model.extract_keywords(text, keyphrase_ngram_range=(1,3), stop_words='romanian', top_n=top_k)]
+def extract_keybert_keywords(text: str, top_k: int = 8, model_name: str = DEFAULT_KEYBERT_MODEL) -> list[str]:
+    return extract_keybert_keywords_batch([text], top_k=top_k, model_name=model_name)[0]
+
+
+def extract_keybert_keywords_batch(texts: list[str], top_k: int = 8, model_name: str = DEFAULT_KEYBERT_MODEL) -> list[list[str]]:
+    """
+    KeyBERT over many documents at once: document embeddings are computed in a
+    single batched encode call instead of one forward pass per document.
+    """
+    if not texts:
+        return []
+    kw_model = _get_keybert(model_name)
+    doc_embeddings = _get_sentence_model(model_name).encode(texts, batch_size=KEYBERT_BATCH_SIZE)
+    results = kw_model.extract_keywords(
+        texts,
+        keyphrase_ngram_range=(1,3),
+        stop_words='romanian',
+        top_n=top_k,
+        doc_embeddings=doc_embeddings,
+    )
+    # KeyBERT returns a flat list for a single document
+    if len(texts) == 1:
+        results = [results]
+    return [[kw for kw, _ in doc] for doc in results]
 
 
 def extract_gensim_lda_keywords(text: str, top_k: int = 8, num_topics: int = 1, passes: int = 10) -> list[str]:
@@ -189,16 +389,8 @@ def extract_gensim_word2vec_keywords(text: str, top_k: int = 8, vector_size: int
 
 
 def extract_flashtext_keywords(text: str, vocabulary: list[str], case_sensitive: bool = False) -> list[str]:
-    from flashtext import KeywordProcessor
-    kp = KeywordProcessor(case_sensitive=case_sensitive)
-    for term in vocabulary:
-        kp.add_keyword(term)
-    found = kp.extract_keywords(text)
-    seen, uniq = set(), []
-    for kw in found:
-        if kw not in seen:
-            seen.add(kw); uniq.append(kw)
-    return uniq
+    from utils.services.generators.term_matcher import get_term_automaton
+    return get_term_automaton(vocabulary, case_sensitive=case_sensitive).extract(text)
 
 
 def dedupe_keywords_fuzzy(keywords: list[str], threshold: int = 85) -> list[str]:
@@ -210,10 +402,45 @@ def dedupe_keywords_fuzzy(keywords: list[str], threshold: int = 85) -> list[str]
     return deduped
 
 
-def generate_keywords(text: str, method: str = "openai", flash_vocab: list[str] | None = None, fuzzy_threshold: int = 85, client: OpenAI | None = None) -> str:
-    cleaned = preprocess_text(text)
+EMPTY_KEYWORDS = {"locatie": "", "data": "", "domeniu": "", "hotarare": "", "cuvinte_cheie": []}
+
+
+def build_openai_keyword_instruction(cleaned: str) -> str:
+    """
+    System instruction used for LLM keyword extraction (interactive and Batch API).
+    """
+    return (
+        "You are a highly accurate AI assistant specialized in extracting information from Romanian legal documents. "
+        "Extract the following fields as a JSON object: locatie, data, domeniu, hotarare, legislatie, cuvinte_cheie (list of keywords). "
+        "In locatie, only mention city, locality, country or county name, and mention all the locations found in the document. "
+        "In data, mention all the dates referenced in the document in a dd/mm/yy format. " 
+        "In legislatie, mention all the laws, regulations, statutes and other legal information found in the document."
+        "Return only the JSON object.\n\n"
+        "Decision text:\n"
+        f"{cleaned}"
+    )
+
+
+def parse_openai_keyword_response(raw: str) -> str:
+    """
+    Normalise a raw LLM answer into the JSON string stored in File.meta_data['keywords'].
+    """
+    raw = (raw or "").strip()
+    try:
+        result = json.loads(raw)
+    except json.JSONDecodeError:
+        match = re.search(r"\{.*\}", raw, re.DOTALL)
+        result = json.loads(match.group(0)) if match else {}
+    kws = result.get("cuvinte_cheie", [])[:8]
+    return json.dumps({"locatie": result.get("locatie",""), "data": result.get("data",""), "domeniu": result.get("domeniu",""), "hotarare": result.get("hotarare",""), "legislatie":result.get("legislatie",""), "cuvinte_cheie": kws}, ensure_ascii=False)
+
+
+def generate_keywords(text: str, method: str = "openai", flash_vocab: list[str] | None = None, fuzzy_threshold: int = 85, client: OpenAI | None = None,
+                      limiter: RateLimiter | None = None) -> str:
+    # The LLM does its own normalisation; only the local extractors need lemmas.
+    cleaned = preprocess_text(text, lemmatize=(method != "openai"))
     if len(cleaned.split()) < 30:
-        return json.dumps({"locatie": "", "data": "", "domeniu": "", "hotarare": "", "cuvinte_cheie": []}, ensure_ascii=False)
+        return json.dumps(EMPTY_KEYWORDS, ensure_ascii=False)
 
     if method == "flashtext":
         if not flash_vocab: raise ValueError("flash_vocab must be provided for flashtext method")
@@ -222,24 +449,9 @@ def generate_keywords(text: str, method: str = "openai", flash_vocab: list[str]
         if not flash_vocab: raise ValueError("flash_vocab must be provided for flash_fuzzy method")
         keywords = dedupe_keywords_fuzzy(extract_flashtext_keywords(cleaned, flash_vocab), threshold=fuzzy_threshold)
     elif method == "openai":
-        instruction = (
-            "You are a highly accurate AI assistant specialized in extracting information from Romanian legal documents. "
-            "Extract the following fields as a JSON object: locatie, data, domeniu, hotarare, legislatie, cuvinte_cheie (list of keywords). "
-            "In locatie, only mention city, locality, country or county name, and mention all the locations found in the document. "
-            "In data, mention all the dates referenced in the document in a dd/mm/yy format. " 
-            "In legislatie, mention all the laws, regulations, statutes and other legal information found in the document."
-            "Return only the JSON object.\n\n"
-            "Decision text:\n"
-            f"{cleaned}"
-        )
-        raw = _generic_completion("", instruction, DEFAULT_KEYWORD_MODEL, client=client).strip()
-        try:
-            result = json.loads(raw)
-        except json.JSONDecodeError:
-            match = re.search(r"\{.*\}", raw)
-            result = json.loads(match.group(0)) if match else {}
-        kws = result.get("cuvinte_cheie", [])[:8]
-        return json.dumps({"locatie": result.get("locatie",""), "data": result.get("data",""), "domeniu": result.get("domeniu",""), "hotarare": result.get("hotarare",""), "legislatie":result.get("legislatie",""), "cuvinte_cheie": kws}, ensure_ascii=False)
+        instruction = build_openai_keyword_instruction(cleaned)
+        raw = _generic_completion("", instruction, DEFAULT_KEYWORD_MODEL, client=client, limiter=limiter)
+        return parse_openai_keyword_response(raw)
     else:
         extractor_map = {
             "tfidf": extract_tfidf_keywords,
@@ -255,3 +467,36 @@ def generate_keywords(text: str, method: str = "openai", flash_vocab: list[str]
         keywords = extractor_map[method](cleaned)
 
     return json.dumps({"locatie": "", "data": "", "domeniu": "", "hotarare": "", "legislatie": "", "cuvinte_cheie": keywords[:8]}, ensure_ascii=False)
+
+
+def generate_keywords_batch(texts: list[str], method: str = "keybert", top_k: int = 8) -> list[str]:
+    """
+    Local (non-LLM) keyword extraction for many documents. Models come from the
+    process cache and KeyBERT encodes all documents in one batch.
+    Returns one JSON string per input, in the same shape as generate_keywords.
+    """
+    if method in ("openai", "flashtext", "flash_fuzzy"):
+        raise ValueError(f"generate_keywords_batch does not support method {method!r}")
+    cleaned = [preprocess_text(t) for t in texts]
+    long_idx = [i for i, c in enumerate(cleaned) if len(c.split()) >= 30]
+
+    if method == "keybert":
+        extracted = extract_keybert_keywords_batch([cleaned[i] for i in long_idx], top_k=top_k)
+    elif method == "tfidf":
+        extracted = extract_tfidf_keywords_batch([cleaned[i] for i in long_idx], top_k=top_k)
+    else:
+        extractor_map = {
+            "rake": extract_rake_keywords,
+            "yake": extract_yake_keywords,
+            "pke": extract_pke_keywords,
+            "lda": extract_gensim_lda_keywords,
+            "word2vec": extract_gensim_word2vec_keywords
+        }
+        if method not in extractor_map:
+            raise ValueError(f"Unknown extraction method: {method!r}")
+        extracted = [extractor_map[method](cleaned[i]) for i in long_idx]
+
+    out = [json.dumps(EMPTY_KEYWORDS, ensure_ascii=False)] * len(texts)
+    for i, keywords in zip(long_idx, extracted):
+        out[i] = json.dumps({"locatie": "", "data": "", "domeniu": "", "hotarare": "", "legislatie": "", "cuvinte_cheie": keywords[:top_k]}, ensure_ascii=False)
+    return out
@@ -0,0 +1,206 @@
+import os
+import re
+import sqlite3
+import logging
+import threading
+from typing import Iterator, Optional
+
+logger = logging.getLogger("KeywordGenerator")
+
+DEFAULT_ONTOLOGY_INDEX = os.getenv("ONTOLOGY_INDEX_PATH")
+SKOS_NS = "http://www.w3.org/2004/02/skos/core#"
+MMAP_SIZE = 256 * 1024 * 1024
+# Candidate phrases looked up per query in OntologyLabelIndex.extract
+LOOKUP_BATCH_SIZE = 500
+_WORD_RE = re.compile(r"\w+")
+
+
+def compile_ontology_index(source: str, out_path: str, lang: str = "ro", format: str = "xml", batch_size: int = 10000) -> int:
+    """
+    Parse an RDF/SKOS/OWL ontology once and write a compact SQLite label index:
+    a `labels(label, uri)` table keyed by lowercased label, pre-filtered to
+    `lang`, plus an FTS5 trigram table for fuzzy candidate lookups.
+    Returns the number of labels written.
+    """
+    import rdflib
+    from rdflib.namespace import RDFS
+    from utils.services.generators.keyword_generator import load_rdf_ontology
+
+    graph = load_rdf_ontology(source, format=format)
+    skos = rdflib.Namespace(SKOS_NS)
+    predicates = [RDFS.label, skos.prefLabel, skos.altLabel]
+
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    tmp = f"{out_path}.tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    conn = sqlite3.connect(tmp)
+    try:
+        conn.execute("PRAGMA journal_mode=OFF")
+        conn.execute("PRAGMA synchronous=OFF")
+        conn.execute("CREATE TABLE labels (label TEXT PRIMARY KEY, uri TEXT NOT NULL) WITHOUT ROWID")
+        conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+        count = 0
+        rows = []
+        for pred in predicates:
+            # Only walk the label predicates instead of every triple in the graph
+            for subj, obj in graph.subject_objects(pred):
+                if not isinstance(obj, rdflib.Literal):
+                    continue
+                if obj.language and obj.language != lang:
+                    continue
+                rows.append((str(obj).lower(), str(subj)))
+                if len(rows) >= batch_size:
+                    count += _insert_labels(conn, rows)
+                    rows = []
+        count += _insert_labels(conn, rows)
+        conn.execute("CREATE VIRTUAL TABLE labels_fts USING fts5(label, tokenize='trigram')")
+        conn.execute("INSERT INTO labels_fts(label) SELECT label FROM labels")
+        conn.executemany(
+            "INSERT INTO meta(key, value) VALUES (?, ?)",
+            [("source", os.path.abspath(source)), ("lang", lang)],
+        )
+        conn.commit()
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+    os.replace(tmp, out_path)
+    logger.info("Compiled %d ontology labels (lang=%s) from %s into %s", count, lang, source, out_path)
+    return count
+
+
+def _insert_labels(conn: sqlite3.Connection, rows: list) -> int:
+    if not rows:
+        return 0
+    # Last label wins, matching index_labels_from_rdf's dict semantics
+    before = conn.total_changes
+    conn.executemany("INSERT OR REPLACE INTO labels(label, uri) VALUES (?, ?)", rows)
+    return conn.total_changes - before
+
+
+class OntologyLabelIndex:
+    """
+    Read-only, memory-mapped view of a compiled label index. Behaves like the
+    label -> URI dict returned by index_labels_from_rdf for lookups, and offers
+    `best_match` for fuzzy mapping without loading every label into memory.
+    """
+
+    def __init__(self, path: str, mmap_size: int = MMAP_SIZE):
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)
+        self.path = path
+        self.mmap_size = mmap_size
+        self._local = threading.local()
+        self._max_words: Optional[int] = None
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            uri = f"file:{os.path.abspath(self.path)}?mode=ro"
+            conn = sqlite3.connect(uri, uri=True)
+            conn.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+            self._local.conn = conn
+        return conn
+
+    def get(self, label: str, default=None):
+        row = self._conn().execute("SELECT uri FROM labels WHERE label = ?", (label.lower(),)).fetchone()
+        return row[0] if row else default
+
+    def __getitem__(self, label: str) -> str:
+        uri = self.get(label)
+        if uri is None:
+            raise KeyError(label)
+        return uri
+
+    def __contains__(self, label) -> bool:
+        return isinstance(label, str) and self.get(label) is not None
+
+    def __len__(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM labels").fetchone()[0]
+
+    def __iter__(self) -> Iterator[str]:
+        return (row[0] for row in self._conn().execute("SELECT label FROM labels"))
+
+    def keys(self) -> Iterator[str]:
+        return iter(self)
+
+    def candidates(self, query: str, limit: int = 20) -> list[str]:
+        q = query.lower()
+        grams = {q[i:i + 3] for i in range(len(q) - 2)}
+        if not grams:
+            return [row[0] for row in self._conn().execute(
+                "SELECT label FROM labels WHERE label LIKE ? LIMIT ?", (f"{q}%", limit))]
+        match = " OR ".join('"' + g.replace('"', '""') + '"' for g in grams)
+        rows = self._conn().execute(
+            "SELECT label FROM labels_fts WHERE labels_fts MATCH ? ORDER BY rank LIMIT ?",
+            (match, limit),
+        )
+        return [row[0] for row in rows]
+
+    def best_match(self, query: str, limit: int = 20) -> tuple[Optional[str], int]:
+        from thefuzz import fuzz
+        best, score = None, 0
+        for label in self.candidates(query, limit):
+            s = fuzz.token_set_ratio(query, label)
+            if s > score:
+                best, score = label, s
+        return best, score
+
+    def extract(self, text: str) -> list[str]:
+        """
+        Labels found in `text`, longest match first and left to right, like the
+        term automaton. Looks up the text's word n-grams in the index instead of
+        loading every label into an automaton; labels match on their words, so
+        punctuation between words is ignored.
+        """
+        if self._max_words is None:
+            self._max_words = self._conn().execute(
+                "SELECT COALESCE(MAX(LENGTH(label) - LENGTH(REPLACE(label, ' ', ''))), 0) + 1 FROM labels"
+            ).fetchone()[0]
+        words = _WORD_RE.findall(text.lower())
+        phrases = {
+            " ".join(words[i:i + n])
+            for i in range(len(words))
+            for n in range(1, min(self._max_words, len(words) - i) + 1)
+        }
+        known: set[str] = set()
+        phrases = list(phrases)
+        for start in range(0, len(phrases), LOOKUP_BATCH_SIZE):
+            batch = phrases[start:start + LOOKUP_BATCH_SIZE]
+            rows = self._conn().execute(
+                f"SELECT label FROM labels WHERE label IN ({','.join('?' * len(batch))})", batch
+            )
+            known.update(row[0] for row in rows)
+        found: dict[str, None] = {}
+        i = 0
+        while i < len(words):
+            for n in range(min(self._max_words, len(words) - i), 0, -1):
+                phrase = " ".join(words[i:i + n])
+                if phrase in known:
+                    found.setdefault(phrase)
+                    i += n
+                    break
+            else:
+                i += 1
+        return list(found)
+
+
+_indexes: dict[str, OntologyLabelIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_ontology_index(path: Optional[str] = DEFAULT_ONTOLOGY_INDEX) -> Optional[OntologyLabelIndex]:
+    """
+    Open (once per process) the compiled label index at `path`, defaulting to
+    ONTOLOGY_INDEX_PATH. Returns None when no index is configured or present.
+    """
+    if not path or not os.path.exists(path):
+        return None
+    index = _indexes.get(path)
+    if index is None:
+        with _indexes_lock:
+            index = _indexes.get(path)
+            if index is None:
+                index = OntologyLabelIndex(path)
+                _indexes[path] = index
+    return index
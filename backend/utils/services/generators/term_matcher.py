@@ -0,0 +1,185 @@
+import os
+import pickle
+import hashlib
+import logging
+import threading
+from collections import OrderedDict, defaultdict
+from itertools import chain
+from typing import Iterable, Optional
+
+logger = logging.getLogger("KeywordGenerator")
+
+DEFAULT_AUTOMATON_DIR = os.getenv("KEYWORD_AUTOMATON_DIR", os.path.join("instance", "term_automata"))
+
+
+def vocabulary_digest(terms: Iterable[str], case_sensitive: bool = False) -> str:
+    """
+    Stable identifier for a vocabulary, used as the cache/persistence key.
+    """
+    h = hashlib.sha1(b"cs" if case_sensitive else b"ci")
+    for term in sorted(set(terms)):
+        h.update(term.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+_digests: dict[tuple, tuple[tuple, str]] = {}
+_DIGEST_CACHE_SIZE = 64
+
+
+def cached_vocabulary_digest(*sources: Iterable[str], case_sensitive: bool = False) -> str:
+    """
+    vocabulary_digest of the terms of `sources` (term lists, label maps),
+    computed once per combination of source objects instead of on every
+    lookup. Like get_label_index, it assumes a source does not change.
+    """
+    key = (case_sensitive,) + tuple(id(source) for source in sources)
+    entry = _digests.get(key)
+    if entry is None or any(a is not b for a, b in zip(entry[0], sources)):
+        digest = vocabulary_digest(chain.from_iterable(sources), case_sensitive)
+        if len(_digests) >= _DIGEST_CACHE_SIZE:
+            _digests.clear()
+        entry = _digests[key] = (sources, digest)
+    return entry[1]
+
+
+class TermAutomaton:
+    """
+    Prebuilt trie (flashtext's Aho-Corasick-style matcher) over the legal
+    vocabulary and/or ontology labels. Built once, pickled to disk and reused,
+    instead of re-adding every term on each extraction.
+    """
+
+    def __init__(self, case_sensitive: bool = False):
+        from flashtext import KeywordProcessor
+        self.case_sensitive = case_sensitive
+        self.processor = KeywordProcessor(case_sensitive=case_sensitive)
+        self.size = 0
+
+    def add_terms(self, terms: Iterable[str]) -> "TermAutomaton":
+        for term in terms:
+            if term:
+                self.processor.add_keyword(term)
+                self.size += 1
+        return self
+
+    def extract(self, text: str) -> list[str]:
+        seen, uniq = set(), []
+        for kw in self.processor.extract_keywords(text):
+            if kw not in seen:
+                seen.add(kw)
+                uniq.append(kw)
+        return uniq
+
+    def save(self, path: str) -> str:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as fh:
+            pickle.dump(self, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        return path
+
+    @staticmethod
+    def load(path: str) -> "TermAutomaton":
+        with open(path, "rb") as fh:
+            return pickle.load(fh)
+
+
+_automata: dict[str, TermAutomaton] = {}
+_automata_lock = threading.Lock()
+
+
+def get_term_automaton(
+    vocabulary: Iterable[str],
+    case_sensitive: bool = False,
+    cache_dir: Optional[str] = DEFAULT_AUTOMATON_DIR,
+    digest: Optional[str] = None,
+) -> TermAutomaton:
+    """
+    Return the automaton for `vocabulary`: from the process cache, else from
+    disk, else build it and persist it under `cache_dir`. `digest` is the
+    vocabulary's cached_vocabulary_digest when `vocabulary` is built per call
+    (it is then only iterated to build the automaton).
+    """
+    key = digest or cached_vocabulary_digest(vocabulary, case_sensitive=case_sensitive)
+    automaton = _automata.get(key)
+    if automaton is not None:
+        return automaton
+    with _automata_lock:
+        automaton = _automata.get(key)
+        if automaton is None:
+            path = os.path.join(cache_dir, f"{key}.pkl") if cache_dir else None
+            if path and os.path.exists(path):
+                automaton = TermAutomaton.load(path)
+            else:
+                automaton = TermAutomaton(case_sensitive).add_terms(vocabulary)
+                logger.info("Built term automaton with %d terms", automaton.size)
+                if path:
+                    automaton.save(path)
+            _automata[key] = automaton
+    return automaton
+
+
+class NgramIndex:
+    """
+    Character-trigram inverted index over ontology labels. Fuzzy lookups only
+    score the few labels sharing the most trigrams with the query instead of
+    every label, turning O(terms x labels) into roughly O(terms x candidates).
+    """
+
+    def __init__(self, labels: Iterable[str], n: int = 3):
+        self.n = n
+        self.labels: list[str] = []
+        self.postings: dict[str, list[int]] = defaultdict(list)
+        for label in labels:
+            idx = len(self.labels)
+            self.labels.append(label)
+            for gram in self._grams(label):
+                self.postings[gram].append(idx)
+        self.postings = dict(self.postings)
+
+    def _grams(self, text: str) -> set[str]:
+        padded = f"  {text.lower()} "
+        return {padded[i:i + self.n] for i in range(len(padded) - self.n + 1)}
+
+    def candidates(self, query: str, limit: int = 20) -> list[str]:
+        counts: dict[int, int] = defaultdict(int)
+        for gram in self._grams(query):
+            for idx in self.postings.get(gram, ()):
+                counts[idx] += 1
+        best = sorted(counts.items(), key=lambda kv: -kv[1])[:limit]
+        return [self.labels[idx] for idx, _ in best]
+
+    def best_match(self, query: str, limit: int = 20) -> tuple[Optional[str], int]:
+        from thefuzz import fuzz
+        best, score = None, 0
+        for label in self.candidates(query, limit):
+            s = fuzz.token_set_ratio(query, label)
+            if s > score:
+                best, score = label, s
+        return best, score
+
+
+_label_indexes: "OrderedDict[str, NgramIndex]" = OrderedDict()
+_label_indexes_lock = threading.Lock()
+_LABEL_INDEX_CACHE_SIZE = 8
+
+
+def get_label_index(label_map: dict) -> NgramIndex:
+    """
+    Trigram index for a label map, built once per set of labels and kept in a
+    small LRU keyed by the labels' digest (not by the label_map object).
+    """
+    key = cached_vocabulary_digest(label_map)
+    with _label_indexes_lock:
+        index = _label_indexes.get(key)
+        if index is not None:
+            _label_indexes.move_to_end(key)
+            return index
+    index = NgramIndex(label_map.keys())
+    logger.debug("Built trigram index over %d ontology labels", len(label_map))
+    with _label_indexes_lock:
+        _label_indexes[key] = index
+        while len(_label_indexes) > _LABEL_INDEX_CACHE_SIZE:
+            _label_indexes.popitem(last=False)
+    return index
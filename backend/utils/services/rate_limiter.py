@@ -0,0 +1,191 @@
+import os
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Per-minute quotas shared by every OpenAI call made from this process.
+DEFAULT_RPM_LIMIT = int(os.getenv("OPENAI_RPM_LIMIT", 500))
+DEFAULT_TPM_LIMIT = int(os.getenv("OPENAI_TPM_LIMIT", 200000))
+
+# Longest a single rate-limit response may hold back every caller in the process.
+DEFAULT_MAX_THROTTLE_PAUSE = float(os.getenv("OPENAI_MAX_THROTTLE_PAUSE", 10.0))
+
+# Upper bound for the adaptive, process-wide in-flight limit across all purposes.
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", 24))
+
+# Per-purpose in-flight caps, so bulk ingestion cannot starve interactive chat.
+DEFAULT_CONCURRENCY = {
+    "chat": int(os.getenv("OPENAI_CHAT_CONCURRENCY", 8)),
+    "embeddings": int(os.getenv("OPENAI_EMBED_CONCURRENCY", 16)),
+    "keywords": int(os.getenv("OPENAI_KEYWORD_CONCURRENCY", 4)),
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap token estimate (~4 characters per token) used for TPM accounting.
+    """
+    return max(1, len(text or "") // 4)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at `capacity` units per minute.
+    `reserve()` books the units immediately and returns how long the caller must
+    wait before using them.
+    """
+
+    def __init__(self, capacity_per_minute: int):
+        if capacity_per_minute <= 0:
+            raise ValueError("capacity_per_minute must be positive")
+        self.capacity = float(capacity_per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: int = 1) -> float:
+        # Requests larger than the bucket would never fit; clamp them to a full bucket.
+        amount = min(float(amount), self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= amount
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def pause(self, seconds: float) -> None:
+        """
+        Drain the bucket so no reservation succeeds for at least `seconds`
+        (used when the server tells us to back off).
+        """
+        with self._lock:
+            self.tokens = min(self.tokens, -seconds * self.rate)
+            self.updated = time.monotonic()
+
+    def acquire(self, amount: int = 1) -> None:
+        delay = self.reserve(amount)
+        if delay > 0:
+            time.sleep(delay)
+
+
+class AdaptiveConcurrency:
+    """
+    AIMD in-flight limit: grows by one after `limit` consecutive successes and
+    halves whenever the API reports throttling, between `min_limit` and `max_limit`.
+    """
+
+    def __init__(self, max_limit: int = DEFAULT_MAX_CONCURRENCY, min_limit: int = 1):
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        self.limit = self.max_limit
+        self.in_flight = 0
+        self._successes = 0
+        self._cond = threading.Condition()
+
+    def acquire(self) -> None:
+        with self._cond:
+            while self.in_flight >= self.limit:
+                self._cond.wait()
+            self.in_flight += 1
+
+    def release(self) -> None:
+        with self._cond:
+            self.in_flight = max(0, self.in_flight - 1)
+            self._cond.notify()
+
+    def on_success(self) -> None:
+        with self._cond:
+            self._successes += 1
+            if self._successes >= self.limit and self.limit < self.max_limit:
+                self.limit += 1
+                self._successes = 0
+                self._cond.notify()
+
+    def on_throttle(self) -> None:
+        with self._cond:
+            new_limit = max(self.min_limit, self.limit // 2)
+            if new_limit != self.limit:
+                logger.warning("OpenAI throttling: lowering concurrency %d -> %d", self.limit, new_limit)
+            self.limit = new_limit
+            self._successes = 0
+
+
+class RateLimiter:
+    """
+    Process-wide OpenAI quota: one RPM bucket, one TPM bucket, a concurrency
+    cap per purpose ('chat', 'embeddings', 'keywords') and an adaptive global
+    in-flight limit fed by the retry policy. Callers hold `limit()` around
+    the HTTP request only.
+    """
+
+    def __init__(
+        self,
+        rpm: int = DEFAULT_RPM_LIMIT,
+        tpm: int = DEFAULT_TPM_LIMIT,
+        concurrency: Optional[Dict[str, int]] = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        max_pause: float = DEFAULT_MAX_THROTTLE_PAUSE,
+    ):
+        self.max_pause = max_pause
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.adaptive = AdaptiveConcurrency(max_concurrency)
+        self.concurrency = dict(DEFAULT_CONCURRENCY)
+        if concurrency:
+            self.concurrency.update(concurrency)
+        self._semaphores = {
+            purpose: threading.BoundedSemaphore(limit)
+            for purpose, limit in self.concurrency.items()
+        }
+
+    @contextmanager
+    def limit(self, purpose: str, tokens: int = 1):
+        sem = self._semaphores.get(purpose)
+        if sem is None:
+            raise ValueError(f"Unknown rate-limit purpose: {purpose!r}")
+        with sem:
+            self.adaptive.acquire()
+            try:
+                self.requests.acquire(1)
+                self.tokens.acquire(tokens)
+                yield
+                self.adaptive.on_success()
+            finally:
+                self.adaptive.release()
+
+    def on_throttle(self, retry_after: Optional[float] = None) -> None:
+        """
+        Called by the retry policy on a rate-limit response: shrink the adaptive
+        limit and, when the server sent a Retry-After, hold every caller back
+        for it (at most `max_pause` seconds).
+        """
+        self.adaptive.on_throttle()
+        if retry_after:
+            self.requests.pause(min(retry_after, self.max_pause))
+
+
+_shared_limiter: Optional[RateLimiter] = None
+_shared_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """
+    Return the process-wide RateLimiter, creating it on first use.
+    """
+    global _shared_limiter
+    if _shared_limiter is None:
+        with _shared_lock:
+            if _shared_limiter is None:
+                _shared_limiter = RateLimiter()
+                logger.debug(
+                    "Created shared OpenAI rate limiter (rpm=%s, tpm=%s, concurrency=%s)",
+                    DEFAULT_RPM_LIMIT, DEFAULT_TPM_LIMIT, _shared_limiter.concurrency,
+                )
+    return _shared_limiter
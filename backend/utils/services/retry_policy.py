@@ -0,0 +1,154 @@
+import os
+import re
+import random
+import logging
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Optional
+
+import openai
+from tenacity import retry, stop_after_attempt, retry_if_exception
+
+from utils.services.rate_limiter import get_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ATTEMPTS = int(os.getenv("OPENAI_MAX_ATTEMPTS", 6))
+DEFAULT_BASE_DELAY = float(os.getenv("OPENAI_RETRY_BASE_DELAY", 1.0))
+DEFAULT_MAX_DELAY = float(os.getenv("OPENAI_RETRY_MAX_DELAY", 60.0))
+
+RATE_LIMIT = "rate_limit"
+TIMEOUT = "timeout"
+SERVER_ERROR = "server_error"
+
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def classify_error(exc: BaseException) -> Optional[str]:
+    """
+    Map an OpenAI SDK exception to a retryable category, or None if retrying
+    would not help (bad request, auth, not found, ...).
+    """
+    if isinstance(exc, openai.RateLimitError):
+        return RATE_LIMIT
+    if isinstance(exc, (openai.APITimeoutError, openai.APIConnectionError)):
+        return TIMEOUT
+    if isinstance(exc, openai.APIStatusError):
+        if exc.status_code == 429:
+            return RATE_LIMIT
+        if exc.status_code in (408, 409):
+            return TIMEOUT
+        if exc.status_code >= 500:
+            return SERVER_ERROR
+    return None
+
+
+def _parse_duration(value: str) -> Optional[float]:
+    """
+    Parse OpenAI reset headers such as '20ms', '1s' or '6m0s' into seconds.
+    """
+    parts = _DURATION_RE.findall(value or "")
+    if not parts:
+        return None
+    return sum(float(num) * _DURATION_UNITS[unit] for num, unit in parts)
+
+
+def _headers(exc: BaseException):
+    response = getattr(exc, "response", None)
+    return getattr(response, "headers", None)
+
+
+def server_retry_after(exc: BaseException) -> Optional[float]:
+    """
+    The delay the server asked for in Retry-After / Retry-After-Ms, or None.
+    """
+    headers = _headers(exc)
+    if not headers:
+        return None
+
+    ms = headers.get("retry-after-ms")
+    if ms:
+        try:
+            return float(ms) / 1000.0
+        except ValueError:
+            pass
+
+    after = headers.get("retry-after")
+    if after:
+        try:
+            return float(after)
+        except ValueError:
+            try:
+                when = parsedate_to_datetime(after)
+                return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+            except (TypeError, ValueError):
+                pass
+    return None
+
+
+def retry_after_seconds(exc: BaseException) -> Optional[float]:
+    """
+    How long this caller should wait: the server's Retry-After, else the time
+    until the rate-limit buckets refill (x-ratelimit-reset-*).
+    """
+    delay = server_retry_after(exc)
+    if delay is not None:
+        return delay
+    headers = _headers(exc)
+    if not headers:
+        return None
+    resets = [
+        _parse_duration(headers.get(name, ""))
+        for name in ("x-ratelimit-reset-requests", "x-ratelimit-reset-tokens")
+    ]
+    resets = [r for r in resets if r is not None]
+    return max(resets) if resets else None
+
+
+class RateLimitAwareWait:
+    """
+    tenacity wait strategy: honour the server's delay when present, otherwise
+    exponential backoff with full jitter, capped at `max_delay`.
+    """
+
+    def __init__(self, base: float = DEFAULT_BASE_DELAY, max_delay: float = DEFAULT_MAX_DELAY):
+        self.base = base
+        self.max_delay = max_delay
+
+    def __call__(self, retry_state) -> float:
+        exc = retry_state.outcome.exception() if retry_state.outcome else None
+        server_delay = retry_after_seconds(exc) if exc else None
+        if server_delay is not None:
+            # Small jitter so callers released by the same header don't stampede.
+            return min(self.max_delay, server_delay + random.uniform(0, self.base))
+        backoff = min(self.max_delay, self.base * (2 ** (retry_state.attempt_number - 1)))
+        return random.uniform(0, backoff)
+
+
+def _before_sleep(retry_state) -> None:
+    exc = retry_state.outcome.exception()
+    kind = classify_error(exc)
+    if kind == RATE_LIMIT:
+        # Only an explicit Retry-After holds back the other callers; the reset
+        # headers give the time to a full refill, not a retry hint
+        get_rate_limiter().on_throttle(server_retry_after(exc))
+    logger.warning(
+        "OpenAI %s on %s (attempt %d), retrying in %.2fs",
+        kind, getattr(retry_state.fn, "__name__", "call"),
+        retry_state.attempt_number, retry_state.next_action.sleep if retry_state.next_action else 0.0,
+    )
+
+
+def openai_retry(max_attempts: int = DEFAULT_MAX_ATTEMPTS):
+    """
+    Shared retry decorator for OpenAI calls (sync or async functions).
+    Retries rate-limit, timeout and 5xx errors; everything else is raised at once.
+    """
+    return retry(
+        retry=retry_if_exception(lambda e: classify_error(e) is not None),
+        stop=stop_after_attempt(max_attempts),
+        wait=RateLimitAwareWait(),
+        before_sleep=_before_sleep,
+        reraise=True,
+    )
@@ -1,40 +1,127 @@
-import threading
 import logging
-import time
+from typing import Any, Callable, Dict, List, Optional
 from utils.websockets.upload_tracking import (
+    PROGRESS_INTERVAL_SECONDS,
     emit_upload_started,
-    emit_file_uploaded,
-    emit_file_failed,
     emit_upload_complete,
+    get_progress,
+    purge_expired_sessions,
 )
-import queue
 
 logger = logging.getLogger(__name__)
 
-def ws_queue_relay(ws_queue, session_id, stop_event=None):
-    logger.info(f"Starting WebSocket relay for session {session_id}")
-    while stop_event is None or not stop_event.is_set():
-        try:
-            msg = ws_queue.get(timeout=1)
-            logger.info(f"[WS RELAY] Got message for session {session_id}: {msg!r}")
-            if "upload_started" in msg:
-                logger.info(f"[WS RELAY] Calling emit_upload_started for {session_id}")
-                emit_upload_started(session_id, msg["upload_started"])
-            elif "file" in msg:
-                if msg.get("success", False):
-                    logger.info(f"[WS RELAY] Calling emit_file_uploaded for {session_id}, file: {msg['file']}")
-                    emit_file_uploaded(session_id, msg["file"])
-                else:
-                    logger.info(f"[WS RELAY] Calling emit_file_failed for {session_id}, file: {msg['file']}, error: {msg.get('error')}")
-                    emit_file_failed(session_id, msg["file"], msg.get("error", "Unknown error"))
-            elif "complete" in msg:
-                logger.info(f"[WS RELAY] Calling emit_upload_complete for {session_id}")
-                emit_upload_complete(session_id, msg.get("summary", {}))
-                logger.info(f"[WS RELAY] upload complete for {session_id}")
-                break  # Stop relay after complete
-        except Exception as e:
-            logger.error(f"[WS RELAY] Exception in relay for {session_id}: {e}", exc_info=True)
-            time.sleep(0.1)
-        except queue.Empty:
-            logger.info(f"[WS RELAY] No messages in queue for session {session_id}")
-    logger.info(f"WebSocket relay stopped for session {session_id}")
+
+class EventBridge:
+    """
+    The single consumer of the worker event channel: one background task (a
+    greenlet under gevent) that reads events of every upload session and fans
+    them out to the sessions' websocket rooms. Events carry their `session_id`;
+    only sessions registered by `submit_job` are forwarded.
+
+    Per-file results are coalesced by the session's UploadProgress into
+    rate-limited `upload_progress` frames. `keywords_delta` messages are not
+    sent to clients; they go to the session's `on_keywords` (the live keyword
+    index update) when given. `files_added` (ids of the files the job created)
+    goes to `on_files_added`. `cancelled` is the worker's acknowledgement that
+    it stopped a cancelled job; `on_cancelled` then cleans up after it.
+    """
+
+    def __init__(self, channel):
+        self.channel = channel
+        self._sessions: Dict[str, Dict[str, Optional[Callable]]] = {}
+        self._running = False
+
+    def register(self, session_id: str, on_keywords: Optional[Callable] = None,
+                 on_files_added: Optional[Callable] = None, on_cancelled: Optional[Callable] = None) -> None:
+        self._sessions[session_id] = {
+            "on_keywords": on_keywords, "on_files_added": on_files_added, "on_cancelled": on_cancelled,
+        }
+        logger.info(f"Event bridge: session {session_id} registered")
+
+    def unregister(self, session_id: str) -> None:
+        """
+        Stop forwarding a session's events (it completed or was cancelled).
+        """
+        self._sessions.pop(session_id, None)
+
+    @property
+    def sessions(self) -> List[str]:
+        return list(self._sessions)
+
+    def dispatch(self, msg: Dict[str, Any]) -> None:
+        session_id = msg.get("session_id")
+        route = self._sessions.get(session_id)
+        if route is None:
+            logger.debug(f"[WS BRIDGE] Dropping event for inactive session {session_id}: {msg!r}")
+            return
+        progress = get_progress(session_id)
+        if "keywords_delta" in msg:
+            if route["on_keywords"] is not None:
+                route["on_keywords"](msg["keywords_delta"])
+        elif "files_added" in msg:
+            if route["on_files_added"] is not None:
+                route["on_files_added"](msg["files_added"])
+        elif "upload_started" in msg:
+            logger.info(f"[WS BRIDGE] Calling emit_upload_started for {session_id}")
+            progress.start(msg["upload_started"])
+            emit_upload_started(session_id, msg["upload_started"])
+        elif "file" in msg:
+            progress.record(msg["file"], msg.get("success", False), msg.get("error"))
+        elif "complete" in msg:
+            progress.flush()
+            logger.info(f"[WS BRIDGE] Calling emit_upload_complete for {session_id}")
+            emit_upload_complete(session_id, msg.get("summary", {}))
+            self.unregister(session_id)
+        elif "cancelled" in msg:
+            self.unregister(session_id)
+            if route["on_cancelled"] is not None:
+                route["on_cancelled"]()
+
+    def flush_due(self) -> None:
+        """
+        Emit progress frames whose interval has passed, and drop the buffered
+        events of completed or expired sessions (a session idle past the TTL
+        is assumed dead and unregistered too).
+        """
+        for session_id in list(self._sessions):
+            get_progress(session_id).maybe_flush()
+        for session_id in purge_expired_sessions():
+            self.unregister(session_id)
+
+    def run(self) -> None:
+        logger.info("Event bridge started")
+        while self._running:
+            try:
+                # Wake up at least once per frame interval so pending results are flushed
+                if self.channel.wait(PROGRESS_INTERVAL_SECONDS):
+                    for msg in self.channel.drain():
+                        self.dispatch(msg)
+                self.flush_due()
+            except Exception as e:
+                logger.error(f"[WS BRIDGE] Exception while relaying events: {e}", exc_info=True)
+        logger.info("Event bridge stopped")
+
+    def start(self, socketio) -> None:
+        self._running = True
+        socketio.start_background_task(self.run)
+
+    def stop(self) -> None:
+        self._running = False
+
+
+_bridge: Optional[EventBridge] = None
+
+
+def start_event_bridge(channel, socketio) -> EventBridge:
+    """
+    Start the process-wide bridge for `channel` (once, in the web process).
+    """
+    global _bridge
+    if _bridge is None:
+        _bridge = EventBridge(channel)
+        _bridge.start(socketio)
+    return _bridge
+
+
+def get_event_bridge() -> Optional[EventBridge]:
+    return _bridge
@@ -1,8 +1,6 @@
 import os
 from dotenv import load_dotenv
 import requests
-from pinecone.grpc import PineconeGRPC as Pinecone
-from pinecone import ServerlessSpec
 import time
 from db.models import File, db
 
@@ -40,7 +38,8 @@ def pinecone_vector_logic(embeddings, additional_params=None, filetext=''):
         if not api_key:
             raise ValueError("PINECONE_API_KEY is not set in the environment variables.")
         
-        # Initialize the Pinecone client and get the index
+        # Initialize the Pinecone client and get the index (gRPC client is slow to import)
+        from pinecone.grpc import PineconeGRPC as Pinecone
         pc = Pinecone(api_key=api_key)
         index = pc.Index(index_name)
         
@@ -1,5 +1,4 @@
 from flask_socketio import SocketIO, emit
-import eventlet
 from engineio.async_drivers import gevent
 from flask import request
 
@@ -7,21 +6,34 @@ from flask import request
 # Create a SocketIO instance with CORS allowed (modify cors_allowed_origins as needed)
 socketio = SocketIO(cors_allowed_origins="*", async_mode='gevent')
 
-from utils.websockets.upload_tracking import join_upload_room
+from utils.websockets.upload_tracking import join_upload_room, leave_upload_room, progress_trackers
 
 @socketio.on('connect', namespace='/upload')
 def handle_connect(auth = None):
     print('Request args:', dict(request.args))
     session_id = auth.get('session_id') if auth else None
     if session_id:
-        join_upload_room(session_id)
+        # A reconnecting client sends the last event seq it saw and gets only newer events
+        join_upload_room(session_id, request.sid, int(auth.get('last_seq') or 0))
         # Send a test message to client after joining room
         emit('test_message', {'message': 'Test message from server'}, room=session_id, namespace='/upload')
     print(f"Client connected to upload namespace with session_id={session_id}")
     emit('server_response', {'data': 'Connected to Flask WebSocket server!'}, namespace='/upload')
 
+@socketio.on('get_upload_failures', namespace='/upload')
+def handle_get_upload_failures(data):
+    """
+    Page through a session's failed files; progress frames only carry new ones.
+    Returned as the event acknowledgement.
+    """
+    tracker = progress_trackers.get((data or {}).get('session_id'))
+    if tracker is None:
+        return {'total': 0, 'failures': []}
+    return tracker.get_failures(int(data.get('offset', 0)), min(int(data.get('limit', 500)), 1000))
+
 @socketio.on('disconnect', namespace='/upload')
 def handle_disconnect():
+    leave_upload_room(request.sid)
     print("Client disconnected from upload namespace")
 
 
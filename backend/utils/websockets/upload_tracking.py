@@ -1,6 +1,8 @@
 from flask_socketio import join_room
 from flask import current_app
+from collections import deque
 import logging
+import os
 import threading
 import time
 
@@ -9,66 +11,302 @@ from utils.websockets.sockets import socketio
 
 logger = logging.getLogger(__name__)
 
-# Dictionary to track if client has joined room: {session_id: bool}
-client_joined_rooms = {}
+# Progress frames go out at most every PROGRESS_INTERVAL_SECONDS, or sooner once
+# PROGRESS_EVERY_FILES results are pending.
+PROGRESS_INTERVAL_SECONDS = float(os.getenv("UPLOAD_PROGRESS_INTERVAL", 0.25))
+PROGRESS_EVERY_FILES = int(os.getenv("UPLOAD_PROGRESS_EVERY", 500))
+# Per-frame caps, so a frame stays small however many files finished since the last one
+FRAME_RECENT_FILES = 20
+FRAME_MAX_FAILURES = 50
+
+# Event log bounds: events kept per session, and how long a session's events
+# are kept after its last event (or after upload_complete).
+EVENT_BUFFER_SIZE = int(os.getenv("UPLOAD_EVENT_BUFFER_SIZE", 256))
+EVENT_BUFFER_TTL_SECONDS = float(os.getenv("UPLOAD_EVENT_BUFFER_TTL", 3600))
+COMPLETED_SESSION_TTL_SECONDS = float(os.getenv("UPLOAD_COMPLETED_SESSION_TTL", 300))
+PURGE_INTERVAL_SECONDS = 30
+# Cumulative events: a newer one replaces an older one at the end of the log
+COALESCED_EVENTS = ('upload_progress',)
+
+
+class SessionEvents:
+    """
+    Recent websocket events of one upload session, as (seq, event_name, data)
+    in a ring buffer, plus the socket ids of the clients in its room.
+    """
+
+    def __init__(self, maxlen, now):
+        self.events = deque(maxlen=maxlen)
+        self.next_seq = 1
+        self.clients = set()
+        self.touched_at = now
+        self.completed_at = None
+
+
+class UploadEventLog:
+    """
+    Bounded, expiring log of upload events for every session.
+
+    Every emitted event gets a per-session sequence number (sent to clients as
+    `seq`) and is kept in a ring buffer of `maxlen` events, so a client that
+    joins late or reconnects replays only the events after the last `seq` it
+    saw. Sessions are dropped `completed_ttl` seconds after upload_complete, or
+    `ttl` seconds after their last event when the job never finishes.
+    """
+
+    def __init__(self, maxlen=EVENT_BUFFER_SIZE, ttl=EVENT_BUFFER_TTL_SECONDS,
+                 completed_ttl=COMPLETED_SESSION_TTL_SECONDS, clock=time.monotonic):
+        self.maxlen = maxlen
+        self.ttl = ttl
+        self.completed_ttl = completed_ttl
+        self.clock = clock
+        self._sessions = {}
+        self._client_sessions = {}  # socket id -> session id
+        self._lock = threading.Lock()
+        self._next_purge = 0.0
+
+    def _session(self, session_id):
+        sess = self._sessions.get(session_id)
+        if sess is None:
+            sess = self._sessions[session_id] = SessionEvents(self.maxlen, self.clock())
+        return sess
+
+    def record(self, session_id, event_name, data):
+        """
+        Append an event; returns the payload to send (data with its `seq`).
+        """
+        with self._lock:
+            sess = self._session(session_id)
+            payload = dict(data, seq=sess.next_seq)
+            sess.next_seq += 1
+            if event_name in COALESCED_EVENTS and sess.events and sess.events[-1][1] == event_name:
+                sess.events.pop()
+            sess.events.append((payload['seq'], event_name, payload))
+            sess.touched_at = self.clock()
+            if event_name == 'upload_complete':
+                sess.completed_at = sess.touched_at
+            return payload
+
+    def has_clients(self, session_id):
+        sess = self._sessions.get(session_id)
+        return bool(sess and sess.clients)
+
+    def join(self, session_id, client_id):
+        with self._lock:
+            self._session(session_id).clients.add(client_id)
+            self._client_sessions[client_id] = session_id
+
+    def leave(self, client_id):
+        """
+        Forget a disconnected client; returns its session id, if any.
+        """
+        with self._lock:
+            session_id = self._client_sessions.pop(client_id, None)
+            sess = self._sessions.get(session_id)
+            if sess is not None:
+                sess.clients.discard(client_id)
+            return session_id
+
+    def since(self, session_id, offset=0):
+        """
+        Events with seq > offset still in the buffer, as (event_name, data).
+        """
+        with self._lock:
+            sess = self._sessions.get(session_id)
+            if sess is None:
+                return []
+            return [(name, data) for seq, name, data in sess.events if seq > offset]
+
+    def discard(self, session_id):
+        with self._lock:
+            sess = self._sessions.pop(session_id, None)
+            if sess is not None:
+                for client_id in sess.clients:
+                    self._client_sessions.pop(client_id, None)
+
+    def expired(self):
+        now = self.clock()
+        with self._lock:
+            return [
+                session_id for session_id, sess in self._sessions.items()
+                if (sess.completed_at is not None and now - sess.completed_at >= self.completed_ttl)
+                or now - sess.touched_at >= self.ttl
+            ]
+
+    def purge_due(self):
+        """
+        True at most once every PURGE_INTERVAL_SECONDS.
+        """
+        now = self.clock()
+        if now < self._next_purge:
+            return False
+        self._next_purge = now + PURGE_INTERVAL_SECONDS
+        return True
+
+    def __len__(self):
+        return len(self._sessions)
+
+
+event_log = UploadEventLog()
+
+def _emit(session_id, event_name, data):
+    payload = event_log.record(session_id, event_name, data)
+    if event_log.has_clients(session_id):
+        socketio.emit(event_name, payload, room=session_id, namespace='/upload')
+    else:
+        logger.debug(f"Buffered {event_name} event for session {session_id} until a client joins")
+    return payload
 
 def emit_upload_started(session_id, total_files):
-    if not client_joined_rooms.get(session_id, False):
-        logger.info(f"Buffering upload_started event for session {session_id} until client joins room")
-        buffer_event(session_id, ('upload_started', {'total_files': total_files}))
-        return
-    room = session_id
     logger.info(f"Emitting upload_started to session {session_id} with total_files={total_files}")
-    socketio.emit('upload_started', {'total_files': total_files}, room=room, namespace='/upload')
+    _emit(session_id, 'upload_started', {'total_files': total_files})
 
 def emit_file_uploaded(session_id, file_name):
-    if not client_joined_rooms.get(session_id, False):
-        logger.info(f"Buffering file_uploaded event for session {session_id} until client joins room")
-        buffer_event(session_id, ('file_uploaded', {'file_name': file_name}))
-        return
-    room = session_id
-    logger.info(f"Emitting file_uploaded to session {session_id} for file {file_name}")
-    socketio.emit('file_uploaded', {'file_name': file_name}, room=room, namespace='/upload')
+    logger.debug(f"Emitting file_uploaded to session {session_id} for file {file_name}")
+    _emit(session_id, 'file_uploaded', {'file_name': file_name})
 
 def emit_file_failed(session_id, file_name, error_message):
-    if not client_joined_rooms.get(session_id, False):
-        logger.info(f"Buffering file_failed event for session {session_id} until client joins room")
-        buffer_event(session_id, ('file_failed', {'file_name': file_name, 'error': error_message}))
-        return
-    room = session_id
-    logger.info(f"Emitting file_failed to session {session_id} for file {file_name} with error {error_message}")
-    socketio.emit('file_failed', {'file_name': file_name, 'error': error_message}, room=room, namespace='/upload')
+    logger.debug(f"Emitting file_failed to session {session_id} for file {file_name} with error {error_message}")
+    _emit(session_id, 'file_failed', {'file_name': file_name, 'error': error_message})
+
+def emit_upload_progress(session_id, frame):
+    logger.debug(f"Emitting upload_progress to session {session_id}: {frame['processed']}/{frame['total_files']}")
+    _emit(session_id, 'upload_progress', frame)
 
 def emit_upload_complete(session_id, summary):
-    if not client_joined_rooms.get(session_id, False):
-        logger.info(f"Buffering upload_complete event for session {session_id} until client joins room")
-        buffer_event(session_id, ('upload_complete', summary))
-        return
-    room = session_id
     logger.info(f"Emitting upload_complete to session {session_id} with summary")
-    socketio.emit('upload_complete', summary, room=room, namespace='/upload')
-
-# Buffer to hold events until client joins room: {session_id: [ (event_name, data), ... ]}
-event_buffer = {}
-
-def buffer_event(session_id, event):
-    if session_id not in event_buffer:
-        event_buffer[session_id] = []
-    event_buffer[session_id].append(event)
-
-def flush_buffered_events(session_id):
-    if session_id in event_buffer:
-        logger.info(f"Flushing buffered events for session {session_id}")
-        for event_name, data in event_buffer[session_id]:
-            socketio.emit(event_name, data, room=session_id, namespace='/upload')
-        event_buffer[session_id] = []
-
-def join_upload_room(session_id):
-    join_room(session_id, namespace='/upload')
-    client_joined_rooms[session_id] = True
+    _emit(session_id, 'upload_complete', summary)
+
+def replay_events(session_id, client_id, offset=0):
+    """
+    Send a (re)connecting client the buffered events it has not seen.
+    """
+    events = event_log.since(session_id, offset)
+    if events:
+        logger.info(f"Replaying {len(events)} events after seq {offset} for session {session_id}")
+    for event_name, data in events:
+        socketio.emit(event_name, data, to=client_id, namespace='/upload')
+
+def join_upload_room(session_id, client_id, last_seq=0):
+    join_room(session_id, sid=client_id, namespace='/upload')
+    event_log.join(session_id, client_id)
     logger.info(f"Client joined room {session_id} for upload tracking")
-    print(f"Client joined room {session_id} for upload tracking")
-    flush_buffered_events(session_id)
+    replay_events(session_id, client_id, last_seq)
+
+def leave_upload_room(client_id):
+    session_id = event_log.leave(client_id)
+    if session_id is not None:
+        logger.info(f"Client left room {session_id} for upload tracking")
+
+def purge_expired_sessions(force=False):
+    """
+    Drop the event logs and progress trackers of completed or idle sessions.
+    Cheap to call often: it only scans every PURGE_INTERVAL_SECONDS.
+    """
+    if not force and not event_log.purge_due():
+        return []
+    expired = event_log.expired()
+    for session_id in expired:
+        event_log.discard(session_id)
+        progress_trackers.pop(session_id, None)
+    if expired:
+        logger.info(f"Purged upload event logs of {len(expired)} expired sessions")
+    return expired
+
+class UploadProgress:
+    """
+    Coalesces the per-file results of one upload session into periodic
+    `upload_progress` frames (counters, throughput, ETA, the latest file names
+    and new failures) instead of one websocket message per file. The complete
+    failure list is kept here and served on demand by `get_failures`.
+    """
+
+    def __init__(self, session_id, total_files=0, interval=PROGRESS_INTERVAL_SECONDS,
+                 every=PROGRESS_EVERY_FILES, clock=time.monotonic):
+        self.session_id = session_id
+        self.interval = interval
+        self.every = every
+        self.clock = clock
+        self.failures = []
+        self.start(total_files)
+
+    def start(self, total_files):
+        self.total_files = total_files
+        self.uploaded = 0
+        self.failed = 0
+        self.failures.clear()
+        self.started_at = self.clock()
+        self._last_frame_at = self.started_at
+        self._pending = 0
+        self._failures_sent = 0
+        self._recent = deque(maxlen=FRAME_RECENT_FILES)
+
+    @property
+    def processed(self):
+        return self.uploaded + self.failed
+
+    def record(self, file_name, success, error=None):
+        if success:
+            self.uploaded += 1
+            self._recent.append(file_name)
+        else:
+            self.failed += 1
+            self.failures.append({'file_name': file_name, 'error': error or 'Unknown error'})
+        self._pending += 1
+        if self._pending >= self.every:
+            self.flush()
+
+    def maybe_flush(self):
+        """
+        Emit a frame if results are pending and the interval has passed.
+        """
+        if self._pending and self.clock() - self._last_frame_at >= self.interval:
+            self.flush()
+
+    def frame(self):
+        elapsed = max(self.clock() - self.started_at, 1e-6)
+        rate = self.processed / elapsed
+        remaining = max(self.total_files - self.processed, 0)
+        new_failures = self.failures[self._failures_sent:]
+        if not remaining:
+            eta = 0
+        elif rate > 0:
+            eta = round(remaining / rate, 1)
+        else:
+            eta = None
+        return {
+            'total_files': self.total_files,
+            'processed': self.processed,
+            'uploaded': self.uploaded,
+            'failed': self.failed,
+            'elapsed_seconds': round(elapsed, 2),
+            'files_per_second': round(rate, 2),
+            'eta_seconds': eta,
+            'recent_files': list(self._recent),
+            'new_failures': new_failures[:FRAME_MAX_FAILURES],
+            'failures_truncated': len(new_failures) > FRAME_MAX_FAILURES,
+        }
+
+    def flush(self):
+        frame = self.frame()
+        emit_upload_progress(self.session_id, frame)
+        self._pending = 0
+        self._failures_sent = len(self.failures)
+        self._recent.clear()
+        self._last_frame_at = self.clock()
+        return frame
+
+    def get_failures(self, offset=0, limit=500):
+        return {'total': len(self.failures), 'failures': self.failures[offset:offset + limit]}
+
+# Progress aggregators by session: {session_id: UploadProgress}
+progress_trackers = {}
+
+def get_progress(session_id):
+    tracker = progress_trackers.get(session_id)
+    if tracker is None:
+        tracker = progress_trackers[session_id] = UploadProgress(session_id)
+    return tracker
 
 def websocket_event_listener(ws_queue, session_id, stop_event):
     """Background thread to listen on ws_queue and emit websocket events."""
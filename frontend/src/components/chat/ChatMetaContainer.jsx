@@ -1,13 +1,18 @@
 import React, { useState } from 'react';
-import { useSelector } from 'react-redux';
+import { useDispatch, useSelector } from 'react-redux';
 import ChatHeader from './ChatHeader';
 import ChatWindow from './ChatWindow';
 import ChatInput from './ChatInput';
 import NewChat from './NewChat';
 import { useChatService } from '../../services/conversations/useChatService';
+import { fetchOlderMessages } from '../../services/storage/features/conversationSlice';
 
 const ChatMetaContainer = ({ messages, updateMessages, onNewMessage }) => {
   const [input, setInput] = useState('');
+  const dispatch = useDispatch();
+  const hasOlderMessages = useSelector(
+    (state) => state.conversations.messagesCursor != null
+  );
   
   // Get conversationID from Redux; if not set, assume a "new" conversation.
   const activeConversationId = useSelector(
@@ -39,7 +44,10 @@ const ChatMetaContainer = ({ messages, updateMessages, onNewMessage }) => {
       {/*<ChatHeader title="Chat App" />*/}
       <div className="flex-1 flex flex-col overflow-y-auto">
       {messages.length > 0 ? (
-        <ChatWindow messages={messages} />
+        <ChatWindow
+          messages={messages}
+          onLoadOlder={hasOlderMessages ? () => dispatch(fetchOlderMessages()) : undefined}
+        />
       ) : (
         <NewChat messages={messages} />
       )}
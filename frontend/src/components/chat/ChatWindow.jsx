@@ -9,20 +9,30 @@ import PropTypes from 'prop-types';
 import ChatMarkdownRenderer from './ChatMarkdownRenderer';
 import './styles/ChatWindow.css'
 
-const ChatWindow = ({ messages }) => {
+const ChatWindow = ({ messages, onLoadOlder }) => {
   const containerRef = useRef(null);
+  const lastMessage = messages[messages.length - 1];
 
+  // Follow new messages; loading older ones (prepended) keeps the position
   useEffect(() => {
     if (containerRef.current) {
       containerRef.current.scrollTop = containerRef.current.scrollHeight;
     }
-  }, [messages]);
+  }, [lastMessage]);
 
   return (
     <div
       ref={containerRef}
       className="flex-1 overflow-y-auto px-30 pt-10 pb-12 w-full bg-gray-100 dark:bg-gray-700 flex flex-col"
     >
+      {onLoadOlder && (
+        <button
+          className="self-center mb-4 text-sm text-gray-600 dark:text-gray-300 underline bg-transparent"
+          onClick={onLoadOlder}
+        >
+          Load earlier messages
+        </button>
+      )}
       {messages.map((msg, idx) => (
         <div
           key={msg.id || `${msg.conversation_id}-${msg.created_at}-${idx}`}
@@ -68,6 +78,7 @@ ChatWindow.propTypes = {
       pending: PropTypes.bool,
     })
   ).isRequired,
+  onLoadOlder: PropTypes.func,
 };
 
 export default ChatWindow;
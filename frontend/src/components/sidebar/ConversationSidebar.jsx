@@ -11,7 +11,8 @@ import { BsThreeDotsVertical } from 'react-icons/bs';
 import { FaSearch, FaKey } from 'react-icons/fa';
 import {
   generateNewConversationThunk,
-  selectConversation
+  selectConversation,
+  fetchMoreConversations
 } from '../../services/storage/features/conversationSlice';
 import { renameConversation, deleteConversation } from '../../services';
 import { processFolder, cancelProcessFolder } from '../../services/folderApi';
@@ -20,7 +21,7 @@ import { uploadTrackingService } from '../../singletons';
 const ConversationSidebar = () => {
   const dispatch = useDispatch();
   const navigate = useNavigate();
-  const { conversations, activeConversationId } = useSelector((state) => state.conversations);
+  const { conversations, activeConversationId, hasMore } = useSelector((state) => state.conversations);
 
   const [menuData, setMenuData] = useState({ open: false, conversation: null, x: 0, y: 0 });
   const [isRenameModalOpen, setIsRenameModalOpen] = useState(false);
@@ -203,6 +204,14 @@ const ConversationSidebar = () => {
             </li>
           ))}
         </ul>
+        {hasMore && (
+          <button
+            className="w-full mt-1 px-3 py-2 text-sm text-left bg-transparent hover:bg-gray-200 rounded"
+            onClick={() => dispatch(fetchMoreConversations())}
+          >
+            Load more
+          </button>
+        )}
       </div>
 
       {menuData.open && menuData.conversation && (
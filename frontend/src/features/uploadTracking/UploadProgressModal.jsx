@@ -7,6 +7,7 @@ import {
   uploadComplete,
   resetUpload,
 } from './uploadTrackingSlice';
+import { uploadTrackingService } from '../../singletons';
 
 const UploadProgressModal = ({ onCancel }) => {
   const {
@@ -14,6 +15,9 @@ const UploadProgressModal = ({ onCancel }) => {
     uploadedCount,
     uploadedFiles,
     failedFiles,
+    failedCount,
+    filesPerSecond,
+    etaSeconds,
     isComplete,
   } = useSelector((state) => state.uploadTracking);
 
@@ -41,6 +45,13 @@ const UploadProgressModal = ({ onCancel }) => {
             : `Files uploaded ${uploadedCount}/${totalFiles}`}
         </h3>
 
+        {!isComplete && filesPerSecond > 0 && (
+          <p className="text-sm text-gray-600 mb-4">
+            {filesPerSecond} files/s
+            {etaSeconds != null && ` · about ${Math.ceil(etaSeconds)}s left`}
+          </p>
+        )}
+
         <div className="mb-4">
           <h4 className="font-semibold">Uploaded Files:</h4>
           <ul className="list-disc list-inside max-h-40 overflow-y-auto border p-2 rounded">
@@ -60,6 +71,14 @@ const UploadProgressModal = ({ onCancel }) => {
                 </li>
               ))}
             </ul>
+            {failedCount > failedFiles.length && (
+              <button
+                className="mt-2 text-sm text-red-600 underline"
+                onClick={() => uploadTrackingService.fetchFailures()}
+              >
+                Show all {failedCount} failures
+              </button>
+            )}
           </div>
         )}
 
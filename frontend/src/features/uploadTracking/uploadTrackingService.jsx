@@ -1,10 +1,11 @@
 import socketService from '../../services/websocket/socketService';
-import { uploadStarted, fileUploaded, fileFailed, uploadComplete, resetUpload } from './uploadTrackingSlice';
+import { uploadStarted, fileUploaded, fileFailed, uploadProgress, failuresLoaded, uploadComplete, resetUpload } from './uploadTrackingSlice';
 
 class UploadTrackingService {
   constructor() {
     this.store = undefined;
     this.socket = null;
+    this.sessionId = null;
   }
 
   setStore(store) {
@@ -27,6 +28,7 @@ class UploadTrackingService {
       console.log('NOT connecting, sessionId missing:', sessionId);
     }
     this.socket = socketService.socket;
+    this.sessionId = sessionId;
 
     this.socket.on('connect', () => {
       console.log('Connected to upload WebSocket');
@@ -36,6 +38,11 @@ class UploadTrackingService {
 
     this.socket.onAny((event, ...args) => {
       console.log('Received event:', event, args);
+      // Reconnects send the last seq seen, so the server replays only newer events
+      const seq = args[0] && args[0].seq;
+      if (seq && this.socket) {
+        this.socket.auth = { ...this.socket.auth, last_seq: seq };
+      }
     });
 
     this.socket.on('upload_started', (data) => {
@@ -56,6 +63,11 @@ class UploadTrackingService {
       console.log('Dispatched fileFailed action');
     });
 
+    // Coalesced progress: counters, throughput, ETA, latest files and new failures
+    this.socket.on('upload_progress', (frame) => {
+      this.store.dispatch(uploadProgress(frame));
+    });
+
     this.socket.on('upload_complete', () => {
       console.log('upload_complete event received');
       this.store.dispatch(uploadComplete());
@@ -74,6 +86,14 @@ class UploadTrackingService {
     console.log('WebSocket event listeners registered');
   }
 
+  // Progress frames only carry new failures; load the complete list on demand.
+  fetchFailures(offset = 0, limit = 500) {
+    if (!this.socket) return;
+    this.socket.emit('get_upload_failures', { session_id: this.sessionId, offset, limit }, (result) => {
+      this.store.dispatch(failuresLoaded(result));
+    });
+  }
+
   disconnect() {
     if (this.socket) {
       this.socket.disconnect();
@@ -1,10 +1,16 @@
 import { createSlice } from '@reduxjs/toolkit';
 
+// Only the latest file names are kept; progress frames carry counters.
+const MAX_RECENT_FILES = 100;
+
 const initialState = {
   totalFiles: 0,
   uploadedCount: 0,
   uploadedFiles: [],
   failedFiles: [],
+  failedCount: 0,
+  filesPerSecond: 0,
+  etaSeconds: null,
   isComplete: false,
 };
 
@@ -18,6 +24,9 @@ const uploadTrackingSlice = createSlice({
       state.uploadedCount = 0;
       state.uploadedFiles = [];
       state.failedFiles = [];
+      state.failedCount = 0;
+      state.filesPerSecond = 0;
+      state.etaSeconds = null;
       state.isComplete = false;
       console.log('State after uploadStarted:', state);
     },
@@ -34,6 +43,22 @@ const uploadTrackingSlice = createSlice({
         error: action.payload.error,
       });
     },
+    uploadProgress(state, action) {
+      const frame = action.payload;
+      state.totalFiles = frame.total_files;
+      state.uploadedCount = frame.processed;
+      state.failedCount = frame.failed;
+      state.filesPerSecond = frame.files_per_second;
+      state.etaSeconds = frame.eta_seconds;
+      state.uploadedFiles = state.uploadedFiles.concat(frame.recent_files).slice(-MAX_RECENT_FILES);
+      frame.new_failures.forEach(({ file_name, error }) => {
+        state.failedFiles.push({ fileName: file_name, error });
+      });
+    },
+    failuresLoaded(state, action) {
+      state.failedFiles = action.payload.failures.map(({ file_name, error }) => ({ fileName: file_name, error }));
+      state.failedCount = action.payload.total;
+    },
     uploadComplete(state) {
       console.log('Reducer uploadComplete called');
       state.isComplete = true;
@@ -49,6 +74,8 @@ export const {
   uploadStarted,
   fileUploaded,
   fileFailed,
+  uploadProgress,
+  failuresLoaded,
   uploadComplete,
   resetUpload,
 } = uploadTrackingSlice.actions;
@@ -1,35 +1,41 @@
 import apiClient from './apiClient';
 import dayjs from 'dayjs';
 
+export const formatConversation = (conv) => ({
+  ...conv,
+  created_at: conv.created_at ? dayjs(conv.created_at).format('MMM D, YYYY h:mm A') : null,
+});
+
 /**
- * Retrieves all conversations with their details.
+ * Retrieves one page of conversations (newest first, without meta_data).
  * Assumes the API returns a JSON object like:
- * { conversations: [ { id, title, created_at, ... }, ... ] }
+ * { conversations: [ { id, title, created_at, ... }, ... ], next_cursor }
  */
-export const getConversations = async () => {
+export const getConversations = async ({ limit = 50, cursor = null } = {}) => {
   try {
-    const response = await apiClient.get('/conversation/list');
-    // Optionally format the created_at timestamp for each conversation.
-    const conversations = response.conversations.map(conv => ({
-      ...conv,
-      created_at: conv.created_at ? dayjs(conv.created_at).format('MMM D, YYYY h:mm A') : null,
-    }));
-    return conversations;
+    const response = await apiClient.get('/conversation/list', { params: { limit, cursor } });
+    return {
+      conversations: response.conversations.map(formatConversation),
+      nextCursor: response.next_cursor,
+    };
   } catch (error) {
     console.error("Error fetching conversations:", error);
     throw error;
   }
 };
 
-// The rest of your functions remain unchanged.
-export const getConversationMessages = async (conversationId) => {
+/**
+ * Retrieves the newest page of a conversation's messages (oldest first);
+ * pass the returned nextCursor to load the page before it.
+ */
+export const getConversationMessages = async (conversationId, { limit = 50, cursor = null } = {}) => {
   try {
-    const response = await apiClient.get(`/conversation/${conversationId}/messages`);
+    const response = await apiClient.get(`/conversation/${conversationId}/messages`, { params: { limit, cursor } });
     const messages = response.messages.map(msg => ({
       ...msg,
       created_at: dayjs(msg.created_at).format('h:mm A')
     }));
-    return messages;
+    return { messages, nextCursor: response.next_cursor };
   } catch (error) {
     console.error("Error fetching conversation messages:", error);
     throw error;
@@ -4,8 +4,11 @@ import {
   setConversations,
   setNewConversationId,
   renameConversationLocal,
-  updateConversationLocal
+  updateConversationLocal,
+  addConversationLocal,
+  deleteConversationLocal
 } from '../storage/features/conversationSlice';
+import { formatConversation } from '../conversationApi';
 
 export const setupSocketListeners = (socketInstance) => {
   if (!socketInstance) {
@@ -18,6 +21,22 @@ export const setupSocketListeners = (socketInstance) => {
     store.dispatch(setConversations(newList));
   });
 
+  // Deltas emitted by the backend once a conversation change is committed
+  socketInstance.on("conversation_created", (conversation) => {
+    console.log("Listener log: received 'conversation_created' with payload:", conversation);
+    store.dispatch(addConversationLocal(formatConversation(conversation)));
+  });
+
+  socketInstance.on("conversation_updated", (conversation) => {
+    console.log("Listener log: received 'conversation_updated' with payload:", conversation);
+    store.dispatch(updateConversationLocal(formatConversation(conversation)));
+  });
+
+  socketInstance.on("conversation_deleted", ({ id }) => {
+    console.log("Listener log: received 'conversation_deleted' for id:", id);
+    store.dispatch(deleteConversationLocal(id));
+  });
+
   socketInstance.on("new_conversation", (newConversation) => {
     console.log("Listener log: received 'new_conversation' with payload:", newConversation);
     store.dispatch(setNewConversationId(newConversation.id));
@@ -10,9 +10,17 @@ export const fetchConversations = createAsyncThunk(
   'conversations/fetchConversations',
   async () => {
     console.log('Fetching conversations...');
-    const convs = await getConversations();
-    console.log('Retrieved conversations:', convs);
-    return convs;
+    const page = await getConversations();
+    console.log('Retrieved conversations:', page.conversations);
+    return page;
+  }
+);
+
+export const fetchMoreConversations = createAsyncThunk(
+  'conversations/fetchMoreConversations',
+  async (_, { getState }) => {
+    const { nextCursor } = getState().conversations;
+    return getConversations({ cursor: nextCursor });
   }
 );
 
@@ -27,9 +35,18 @@ export const fetchConversationMessages = createAsyncThunk(
   'conversations/fetchConversationMessages',
   async (conversationId) => {
     console.log('Fetching messages for conversationId:', conversationId);
-    const msgs = await getConversationMessages(conversationId);
-    console.log('Retrieved messages:', msgs);
-    return { conversationId, messages: msgs };
+    const { messages, nextCursor } = await getConversationMessages(conversationId);
+    console.log('Retrieved messages:', messages);
+    return { conversationId, messages, nextCursor };
+  }
+);
+
+export const fetchOlderMessages = createAsyncThunk(
+  'conversations/fetchOlderMessages',
+  async (_, { getState }) => {
+    const { activeConversationId, messagesCursor } = getState().conversations;
+    const page = await getConversationMessages(activeConversationId, { cursor: messagesCursor });
+    return { conversationId: activeConversationId, ...page };
   }
 );
 
@@ -40,6 +57,10 @@ const conversationsSlice = createSlice({
     activeConversationId: null,
     conversationMessages: [],
     isNewConversation: false,
+    hasMore: false,
+    nextCursor: null,
+    // Cursor of the messages before the loaded ones (null when all are loaded)
+    messagesCursor: null,
     status: 'idle',
     error: null,
   },
@@ -50,6 +71,7 @@ selectConversation: (state, action) => {
     state.activeConversationId = action.payload;
     state.isNewConversation = false;
     state.conversationMessages = [];
+    state.messagesCursor = null;
   }
 },
     setConversations: (state, action) => {
@@ -107,6 +129,12 @@ selectConversation: (state, action) => {
       state.conversationMessages = [];
       state.isNewConversation = true;
     },
+    addConversationLocal: (state, action) => {
+      const conversation = action.payload;
+      if (!state.conversations.some(conv => conv.id === conversation.id)) {
+        state.conversations.unshift(conversation);
+      }
+    },
     updateConversationLocal: (state, action) => {
       const updatedConversation = action.payload;
       const conversation = state.conversations.find(conv => conv.id === updatedConversation.id);
@@ -125,8 +153,16 @@ selectConversation: (state, action) => {
       })
       .addCase(fetchConversations.fulfilled, (state, action) => {
         state.status = 'succeeded';
-        state.conversations = action.payload;
-        console.log('fetchConversations fulfilled. Conversations:', action.payload);
+        state.conversations = action.payload.conversations;
+        state.hasMore = action.payload.nextCursor != null;
+        state.nextCursor = action.payload.nextCursor;
+        console.log('fetchConversations fulfilled. Conversations:', action.payload.conversations);
+      })
+      .addCase(fetchMoreConversations.fulfilled, (state, action) => {
+        const known = new Set(state.conversations.map(conv => conv.id));
+        state.conversations.push(...action.payload.conversations.filter(conv => !known.has(conv.id)));
+        state.hasMore = action.payload.nextCursor != null;
+        state.nextCursor = action.payload.nextCursor;
       })
       .addCase(fetchConversations.rejected, (state, action) => {
         state.status = 'failed';
@@ -136,8 +172,15 @@ selectConversation: (state, action) => {
       .addCase(fetchConversationMessages.fulfilled, (state, action) => {
         if (state.activeConversationId === action.payload.conversationId) {
           state.conversationMessages = action.payload.messages;
+          state.messagesCursor = action.payload.nextCursor;
           console.log('Updated conversation messages for conversationId:', action.payload.conversationId);
         }
+      })
+      .addCase(fetchOlderMessages.fulfilled, (state, action) => {
+        if (state.activeConversationId === action.payload.conversationId) {
+          state.conversationMessages = [...action.payload.messages, ...state.conversationMessages];
+          state.messagesCursor = action.payload.nextCursor;
+        }
       });
   },
 });
@@ -153,6 +196,7 @@ export const {
   clearActiveConversation,
   generateNewConversation,
   updateConversationLocal, // Export the new action
+  addConversationLocal,
 } = conversationsSlice.actions;
 
 export default conversationsSlice.reducer;